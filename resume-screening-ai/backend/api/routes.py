@@ -4,38 +4,83 @@ FastAPI endpoints for resume screening
 """
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, Dict, List, Tuple
+import json
 import time
-import uuid
 from pathlib import Path
 import logging
 
 from backend.schemas.resume import ProcessResponse, CandidateResponse
-from backend.schemas.response import HealthResponse, SkillExtractionResponse
+from backend.schemas.response import (
+    HealthResponse, SkillExtractionResponse, BatchProcessingStatus, SearchResponse
+)
 from backend.core.config import settings
-from backend.core.ml_engine_enhanced import get_enhanced_ml_engine
-from backend.utils.parser import ResumeParser
-from backend.utils.skill_extractor import get_skill_extractor
-from backend.utils.contact_extractor import ContactExtractor
-from backend.utils.resume_validator import get_resume_validator
+from backend.core.ml_engine_enhanced import EnhancedMLEngine
+from backend.core.screening import build_job_profile, iter_screening_results, search_talent_pool
+from backend.core.job_manager import get_job_manager
+from backend.core.warmup import get_screening_models
+from backend.core.worker_pool import run_in_thread
+from backend.utils.skill_extractor import SkillExtractor
 
 logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter()
 
-# Initialize ML engine at startup - using custom trained model
-ml_engine = get_enhanced_ml_engine(use_custom=True)
-skill_extractor = get_skill_extractor()
-parser = ResumeParser()
-resume_validator = get_resume_validator()  # NLP-powered validator
+
+async def screening_models() -> Tuple[EnhancedMLEngine, SkillExtractor]:
+    """
+    Dependency: the scoring engine (custom trained model) and skill extractor
+    Loaded by the startup warm-up; a request arriving earlier waits for it
+    off the event loop.
+    """
+    try:
+        return await run_in_thread(get_screening_models)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Models could not be loaded: {e}")
+
+
+async def _read_uploads(
+    resumes: List[UploadFile],
+    job_description: str
+) -> List[Tuple[str, bytes]]:
+    """
+    Validate a screening request and read the uploaded files into memory
+    
+    Returns:
+        (filename, content) pairs for files with a supported extension
+    """
+    # Validate inputs
+    if not resumes:
+        raise HTTPException(status_code=400, detail="No resumes uploaded")
+    
+    if len(job_description) < 50:
+        raise HTTPException(status_code=400, detail="Job description too short")
+    
+    if len(resumes) > settings.MAX_FILES:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Maximum {settings.MAX_FILES} files allowed"
+        )
+    
+    uploads = []
+    for resume_file in resumes:
+        # Validate file type
+        file_ext = Path(resume_file.filename).suffix.lower()
+        if file_ext not in settings.ALLOWED_EXTENSIONS:
+            logger.warning(f"Skipping unsupported file: {resume_file.filename}")
+            continue
+        uploads.append((resume_file.filename, await resume_file.read()))
+    
+    return uploads
 
 
 @router.post("/process", response_model=ProcessResponse)
 async def process_resumes(
     resumes: List[UploadFile] = File(...),
-    job_description: str = Form(...)
+    job_description: str = Form(...),
+    models: Tuple[EnhancedMLEngine, SkillExtractor] = Depends(screening_models)
 ):
     """
     Process uploaded resumes against job description
@@ -47,204 +92,26 @@ async def process_resumes(
     Returns:
         ProcessResponse with ranked candidates
     """
+    ml_engine, skill_extractor = models
     start_time = time.time()
     
     try:
-        # Validate inputs
-        if not resumes:
-            raise HTTPException(status_code=400, detail="No resumes uploaded")
-        
-        if len(job_description) < 50:
-            raise HTTPException(status_code=400, detail="Job description too short")
+        uploads = await _read_uploads(resumes, job_description)
         
-        if len(resumes) > settings.MAX_FILES:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Maximum {settings.MAX_FILES} files allowed"
-            )
-        
-        # Extract skills from job description
-        required_skills = skill_extractor.extract_skills(job_description)
-        logger.info(f"Found {len(required_skills)} required skills in job description")
-        
-        results = []
+        logger.info(f"Starting to process {len(uploads)} resumes")
         
-        logger.info(f"Starting to process {len(resumes)} resumes")
+        # Job description profile is built in a thread; the event loop only orchestrates
+        job_profile = await run_in_thread(
+            build_job_profile, job_description, ml_engine, skill_extractor
+        )
         
-        # Process each resume
-        for idx, resume_file in enumerate(resumes, 1):
-            try:
-                logger.info(f"Processing resume {idx}/{len(resumes)}: {resume_file.filename}")
-                
-                # Validate file type
-                file_ext = Path(resume_file.filename).suffix.lower()
-                if file_ext not in settings.ALLOWED_EXTENSIONS:
-                    logger.warning(f"Skipping unsupported file: {resume_file.filename}")
-                    continue
-                
-                # Save uploaded file temporarily
-                temp_file_path = settings.UPLOADS_DIR / f"{uuid.uuid4()}{file_ext}"
-                with open(temp_file_path, "wb") as f:
-                    content = await resume_file.read()
-                    f.write(content)
-                
-                logger.info(f"Saved temp file: {temp_file_path}")
-                
-                # Parse resume
-                resume_text = parser.parse_resume(str(temp_file_path))
-                if not resume_text:
-                    logger.warning(f"Could not extract text from {resume_file.filename}")
-                    logger.warning(f"This might be a scanned/image-based PDF. Consider using OCR or text-based PDFs.")
-                    temp_file_path.unlink()
-                    continue
-                
-                logger.info(f"Extracted {len(resume_text)} characters from {resume_file.filename}")
-                
-                # Clean text
-                resume_text = parser.clean_text(resume_text)
-                
-                # NLP VALIDATION: Check if document is actually a resume
-                is_resume, validation_details = resume_validator.validate_resume(resume_text)
-                
-                if not is_resume:
-                    validation_msg = resume_validator.get_validation_message(validation_details)
-                    logger.warning(f"❌ {resume_file.filename} rejected: {validation_msg}")
-                    logger.warning(f"Validation details: {validation_details}")
-                    temp_file_path.unlink()
-                    # Skip this file and continue with next
-                    continue
-                
-                logger.info(f"✓ {resume_file.filename} validated as resume (confidence: {validation_details['confidence']}%)")
-                logger.info(f"Sections found: {', '.join(validation_details['sections_found'])}")
-                
-                # Extract contact information
-                contact_info = ContactExtractor.extract_all_contact_info(resume_text)
-                
-                # ENHANCED: Extract experience using advanced extractor
-                from backend.utils.experience_education_extractor import extract_experience_and_education
-                exp_edu_data = extract_experience_and_education(resume_text)
-                
-                # Use the better experience extraction
-                experience_years = exp_edu_data.get('years_of_experience', 0)
-                if experience_years == 0:
-                    # Fallback to old method
-                    experience_years = contact_info.get('experience_years', 0)
-                
-                seniority_level = exp_edu_data.get('seniority_level', 'Entry Level')
-                education_data = exp_edu_data.get('education', contact_info.get('education', []))
-                
-                # Convert education dicts to strings for schema compatibility
-                if education_data and isinstance(education_data[0], dict):
-                    education_list = [
-                        f"{edu.get('degree', '')} in {edu.get('specialization', 'Unknown')}"
-                        if edu.get('specialization')
-                        else edu.get('degree', 'Unknown')
-                        for edu in education_data
-                    ]
-                else:
-                    education_list = education_data
-                
-                logger.info(f"Experience: {experience_years} years ({seniority_level})")
-                logger.info(f"Education: {len(education_list)} degrees found")
-                
-                # Extract skills from resume
-                resume_skills = skill_extractor.extract_skills(resume_text)
-                
-                # Compute skill match score with details
-                skill_match_score, matched_skills, missing_skills = skill_extractor.compute_skill_match_score(
-                    resume_skills, list(required_skills)
-                )
-                
-                # Calculate semantic similarity
-                semantic_score = ml_engine.compute_semantic_similarity(
-                    resume_text, job_description
-                )
-                
-                # ENHANCED: Detect job seniority level from JD
-                jd_lower = job_description.lower()
-                required_seniority = 'Entry Level'
-                if 'senior' in jd_lower or 'lead' in jd_lower or 'principal' in jd_lower:
-                    required_seniority = 'Senior'
-                elif 'mid-level' in jd_lower or 'intermediate' in jd_lower:
-                    required_seniority = 'Mid-Level'
-                elif 'junior' in jd_lower:
-                    required_seniority = 'Junior'
-                
-                # Extract required years from JD
-                import re
-                required_years_match = re.search(r'(\d+)\+?\s*years?\s+(?:of\s+)?experience', jd_lower)
-                required_years = float(required_years_match.group(1)) if required_years_match else 3.0
-                
-                logger.info(f"Job requires: {required_years} years ({required_seniority})")
-                
-                experience_score = ml_engine.compute_experience_score(
-                    experience_years, required_years
-                )
-                
-                # SENIORITY PENALTY: REDUCED to be more like ChatGPT (8% per level instead of 20%)
-                seniority_hierarchy = {'Entry Level': 0, 'Junior': 1, 'Mid-Level': 2, 'Senior': 3, 'Lead/Principal': 4}
-                candidate_level = seniority_hierarchy.get(seniority_level, 0)
-                required_level = seniority_hierarchy.get(required_seniority, 0)
-                
-                if candidate_level < required_level:
-                    level_gap = required_level - candidate_level
-                    penalty = level_gap * 8  # REDUCED: 8% penalty per level (was 20%)
-                    experience_score = max(0, experience_score - penalty)
-                    logger.warning(f"Seniority gap: {seniority_level} → {required_seniority}. Penalty: -{penalty}%")
-                elif candidate_level > required_level:
-                    # Over-qualified: small bonus
-                    bonus = (candidate_level - required_level) * 3
-                    experience_score = min(100, experience_score + bonus)
-                    logger.info(f"Over-qualified: {seniority_level} → {required_seniority}. Bonus: +{bonus}%")
-                
-                education_score = ml_engine.compute_education_score(
-                    education_list
-                )
-                
-                final_score = ml_engine.calculate_final_score(
-                    semantic_score,
-                    skill_match_score,
-                    experience_score,
-                    education_score
-                )
-                
-                # Detailed logging for debugging
-                logger.info(f"=== SCORES FOR {resume_file.filename} ===")
-                logger.info(f"Semantic: {semantic_score:.1f}% (weight: 20%)")
-                logger.info(f"Skills: {skill_match_score:.1f}% (weight: 40%)")
-                logger.info(f"Experience: {experience_score:.1f}% (weight: 30%)")
-                logger.info(f"Education: {education_score:.1f}% (weight: 10%)")
-                logger.info(f"FINAL SCORE: {final_score:.1f}%")
-                logger.info(f"Matched skills: {len(matched_skills)}, Missing: {len(missing_skills)}")
-                
-                # Create result
-                candidate_result = {
-                    'name': contact_info.get('name', 'Unknown'),
-                    'email': contact_info.get('email'),
-                    'phone': contact_info.get('phone'),
-                    'filename': resume_file.filename,
-                    'final_score': final_score,
-                    'semantic_score': semantic_score,
-                    'skill_match_score': skill_match_score,
-                    'experience_score': experience_score,
-                    'education_score': education_score,
-                    'experience_years': experience_years,
-                    'seniority_level': seniority_level,
-                    'education': education_list,
-                    'skills_found': matched_skills,
-                    'missing_skills': missing_skills
-                }
-                
-                results.append(candidate_result)
-                
-                # Clean up temp file
-                temp_file_path.unlink()
-                
-                logger.info(f"Processed {resume_file.filename}: Score = {final_score}")
-                
-            except Exception as e:
-                logger.error(f"Error processing {resume_file.filename}: {e}")
-                continue
+        results = [
+            candidate
+            async for _, candidate in iter_screening_results(
+                uploads, job_profile, ml_engine, skill_extractor
+            )
+            if candidate is not None
+        ]
         
         # Rank candidates
         ranked_results = ml_engine.rank_candidates(results)
@@ -267,6 +134,172 @@ async def process_resumes(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _encode_stream_frame(frame: Dict[str, Any], stream_format: str) -> str:
+    """Encode one frame as an NDJSON line or a Server-Sent Event"""
+    payload = json.dumps(frame, ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {frame['type']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+@router.post("/process/stream")
+async def process_resumes_stream(
+    resumes: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    stream_format: str = Form("ndjson"),
+    models: Tuple[EnhancedMLEngine, SkillExtractor] = Depends(screening_models)
+):
+    """
+    Process resumes and stream each scored candidate as soon as it is ready
+    
+    Frames (NDJSON lines, or SSE events named after ``type``):
+    - {"type": "candidate", "filename": ..., "candidate": {...}}
+    - {"type": "skipped", "filename": ...}   (unreadable or not a resume)
+    - {"type": "summary", "total_candidates": ..., "ranking": [...], "processing_time": ...}
+    - {"type": "error", "detail": ...}
+    
+    Args:
+        resumes: List of resume files (PDF/DOCX)
+        job_description: Job description text
+        stream_format: "ndjson" (default) or "sse"
+    """
+    if stream_format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream_format must be 'ndjson' or 'sse'")
+    
+    ml_engine, skill_extractor = models
+    start_time = time.time()
+    uploads = await _read_uploads(resumes, job_description)
+    
+    async def frames():
+        # Only (score, filename, name) is kept for the final ranking
+        ranking = []
+        try:
+            job_profile = await run_in_thread(
+                build_job_profile, job_description, ml_engine, skill_extractor
+            )
+            
+            async for filename, candidate in iter_screening_results(
+                uploads, job_profile, ml_engine, skill_extractor
+            ):
+                if candidate is None:
+                    yield _encode_stream_frame({'type': 'skipped', 'filename': filename}, stream_format)
+                    continue
+                
+                ranking.append((candidate['final_score'], filename, candidate['name']))
+                yield _encode_stream_frame(
+                    {'type': 'candidate', 'filename': filename, 'candidate': candidate},
+                    stream_format
+                )
+            
+            ranking.sort(key=lambda item: item[0], reverse=True)
+            yield _encode_stream_frame({
+                'type': 'summary',
+                'total_candidates': len(ranking),
+                'ranking': [
+                    {'rank': rank, 'filename': filename, 'name': name, 'final_score': score}
+                    for rank, (score, filename, name) in enumerate(ranking, 1)
+                ],
+                'processing_time': round(time.time() - start_time, 2)
+            }, stream_format)
+        except Exception as e:
+            logger.error(f"Error in process_resumes_stream: {e}")
+            yield _encode_stream_frame({'type': 'error', 'detail': str(e)}, stream_format)
+    
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(frames(), media_type=media_type)
+
+
+@router.post("/jobs", response_model=BatchProcessingStatus, status_code=202)
+async def submit_job(
+    resumes: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    models: Tuple[EnhancedMLEngine, SkillExtractor] = Depends(screening_models)
+):
+    """
+    Submit resumes for background screening
+    Returns immediately with a job_id; poll GET /jobs/{job_id} for progress
+    
+    Args:
+        resumes: List of resume files (PDF/DOCX)
+        job_description: Job description text
+        
+    Returns:
+        BatchProcessingStatus of the new job
+    """
+    try:
+        uploads = await _read_uploads(resumes, job_description)
+        job = await get_job_manager().submit(uploads, job_description, *models)
+        return BatchProcessingStatus(**job.to_status())
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=BatchProcessingStatus)
+async def get_job_status(job_id: str):
+    """
+    Get progress and (partial) ranked results of a background job
+    
+    Args:
+        job_id: ID returned by POST /jobs
+        
+    Returns:
+        BatchProcessingStatus
+    """
+    job = await run_in_thread(get_job_manager().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return BatchProcessingStatus(**job.to_status())
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search_candidates(
+    job_description: str = Form(...),
+    top_k: int = Form(10),
+    models: Tuple[EnhancedMLEngine, SkillExtractor] = Depends(screening_models)
+):
+    """
+    Search every previously screened resume for a job description
+    No files are uploaded; see search_talent_pool() for the ranking
+    
+    Args:
+        job_description: Job description text
+        top_k: Number of candidates to return
+        
+    Returns:
+        SearchResponse with the best matching candidates
+    """
+    if len(job_description) < 50:
+        raise HTTPException(status_code=400, detail="Job description too short")
+    
+    if not 1 <= top_k <= settings.SEARCH_MAX_TOP_K:
+        raise HTTPException(
+            status_code=400,
+            detail=f"top_k must be between 1 and {settings.SEARCH_MAX_TOP_K}"
+        )
+    
+    if not settings.VECTOR_STORE_ENABLED:
+        raise HTTPException(status_code=503, detail="Talent pool search is disabled")
+    
+    try:
+        start_time = time.time()
+        found = await run_in_thread(
+            search_talent_pool, job_description, top_k, *models
+        )
+        return SearchResponse(
+            results=found['results'],
+            total_results=len(found['results']),
+            pool_size=found['pool_size'],
+            required_skills=found['required_skills'],
+            search_time=round(time.time() - start_time, 3)
+        )
+    except Exception as e:
+        logger.error(f"Error searching talent pool: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -277,8 +310,45 @@ async def health_check():
     )
 
 
+@router.get("/cache/stats")
+async def get_cache_stats(models: Tuple[EnhancedMLEngine, SkillExtractor] = Depends(screening_models)):
+    """Embedding cache hit/miss counters of this server process"""
+    ml_engine, _ = models
+    cache = ml_engine.embedding_cache
+    return {
+        "enabled": cache is not None,
+        "model_id": ml_engine.model_id,
+        "embeddings": cache.stats() if cache is not None else None
+    }
+
+
+@router.get("/encoder/stats")
+async def get_encoder_stats(models: Tuple[EnhancedMLEngine, SkillExtractor] = Depends(screening_models)):
+    """
+    Inference backend and bucketed-batching counters of this server process,
+    plus the shared embedding service's when workers use one
+    """
+    ml_engine, _ = models
+    stats = {
+        "backend": ml_engine.inference_backend,
+        "model_id": ml_engine.model_id,
+        "token_budget": settings.ENCODE_TOKEN_BUDGET,
+        "max_batch_size": settings.ENCODE_BATCH_SIZE,
+        "encoding": ml_engine.encode_stats.stats()
+    }
+    if hasattr(ml_engine.scheduler, 'service_stats'):
+        try:
+            stats["service"] = await run_in_thread(ml_engine.scheduler.service_stats)
+        except (EOFError, OSError) as e:
+            stats["service"] = {"error": str(e)}
+    return stats
+
+
 @router.post("/extract-skills", response_model=SkillExtractionResponse)
-async def extract_skills(text: str = Form(...)):
+async def extract_skills(
+    text: str = Form(...),
+    models: Tuple[EnhancedMLEngine, SkillExtractor] = Depends(screening_models)
+):
     """
     Extract skills from text
     
@@ -289,7 +359,8 @@ async def extract_skills(text: str = Form(...)):
         List of extracted skills
     """
     try:
-        skills = skill_extractor.extract_skills(text)
+        _, skill_extractor = models
+        skills = await run_in_thread(skill_extractor.extract_skills, text)
         return SkillExtractionResponse(
             skills=skills,
             total_skills=len(skills)
@@ -300,9 +371,10 @@ async def extract_skills(text: str = Form(...)):
 
 
 @router.get("/skills/all")
-async def get_all_skills():
+async def get_all_skills(models: Tuple[EnhancedMLEngine, SkillExtractor] = Depends(screening_models)):
     """Get all skills in database"""
     try:
+        _, skill_extractor = models
         skills = skill_extractor.get_all_skills()
         return {
             "skills": skills,
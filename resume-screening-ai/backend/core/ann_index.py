@@ -0,0 +1,326 @@
+"""
+Approximate Nearest-Neighbour Index
+IVF-PQ in numpy: a coarse k-means quantizer picks inverted lists, product
+quantization compresses the residuals so a probe scans small byte codes
+"""
+
+import copy
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Rows per block when computing distances to centroids (bounds temporary memory)
+_BLOCK = 8192
+
+# Codebook training sample cap: 64 points per code is plenty for 8-bit PQ
+_PQ_TRAIN_POINTS = 64 * 256
+
+
+def _squared_distances(x: np.ndarray, centroids: np.ndarray, centroid_norms: np.ndarray) -> np.ndarray:
+    """||x - c||^2 up to the per-row constant ||x||^2 (enough for argmin)"""
+    return centroid_norms[None, :] - 2.0 * (x @ centroids.T)
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid for every row of x"""
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    labels = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), _BLOCK):
+        block = x[start:start + _BLOCK]
+        labels[start:start + _BLOCK] = _squared_distances(block, centroids, centroid_norms).argmin(axis=1)
+    return labels
+
+
+def kmeans(x: np.ndarray, k: int, n_iter: int = 12, seed: int = 0) -> np.ndarray:
+    """
+    Lloyd's k-means with random initialization
+    
+    Empty clusters are re-seeded with random points.
+    
+    Returns:
+        (k, dim) float32 centroids
+    """
+    rng = np.random.default_rng(seed)
+    x = np.ascontiguousarray(x, dtype=np.float32)
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    
+    for _ in range(n_iter):
+        labels = _assign(x, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=x[:, d], minlength=k) for d in range(x.shape[1])], axis=1)
+        
+        empty = counts == 0
+        centroids[~empty] = (sums[~empty] / counts[~empty, None]).astype(np.float32)
+        if empty.any():
+            centroids[empty] = x[rng.choice(len(x), size=int(empty.sum()), replace=False)]
+    
+    return centroids
+
+
+class IVFPQIndex:
+    """
+    Inverted-file index with product-quantized residuals
+    
+    Vectors are assigned to their nearest of n_lists coarse centroids; the
+    residual to that centroid is split into n_subvectors pieces, each
+    stored as the byte index of its nearest codebook entry. A query scans
+    the nprobe nearest lists using per-list distance lookup tables, so
+    nprobe is the recall-versus-latency knob.
+    
+    Ids are non-negative integers (the vector store uses row indexes).
+    Every stored entry carries a sequence number and live[id] holds the
+    sequence number of the id's current entry (-1 once removed), so
+    removals and re-inserts are O(1) and superseded entries are skipped
+    during search. save() compacts them away.
+    """
+    
+    def __init__(self, dim: int, n_lists: int, n_subvectors: int):
+        if dim % n_subvectors:
+            raise ValueError(f"dim {dim} is not divisible by n_subvectors {n_subvectors}")
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_subvectors = n_subvectors
+        self.sub_dim = dim // n_subvectors
+        
+        self.centroids: Optional[np.ndarray] = None  # (n_lists, dim)
+        self.codebooks: Optional[np.ndarray] = None  # (n_subvectors, n_codes, sub_dim)
+        self._codebook_norms: Optional[np.ndarray] = None  # (n_subvectors, n_codes)
+        self.trained_size = 0
+        
+        # Compacted entries (memory-mapped after load), grouped by list
+        self._base_ids = np.empty(0, dtype=np.int64)
+        self._base_seqs = np.empty(0, dtype=np.int64)
+        self._base_codes = np.empty((0, n_subvectors), dtype=np.uint8)
+        self._base_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        
+        # Entries inserted since then: list -> [(ids, seqs, codes), ...]
+        self._delta: Dict[int, List[Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+        self._merged: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        
+        self._live = np.full(0, -1, dtype=np.int64)
+        self._next_seq = 0
+        
+        # Caller bookkeeping (JSON-serializable), kept in the snapshot
+        self.info: Dict = {}
+    
+    @staticmethod
+    def choose_subvectors(dim: int, target: int) -> int:
+        """Largest divisor of dim that is <= target"""
+        for n_subvectors in range(min(target, dim), 0, -1):
+            if dim % n_subvectors == 0:
+                return n_subvectors
+        return 1
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+    
+    @property
+    def pending(self) -> int:
+        """Entries inserted since the last load (not yet in a snapshot)"""
+        return sum(len(ids) for chunks in self._delta.values() for ids, _, _ in chunks)
+    
+    def __len__(self) -> int:
+        """Number of live entries"""
+        return int((self._live >= 0).sum())
+    
+    def train(self, vectors: np.ndarray, n_iter: int = 12, seed: int = 0):
+        """Learn the coarse centroids and the residual codebooks from a sample"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.centroids = kmeans(vectors, self.n_lists, n_iter, seed)
+        self.n_lists = len(self.centroids)
+        self._base_offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        
+        residuals = vectors - self.centroids[_assign(vectors, self.centroids)]
+        if len(residuals) > _PQ_TRAIN_POINTS:
+            rng = np.random.default_rng(seed)
+            residuals = residuals[rng.choice(len(residuals), size=_PQ_TRAIN_POINTS, replace=False)]
+        n_codes = min(256, len(vectors))
+        self.codebooks = np.stack([
+            kmeans(residuals[:, j * self.sub_dim:(j + 1) * self.sub_dim], n_codes, n_iter, seed + j + 1)
+            for j in range(self.n_subvectors)
+        ])
+        self._codebook_norms = (self.codebooks ** 2).sum(axis=2)
+        self.trained_size = len(vectors)
+    
+    def _encode(self, residuals: np.ndarray) -> np.ndarray:
+        codes = np.empty((len(residuals), self.n_subvectors), dtype=np.uint8)
+        for j in range(self.n_subvectors):
+            codes[:, j] = _assign(residuals[:, j * self.sub_dim:(j + 1) * self.sub_dim], self.codebooks[j])
+        return codes
+    
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Insert (or replace) vectors under the given ids"""
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        
+        labels = _assign(vectors, self.centroids)
+        codes = self._encode(vectors - self.centroids[labels])
+        seqs = np.arange(self._next_seq, self._next_seq + len(ids), dtype=np.int64)
+        self._next_seq += len(ids)
+        
+        if ids.max() >= len(self._live):
+            grown = np.full(max(int(ids.max()) + 1, 2 * len(self._live)), -1, dtype=np.int64)
+            grown[:len(self._live)] = self._live
+            self._live = grown
+        # Later duplicates in the same batch win, like later calls do
+        self._live[ids] = seqs
+        
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.searchsorted(labels[order], np.arange(self.n_lists + 1))
+        for list_id in np.unique(labels):
+            chunk = order[boundaries[list_id]:boundaries[list_id + 1]]
+            self._delta.setdefault(int(list_id), []).append((ids[chunk], seqs[chunk], codes[chunk]))
+            self._merged.pop(int(list_id), None)
+    
+    def copy(self) -> 'IVFPQIndex':
+        """Copy that later add()/remove() calls on either index leave untouched (base arrays are shared)"""
+        index = copy.copy(self)
+        index._delta = {list_id: list(chunks) for list_id, chunks in self._delta.items()}
+        index._merged = dict(self._merged)
+        index._live = self._live.copy()
+        index.info = dict(self.info)
+        return index
+    
+    def remove(self, ids: np.ndarray):
+        """Tombstone ids (unknown ids are ignored)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        ids = ids[ids < len(self._live)]
+        self._live[ids] = -1
+    
+    def _list(self, list_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(ids, seqs, codes) of one inverted list, base and delta merged"""
+        merged = self._merged.get(list_id)
+        if merged is not None:
+            return merged
+        
+        start, end = self._base_offsets[list_id], self._base_offsets[list_id + 1]
+        parts = [(self._base_ids[start:end], self._base_seqs[start:end], self._base_codes[start:end])]
+        parts.extend(self._delta.get(list_id, []))
+        if len(parts) == 1:
+            merged = parts[0]
+        else:
+            merged = tuple(np.concatenate(column) for column in zip(*parts))
+        self._merged[list_id] = merged
+        return merged
+    
+    def search(self, query: np.ndarray, k: int, nprobe: int = 16) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate k nearest ids by squared L2 distance
+        
+        For normalized embeddings this is the same ranking as cosine similarity.
+        
+        Returns:
+            (ids, approximate squared distances), nearest first
+        """
+        query = np.asarray(query, dtype=np.float32).ravel()
+        nprobe = min(nprobe, self.n_lists)
+        coarse = ((self.centroids - query) ** 2).sum(axis=1)
+        probes = np.argpartition(coarse, nprobe - 1)[:nprobe]
+        
+        # Lookup tables for every probed list at once: ||c - r||^2 = ||c||^2 - 2 c.r + ||r||^2
+        # (n_subvectors, sub_dim, nprobe) residual pieces -> (nprobe, n_subvectors, n_codes)
+        residuals = (query - self.centroids[probes]).reshape(nprobe, self.n_subvectors, self.sub_dim)
+        dots = np.matmul(self.codebooks, residuals.transpose(1, 2, 0)).transpose(2, 0, 1)
+        tables = self._codebook_norms[None] - 2.0 * dots
+        residual_norms = (residuals ** 2).sum(axis=(1, 2))
+        
+        subspaces = np.arange(self.n_subvectors)[None, :]
+        all_ids, all_distances = [], []
+        for probe, list_id in enumerate(probes):
+            ids, seqs, codes = self._list(int(list_id))
+            if len(ids) == 0:
+                continue
+            valid = self._live[ids] == seqs
+            if not valid.any():
+                continue
+            ids, codes = ids[valid], codes[valid]
+            
+            all_ids.append(ids)
+            all_distances.append(tables[probe][subspaces, codes].sum(axis=1) + residual_norms[probe])
+        
+        if not all_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        ids = np.concatenate(all_ids)
+        distances = np.concatenate(all_distances)
+        k = min(k, len(ids))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return ids[top], distances[top]
+    
+    def save(self, directory: Path):
+        """
+        Write a compacted snapshot (.npy arrays + meta.json)
+        
+        meta.json is written last, so a directory without it is incomplete.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        lists = [self._list(list_id) for list_id in range(self.n_lists)]
+        kept = []
+        for ids, seqs, codes in lists:
+            valid = self._live[ids] == seqs
+            kept.append((ids[valid], seqs[valid], codes[valid]))
+        offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(ids) for ids, _, _ in kept])
+        
+        arrays = {
+            'centroids': self.centroids,
+            'codebooks': self.codebooks,
+            'ids': np.concatenate([ids for ids, _, _ in kept]),
+            'seqs': np.concatenate([seqs for _, seqs, _ in kept]),
+            'codes': np.concatenate([codes for _, _, codes in kept]),
+            'offsets': offsets,
+            'live': self._live,
+        }
+        for name, array in arrays.items():
+            np.save(directory / f"{name}.npy", array)
+        
+        with open(directory / "meta.json", 'w') as f:
+            json.dump({
+                'version': SNAPSHOT_VERSION,
+                'dim': self.dim,
+                'n_lists': self.n_lists,
+                'n_subvectors': self.n_subvectors,
+                'trained_size': self.trained_size,
+                'next_seq': self._next_seq,
+                'info': self.info
+            }, f)
+    
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> 'IVFPQIndex':
+        """
+        Load a snapshot; the code and id arrays are memory-mapped read-only
+        (inserts go to in-memory lists, removals only touch live)
+        """
+        directory = Path(directory)
+        with open(directory / "meta.json", 'r') as f:
+            meta = json.load(f)
+        if meta.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported ANN snapshot version {meta.get('version')}")
+        
+        mmap_mode = 'r' if mmap else None
+        index = cls(meta['dim'], meta['n_lists'], meta['n_subvectors'])
+        index.centroids = np.load(directory / "centroids.npy")
+        index.codebooks = np.load(directory / "codebooks.npy")
+        index._codebook_norms = (index.codebooks ** 2).sum(axis=2)
+        index.trained_size = meta['trained_size']
+        index._base_ids = np.load(directory / "ids.npy", mmap_mode=mmap_mode)
+        index._base_seqs = np.load(directory / "seqs.npy", mmap_mode=mmap_mode)
+        index._base_codes = np.load(directory / "codes.npy", mmap_mode=mmap_mode)
+        index._base_offsets = np.load(directory / "offsets.npy")
+        index._live = np.load(directory / "live.npy")
+        index._next_seq = meta['next_seq']
+        index.info = meta.get('info', {})
+        return index
@@ -47,6 +47,11 @@ class Settings(BaseSettings):
     MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
     MODEL_CACHE_DIR: Path = MODELS_DIR / "sentence-transformer"
     SIMILARITY_THRESHOLD: float = 0.5
+    ENCODE_BATCH_SIZE: int = 64  # Max texts per encoder batch
+    ENCODE_TOKEN_BUDGET: int = 16384  # Padded tokens per batch; length-sorted batches of short texts get more rows
+    INFERENCE_BACKEND: str = "torch"  # "torch", "onnx" (exported once to ONNX_DIR, run with onnxruntime on CPU) or "onnx-int8" (scripts/quantize_model.py)
+    ONNX_DIR: Path = MODELS_DIR / "onnx"  # One export per model fingerprint
+    ONNX_THREADS: int = 0  # onnxruntime intra-op threads (0 = onnxruntime default)
     
     # Scoring Weights (NEW FORMULA - skills and experience focused)
     SKILL_MATCH_WEIGHT: float = 0.40     # Skills are most important (40%)
@@ -59,15 +64,60 @@ class Settings(BaseSettings):
     MAX_FILES: int = 50
     ALLOWED_EXTENSIONS: List[str] = [".pdf", ".docx"]
     
+    # Startup
+    WARMUP_ON_STARTUP: bool = True  # Load models in a background thread at startup (else on first request); see /ready
+    SERVER_WORKERS: int = 1  # start_backend.py: >1 = prefork workers sharing models loaded once; 0 = one per core
+    SERVER_WORKER_THREADS: int = 0  # torch/onnxruntime threads per prefork worker (0 = cores / workers)
+    EMBEDDING_SERVICE_ENABLED: bool = False  # Prefork: one process runs the model for all workers, batching their encodes
+    EMBEDDING_SERVICE_SOCKET: str = ""  # Unix socket of the embedding service ("" = temp dir)
+    EMBEDDING_SERVICE_MAX_WAIT_MS: float = 5.0  # Longest a request waits for others to share its micro-batch
+    EMBEDDING_SERVICE_MAX_BATCH_TOKENS: int = 65536  # Queued tokens that flush a micro-batch without waiting
+    
+    # Process Pool (per-resume parsing/NLP/skill extraction off the event loop)
+    PROCESS_POOL_WORKERS: int = min(4, os.cpu_count() or 1)  # 0 = use a thread instead
+    PROCESS_POOL_START_METHOD: str = "spawn"  # Safe with torch/tokenizer threads in the parent
+    WORKER_TORCH_THREADS: int = 1  # torch intra-op threads per worker process
+    
+    # spaCy batch processing (NLPProcessor.analyze_batch)
+    SPACY_BATCH_SIZE: int = 32  # Documents per nlp.pipe batch
+    SPACY_N_PROCESS: int = 1  # nlp.pipe processes; >1 only outside pool workers
+    
+    # Background Jobs (POST /api/v1/jobs)
+    JOB_RETENTION_SECONDS: int = 3600  # Keep finished jobs this long for polling
+    
+    # Resume Cache (extracted text + features keyed by SHA-256 of file bytes)
+    RESUME_CACHE_SIZE: int = 512  # Entries kept in memory; disk tier is unbounded
+    
+    # Embedding Cache (model.encode results keyed by model fingerprint + text hash + chunking)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_SIZE: int = 4096  # Documents kept in memory; SQLite tier under PROCESSED_DIR is unbounded
+    
     # Database (SQLite for simplicity, can be upgraded to PostgreSQL)
     DATABASE_URL: str = f"sqlite:///{BASE_DIR}/resume_screening.db"
     
+    # Talent Pool Search (POST /api/v1/search)
+    VECTOR_STORE_ENABLED: bool = True  # Persist screened resumes' embeddings and features
+    VECTOR_STORE_DIR: Path = PROCESSED_DIR / "vector_store"  # Memmap vector files; metadata lives in DATABASE_URL
+    SEARCH_MAX_TOP_K: int = 100
+    ANN_ENABLED: bool = True  # IVF-PQ index for large pools (backend/core/ann_index.py)
+    ANN_MIN_POOL_SIZE: int = 100000  # Below this a brute-force scan is fast enough
+    ANN_NPROBE: int = 32  # Inverted lists scanned per query: the recall-versus-latency knob
+    ANN_RERANK_FACTOR: int = 8  # Candidates per result re-scored exactly against the stored vectors
+    ANN_SUBVECTORS: int = 48  # PQ bytes per vector (384 dims -> 8-dim subvectors)
+    ANN_TRAIN_SAMPLE: int = 100000  # Vectors sampled to train centroids and codebooks
+    ANN_RETRAIN_GROWTH: float = 4.0  # Rebuild once the pool is this many times its size at training
+    ANN_SNAPSHOT_EVERY: int = 10000  # Inserts between snapshots under VECTOR_STORE_DIR
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: Path = LOGS_DIR / "app.log"
     
     # Skills Database
     SKILLS_JSON_PATH: Path = SKILLS_DIR / "tech_skills.json"
+    SKILLS_RELOAD_INTERVAL: float = 5.0  # Seconds between taxonomy file change checks; 0 = no hot reload
+    KEYBERT_TOP_N: int = 50  # Keyphrases kept per document
+    KEYBERT_MAX_CANDIDATES: int = 300  # Candidate n-grams per document, most frequent first (bounds embedding + MMR cost)
+    FUZZY_MATCH_WORKERS: int = 1  # rapidfuzz cdist threads per resume-vs-JD match (-1 = all cores; matrices are small and workers already run in parallel)
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,260 @@
+"""
+Embedding Cache
+Caches sentence-transformer embeddings per (model, text, chunking params)
+so re-screening the same resumes or job descriptions skips model.encode
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import logging
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the text fed to the encoder or the stored format changes
+# so embeddings produced by older code are ignored
+EMBEDDING_CACHE_VERSION = "1"
+
+# SQLite host parameter limit is 999 on older builds
+_SQL_BATCH = 500
+
+
+def embedding_key(model_id: str, text: str, params: str) -> str:
+    """
+    Cache key for one text
+    
+    Args:
+        model_id: Fingerprint of the model that produced the embedding
+        text: Encoded document text
+        params: How the text was turned into encoder inputs (e.g. chunking)
+    """
+    text_hash = hashlib.sha256(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+    payload = f"{EMBEDDING_CACHE_VERSION}\0{model_id}\0{params}\0{text_hash}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache
+    
+    1. In-memory LRU (bounded by max_entries)
+    2. SQLite table of float32 blobs, shared across restarts and processes
+    
+    Values are (rows, dim) float32 matrices: one row for a full-document
+    embedding, one row per chunk for chunked encodings. Rows remember the
+    model fingerprint they were produced by, so entries from a retrained
+    model can be purged (see purge_models).
+    """
+    
+    def __init__(
+        self,
+        db_path: Optional[Path],
+        max_entries: int = 4096
+    ):
+        self.db_path = Path(db_path) if db_path is not None else None
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        
+        if self.db_path is not None:
+            self._open_disk()
+    
+    def reopen(self):
+        """
+        Reconnect the SQLite tier in a forked child
+        The inherited connection belongs to the parent and must not be used (or closed) here
+        """
+        self._lock = threading.Lock()
+        self._conn = None
+        if self.db_path is not None:
+            self._open_disk()
+    
+    def _open_disk(self):
+        """Open the SQLite tier; on failure the cache runs memory-only"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            # WAL lets several server processes read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model_id TEXT NOT NULL, "
+                "rows INTEGER NOT NULL, dim INTEGER NOT NULL, "
+                "vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_model ON embeddings (model_id)")
+            conn.commit()
+            self._conn = conn
+        except Exception as e:
+            logger.warning(f"Embedding cache disk tier disabled ({self.db_path}): {e}")
+            self._conn = None
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up several embeddings at once
+        
+        Returns:
+            key -> (rows, dim) matrix for every key that was found
+        """
+        found: Dict[str, np.ndarray] = {}
+        wanted = list(dict.fromkeys(keys))
+        
+        with self._lock:
+            for key in wanted:
+                value = self._memory.get(key)
+                if value is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = value
+            self.memory_hits += len(found)
+        
+        remaining = [key for key in wanted if key not in found]
+        if remaining:
+            from_disk = self._read_disk(remaining)
+            with self._lock:
+                for key, value in from_disk.items():
+                    self._remember(key, value)
+                self.disk_hits += len(from_disk)
+                self.misses += len(remaining) - len(from_disk)
+            found.update(from_disk)
+        
+        return found
+    
+    def put_many(self, model_id: str, values: Dict[str, np.ndarray]):
+        """Store (rows, dim) matrices produced by model_id in memory and on disk"""
+        if not values:
+            return
+        values = {
+            key: np.ascontiguousarray(np.atleast_2d(value), dtype=np.float32)
+            for key, value in values.items()
+        }
+        
+        with self._lock:
+            for key, value in values.items():
+                self._remember(key, value)
+        
+        self._write_disk(model_id, values)
+    
+    def purge_models(self, keep_model_id: str, prefix: str = ""):
+        """
+        Delete disk entries of models starting with prefix, except keep_model_id
+        and its variants ("<keep_model_id>+int8")
+        Used when a custom model is retrained: its old embeddings are never valid again
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._conn is None:
+                return
+            try:
+                cursor = self._conn.execute(
+                    "DELETE FROM embeddings WHERE model_id LIKE ? AND model_id != ? "
+                    "AND substr(model_id, 1, ?) != ?",
+                    (f"{prefix}%", keep_model_id, len(keep_model_id) + 1, f"{keep_model_id}+")
+                )
+                self._conn.commit()
+                if cursor.rowcount:
+                    logger.info(f"Purged {cursor.rowcount} cached embeddings of stale models")
+            except Exception as e:
+                logger.warning(f"Could not purge stale embeddings: {e}")
+    
+    def clear(self):
+        """Drop the in-memory tier (disk entries are kept)"""
+        with self._lock:
+            self._memory.clear()
+    
+    def stats(self) -> Dict:
+        """Cache hit/miss counters"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            stats = {
+                'entries_in_memory': len(self._memory),
+                'max_entries': self.max_entries,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'hits': hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'entries_on_disk': None,
+                'version': EMBEDDING_CACHE_VERSION
+            }
+            if self._conn is not None:
+                try:
+                    stats['entries_on_disk'] = self._conn.execute(
+                        "SELECT COUNT(*) FROM embeddings"
+                    ).fetchone()[0]
+                except Exception as e:
+                    logger.warning(f"Could not count cached embeddings: {e}")
+        return stats
+    
+    def _remember(self, key: str, value: np.ndarray):
+        """Insert into the LRU, evicting the oldest entries (lock held)"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if self._conn is None:
+            return {}
+        
+        found = {}
+        try:
+            with self._lock:
+                for start in range(0, len(keys), _SQL_BATCH):
+                    batch = keys[start:start + _SQL_BATCH]
+                    rows = self._conn.execute(
+                        f"SELECT key, rows, dim, vector FROM embeddings "
+                        f"WHERE key IN ({','.join('?' * len(batch))})",
+                        batch
+                    ).fetchall()
+                    for key, n_rows, dim, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).reshape(n_rows, dim)
+        except Exception as e:
+            logger.warning(f"Could not read cached embeddings: {e}")
+        return found
+    
+    def _write_disk(self, model_id: str, values: Dict[str, np.ndarray]):
+        if self._conn is None:
+            return
+        
+        now = time.time()
+        rows = [
+            (key, model_id, value.shape[0], value.shape[1], value.tobytes(), now)
+            for key, value in values.items()
+        ]
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings "
+                    "(key, model_id, rows, dim, vector, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Could not persist {len(rows)} cached embeddings: {e}")
+
+
+# Singleton instance
+_embedding_cache = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create embedding cache singleton"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            settings.PROCESSED_DIR / "embedding_cache.sqlite3",
+            max_entries=settings.EMBEDDING_CACHE_SIZE
+        )
+    return _embedding_cache
@@ -0,0 +1,306 @@
+"""
+Embedding Service
+One process runs the sentence-transformer for every prefork worker.
+Workers tokenize locally and hand token ids to the service over a Unix
+socket; the service coalesces requests from all workers into length-sorted
+micro-batches (flushed once large enough or after a max wait) and writes
+the embeddings back into the requesting worker's shared-memory buffer.
+
+Only small headers cross the socket:
+    worker -> service: ('encode', shm_name, n_sequences, n_tokens) | ('stats',)
+    service -> worker: ('ok', rows, dim) | ('stats', {...}) | ('error', message)
+A request buffer holds n_sequences int32 lengths followed by n_tokens
+int32 token ids; the reply overwrites it with (rows, dim) float32 embeddings.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from multiprocessing import Pipe, shared_memory
+from multiprocessing.connection import Client, Listener, wait
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import logging
+
+from backend.core.encode_scheduler import EncodeScheduler, EncodeStats
+
+logger = logging.getLogger(__name__)
+
+# Smallest shared-memory buffer a worker connection allocates (grown in powers of two)
+MIN_BUFFER_BYTES = 1 << 20
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a worker's buffer; the worker created it and is the one to unlink it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # Older Pythons register attachments too, and would unlink the buffer when this process exits
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class _Request:
+    """One worker's encode request, waiting for its micro-batch"""
+    
+    def __init__(self, conn, shm: shared_memory.SharedMemory, n_sequences: int, n_tokens: int):
+        self.conn = conn
+        self.shm = shm
+        lengths = np.ndarray((n_sequences,), dtype=np.int32, buffer=shm.buf)
+        ids = np.ndarray((n_tokens,), dtype=np.int32, buffer=shm.buf, offset=4 * n_sequences)
+        self.token_ids = np.split(ids.copy(), np.cumsum(lengths)[:-1]) if n_sequences else []
+        self.n_tokens = n_tokens
+        self.arrived = time.monotonic()
+
+
+class EmbeddingService:
+    """
+    Serve EncodeScheduler.encode_token_ids to many worker processes
+    
+    Requests are queued until the oldest has waited max_wait seconds or
+    max_batch_tokens tokens are queued, then encoded together; the
+    scheduler sorts every sequence of every request by length, so requests
+    from different workers share padded batches.
+    """
+    
+    def __init__(self, scheduler: EncodeScheduler, address: str, max_wait: float, max_batch_tokens: int):
+        self.scheduler = scheduler
+        self.address = address
+        self.max_wait = max_wait
+        self.max_batch_tokens = max_batch_tokens
+        self._connections = []
+        self._buffers: Dict[object, shared_memory.SharedMemory] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._listener: Optional[Listener] = None
+        # Wakes the encode loop when a worker connects or stop() is called
+        self._wakeup_reader, self._wakeup_writer = Pipe(duplex=False)
+        self.requests = 0
+        self.flushes = 0
+        self.wait_seconds = 0.0
+    
+    def serve_forever(self):
+        """Accept workers and encode their requests until stop()"""
+        self._listener = Listener(self.address, family='AF_UNIX', backlog=128)
+        threading.Thread(target=self._accept_loop, name="embedding-accept", daemon=True).start()
+        logger.info(f"Embedding service listening on {self.address}")
+        
+        pending: List[_Request] = []
+        while not self._stopped.is_set():
+            timeout = max(0.0, pending[0].arrived + self.max_wait - time.monotonic()) if pending else None
+            with self._lock:
+                connections = list(self._connections)
+            for conn in wait(connections + [self._wakeup_reader], timeout):
+                if conn is self._wakeup_reader:
+                    conn.recv_bytes()
+                    continue
+                request = self._receive(conn)
+                if request is not None:
+                    pending.append(request)
+            
+            if pending and (
+                sum(request.n_tokens for request in pending) >= self.max_batch_tokens
+                or time.monotonic() >= pending[0].arrived + self.max_wait
+            ):
+                self._flush(pending)
+                pending = []
+        
+        for conn in list(self._buffers):
+            self._drop(conn)
+    
+    def stop(self):
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.close()
+        self._wakeup_writer.send_bytes(b'')
+    
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return  # Listener closed by stop()
+            with self._lock:
+                self._connections.append(conn)
+            self._wakeup_writer.send_bytes(b'')
+    
+    def _receive(self, conn) -> Optional[_Request]:
+        """Read one message; answer it directly unless it is an encode request"""
+        try:
+            message = conn.recv()
+            if message[0] == 'stats':
+                conn.send(('stats', self.stats()))
+                return None
+            _, name, n_sequences, n_tokens = message
+            shm = self._buffers.get(conn)
+            if shm is None or shm.name != name:
+                if shm is not None:
+                    shm.close()
+                shm = self._buffers[conn] = _attach(name)
+            return _Request(conn, shm, n_sequences, n_tokens)
+        except (EOFError, OSError):
+            self._drop(conn)
+            return None
+    
+    def _flush(self, pending: List[_Request]):
+        """Encode every queued request in one scheduler call and reply to each"""
+        # Requests of workers that went away while queued (their buffer is closed)
+        pending = [request for request in pending if self._buffers.get(request.conn) is request.shm]
+        if not pending:
+            return
+        start = time.monotonic()
+        try:
+            embeddings = self.scheduler.encode_token_ids(
+                [ids for request in pending for ids in request.token_ids], normalize_embeddings=False
+            )
+        except Exception as e:
+            logger.error(f"Embedding service batch failed: {e}")
+            for request in pending:
+                self._reply(request.conn, ('error', str(e)))
+            return
+        
+        self.requests += len(pending)
+        self.flushes += 1
+        self.wait_seconds += sum(start - request.arrived for request in pending)
+        offset = 0
+        for request in pending:
+            rows = len(request.token_ids)
+            try:
+                out = np.ndarray((rows, embeddings.shape[1]), dtype=np.float32, buffer=request.shm.buf)
+                out[:] = embeddings[offset:offset + rows]
+                del out
+            except (TypeError, ValueError) as e:
+                # Only this worker's buffer is unusable; the others still get their rows
+                logger.error(f"Dropping embedding service client: {e}")
+                self._drop(request.conn)
+                continue
+            finally:
+                offset += rows
+            self._reply(request.conn, ('ok', rows, embeddings.shape[1]))
+    
+    def _reply(self, conn, message: Tuple):
+        try:
+            conn.send(message)
+        except (EOFError, OSError):
+            self._drop(conn)
+    
+    def _drop(self, conn):
+        """Forget a worker connection (closed, or its worker exited)"""
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        shm = self._buffers.pop(conn, None)
+        if shm is not None:
+            shm.close()
+        conn.close()
+    
+    def stats(self) -> Dict:
+        """Requests coalesced per micro-batch and queueing delay, plus the scheduler's counters"""
+        return {
+            'workers_connected': len(self._connections),
+            'requests': self.requests,
+            'micro_batches': self.flushes,
+            'avg_requests_per_batch': round(self.requests / self.flushes, 2) if self.flushes else 0.0,
+            'avg_wait_ms': round(self.wait_seconds / self.requests * 1000, 2) if self.requests else 0.0,
+            'encoding': self.scheduler.stats.stats()
+        }
+
+
+class RemoteEncodeScheduler(EncodeScheduler):
+    """
+    EncodeScheduler whose model passes run in the embedding service
+    
+    Tokenization stays in the calling process; each thread borrows a
+    connection with its own shared-memory buffer. While the service is
+    unreachable, inputs are encoded locally with the backend's model.
+    """
+    
+    def __init__(self, address: str, backend, token_budget: int, max_batch_size: int, stats: Optional[EncodeStats] = None):
+        super().__init__(backend, token_budget, max_batch_size, stats)
+        self.address = address
+        self._idle: "queue.LifoQueue[Tuple]" = queue.LifoQueue()
+    
+    def encode_token_ids(self, token_ids: List[List[int]], normalize_embeddings: bool = True) -> np.ndarray:
+        """(len(token_ids), dim) float32 embeddings, computed by the service"""
+        if not token_ids:
+            return super().encode_token_ids(token_ids, normalize_embeddings)
+        try:
+            embeddings = self._encode_remote(token_ids)
+        except (EOFError, OSError) as e:
+            logger.warning(f"Embedding service unavailable ({e}); encoding in this process")
+            return super().encode_token_ids(token_ids, normalize_embeddings)
+        
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+    
+    def service_stats(self) -> Dict:
+        """EmbeddingService.stats() of the service process"""
+        conn, shm = self._checkout(0)
+        reply = self._call(conn, shm, ('stats',))
+        return reply[1]
+    
+    def close(self):
+        """Close idle connections and free their buffers (worker shutdown)"""
+        while True:
+            try:
+                conn, shm = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn, shm)
+
+    def _encode_remote(self, token_ids: List[List[int]]) -> np.ndarray:
+        lengths = np.fromiter((len(ids) for ids in token_ids), dtype=np.int32, count=len(token_ids))
+        n_sequences, n_tokens = len(token_ids), int(lengths.sum())
+        dim = self.backend.get_sentence_embedding_dimension()
+        conn, shm = self._checkout(4 * max(n_sequences + n_tokens, n_sequences * dim))
+        
+        np.ndarray((n_sequences,), dtype=np.int32, buffer=shm.buf)[:] = lengths
+        np.ndarray((n_tokens,), dtype=np.int32, buffer=shm.buf, offset=4 * n_sequences)[:] = np.fromiter(
+            itertools.chain.from_iterable(token_ids), dtype=np.int32, count=n_tokens
+        )
+        reply = self._call(conn, shm, ('encode', shm.name, n_sequences, n_tokens), release=False)
+        try:
+            if reply[0] == 'error':
+                raise RuntimeError(f"Embedding service failed: {reply[1]}")
+            _, rows, dim = reply
+            # Copied out: the buffer is reused by this connection's next request
+            return np.ndarray((rows, dim), dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            self._idle.put((conn, shm))
+    
+    def _call(self, conn, shm, message: Tuple, release: bool = True) -> Tuple:
+        """Send one message and wait for the reply; a broken connection is discarded"""
+        try:
+            conn.send(message)
+            reply = conn.recv()
+        except BaseException:
+            self._discard(conn, shm)
+            raise
+        if release:
+            self._idle.put((conn, shm))
+        return reply
+    
+    def _checkout(self, size: int) -> Tuple:
+        """An idle (connection, buffer) pair with a buffer of at least size bytes"""
+        try:
+            conn, shm = self._idle.get_nowait()
+        except queue.Empty:
+            conn, shm = Client(self.address, family='AF_UNIX'), None
+        if shm is None or shm.size < size:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            capacity = MIN_BUFFER_BYTES
+            while capacity < size:
+                capacity *= 2
+            shm = shared_memory.SharedMemory(create=True, size=capacity)
+        return conn, shm
+    
+    def _discard(self, conn, shm: shared_memory.SharedMemory):
+        conn.close()
+        shm.close()
+        shm.unlink()
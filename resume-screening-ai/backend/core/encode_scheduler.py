@@ -0,0 +1,214 @@
+"""
+Encoding Scheduler
+Token-length-bucketed batching for sentence-transformer inference: inputs
+are tokenized once, sorted by token count and cut into batches that fit a
+padded-token budget, so short texts are never padded to a long one
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def pad_token_ids(token_ids: Sequence[Sequence[int]], pad_token_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(input_ids, attention_mask) int64 matrices, right-padded to the longest row"""
+    width = max((len(ids) for ids in token_ids), default=0)
+    input_ids = np.full((len(token_ids), width), pad_token_id, dtype=np.int64)
+    attention_mask = np.zeros((len(token_ids), width), dtype=np.int64)
+    for row, ids in enumerate(token_ids):
+        input_ids[row, :len(ids)] = ids
+        attention_mask[row, :len(ids)] = 1
+    return input_ids, attention_mask
+
+
+class TorchTokenBackend:
+    """
+    Token-level access to a loaded SentenceTransformer
+
+    token_ids() mirrors SentenceTransformer.encode (stripped, optionally
+    lower-cased, truncated to max_seq_length); embed() runs every module,
+    so pooling and normalization are the model's own.
+    """
+
+    def __init__(self, model):
+        transformer = model[0]
+        self.model = model
+        self.tokenizer = transformer.tokenizer
+        self.max_seq_length = model.max_seq_length
+        self.window_stride = self.max_seq_length // 2
+        self.do_lower_case = bool(getattr(transformer, 'do_lower_case', False))
+        self.pad_token_id = self.tokenizer.pad_token_id
+        self.uses_token_type_ids = 'token_type_ids' in self.tokenizer.model_input_names
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def token_ids(self, texts: List[str]) -> List[List[int]]:
+        """Token ids with special tokens, truncated to max_seq_length, unpadded"""
+        return self.tokenizer(self._prepare(texts), truncation=True, max_length=self.max_seq_length)['input_ids']
+    
+    def window_token_ids(self, texts: List[str]) -> List[List[List[int]]]:
+        """
+        Every token of each text, as max_seq_length windows with special tokens
+        Consecutive windows share window_stride tokens
+        """
+        encoded = self.tokenizer(
+            self._prepare(texts), truncation=True, max_length=self.max_seq_length,
+            stride=self.window_stride, return_overflowing_tokens=True
+        )
+        windows = [[] for _ in texts]
+        for ids, owner in zip(encoded['input_ids'], encoded['overflow_to_sample_mapping']):
+            windows[owner].append(ids)
+        return windows
+    
+    def _prepare(self, texts: List[str]) -> List[str]:
+        """Strip (and lower-case) like SentenceTransformer.encode"""
+        texts = [str(text).strip() for text in texts]
+        if self.do_lower_case:
+            texts = [text.lower() for text in texts]
+        return texts
+
+    def embed(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Sentence embeddings of one padded batch"""
+        import torch
+
+        device = self.model.device
+        features = {
+            'input_ids': torch.from_numpy(input_ids).to(device),
+            'attention_mask': torch.from_numpy(attention_mask).to(device)
+        }
+        if self.uses_token_type_ids:
+            features['token_type_ids'] = torch.zeros_like(features['input_ids'])
+        with torch.inference_mode():
+            embeddings = self.model.forward(features)['sentence_embedding']
+        return embeddings.float().cpu().numpy()
+
+
+def token_backend_for(encoder):
+    """Token-level backend of an encoder (None if it only offers encode())"""
+    if hasattr(encoder, 'token_ids') and hasattr(encoder, 'embed'):
+        return encoder  # OnnxSentenceEncoder
+    try:
+        if not getattr(encoder[0].tokenizer, 'is_fast', False):
+            raise ValueError("token windows need a fast (tokenizers) tokenizer")
+        return TorchTokenBackend(encoder)
+    except Exception as e:
+        logger.warning(f"Bucketed encoding unavailable for {type(encoder).__name__}: {e}")
+        return None
+
+
+class EncodeStats:
+    """Thread-safe counters of tokens actually encoded vs tokens padded"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.texts = 0
+        self.batches = 0
+        self.tokens = 0
+        self.padded_tokens = 0
+        self.seconds = 0.0
+
+    def record(self, texts: int, batches: int, tokens: int, padded_tokens: int, seconds: float):
+        with self._lock:
+            self.texts += texts
+            self.batches += batches
+            self.tokens += tokens
+            self.padded_tokens += padded_tokens
+            self.seconds += seconds
+
+    def stats(self) -> Dict:
+        """Totals, padding ratio (padding share of computed tokens) and throughput"""
+        with self._lock:
+            return {
+                'texts': self.texts,
+                'batches': self.batches,
+                'tokens': self.tokens,
+                'padded_tokens': self.padded_tokens,
+                'padding_ratio': round(1 - self.tokens / self.padded_tokens, 4) if self.padded_tokens else 0.0,
+                'tokens_per_second': round(self.tokens / self.seconds, 1) if self.seconds else 0.0,
+                'avg_batch_size': round(self.texts / self.batches, 2) if self.batches else 0.0,
+                'encode_seconds': round(self.seconds, 3)
+            }
+
+
+class EncodeScheduler:
+    """
+    Encode through a token backend in length-sorted, token-budgeted batches
+
+    Inputs are sorted longest first and taken greedily while
+    rows x longest row stays within token_budget (at most max_batch_size
+    rows), so batches of short texts are wide and batches of long ones
+    narrow. Embeddings come back in input order.
+    """
+
+    def __init__(self, backend, token_budget: int, max_batch_size: int, stats: Optional[EncodeStats] = None):
+        self.backend = backend
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.stats = stats if stats is not None else EncodeStats()
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        """
+        (len(texts), dim) float32 embeddings
+
+        Extra SentenceTransformer.encode keyword arguments (batch_size,
+        show_progress_bar, ...) are accepted and ignored, so a scheduler can
+        stand in for the model, e.g. as KeyBERT's encoder.
+        """
+        return self.encode_token_ids(self.backend.token_ids(texts), normalize_embeddings)
+
+    def encode_windows(self, texts: List[str], normalize_embeddings: bool = True) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Embeddings of every token window of each text, from one tokenization
+        
+        Returns:
+            Per text, (n_windows, dim) embeddings and the (n_windows,) token counts
+        """
+        windows = self.backend.window_token_ids(texts)
+        flat = [ids for text_windows in windows for ids in text_windows]
+        embeddings = self.encode_token_ids(flat, normalize_embeddings)
+        bounds = np.cumsum([0] + [len(text_windows) for text_windows in windows])
+        lengths = np.array([len(ids) for ids in flat])
+        return (
+            [embeddings[bounds[i]:bounds[i + 1]] for i in range(len(texts))],
+            [lengths[bounds[i]:bounds[i + 1]] for i in range(len(texts))]
+        )
+    
+    def encode_token_ids(self, token_ids: List[List[int]], normalize_embeddings: bool = True) -> np.ndarray:
+        """(len(token_ids), dim) float32 embeddings of already tokenized inputs"""
+        embeddings = np.empty((len(token_ids), self.backend.get_sentence_embedding_dimension()), dtype=np.float32)
+        if not token_ids:
+            return embeddings
+
+        start = time.perf_counter()
+        lengths = np.array([len(ids) for ids in token_ids])
+        order = np.argsort(-lengths, kind='stable')
+        batches = self._batches(lengths[order])
+        padded = 0
+        for begin, end in batches:
+            rows = order[begin:end]
+            input_ids, attention_mask = pad_token_ids([token_ids[i] for i in rows], self.backend.pad_token_id)
+            embeddings[rows] = self.backend.embed(input_ids, attention_mask)
+            padded += input_ids.size
+
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        self.stats.record(len(token_ids), len(batches), int(lengths.sum()), padded, time.perf_counter() - start)
+        return embeddings
+
+    def _batches(self, sorted_lengths: np.ndarray) -> List[Tuple[int, int]]:
+        """[begin, end) ranges over lengths sorted longest first"""
+        batches = []
+        begin = 0
+        while begin < len(sorted_lengths):
+            # The first row is the widest, so it fixes the padded width
+            width = max(int(sorted_lengths[begin]), 1)
+            size = max(1, min(self.max_batch_size, self.token_budget // width))
+            end = min(begin + size, len(sorted_lengths))
+            batches.append((begin, end))
+            begin = end
+        return batches
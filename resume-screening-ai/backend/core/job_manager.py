@@ -0,0 +1,230 @@
+"""
+Background Screening Jobs
+Registry of asynchronous batch jobs and their progress, kept in the
+DATABASE_URL database so every server worker can answer a poll
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import JSON, Column, Float, Integer, MetaData, String, Table, Text, create_engine, select
+
+from backend.core.config import settings
+from backend.core.ml_engine_enhanced import EnhancedMLEngine
+from backend.core.screening import build_job_profile, iter_screening_results
+from backend.core.worker_pool import run_in_thread
+from backend.utils.skill_extractor import SkillExtractor
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+# One row per job; written only by the worker process running it
+screening_jobs = Table(
+    'screening_jobs',
+    metadata,
+    Column('job_id', String(36), primary_key=True),
+    Column('status', String(16), nullable=False),
+    Column('total_files', Integer, nullable=False),
+    Column('processed_files', Integer, nullable=False),
+    Column('error', Text),
+    Column('created_at', Float, nullable=False),
+    Column('finished_at', Float, index=True),
+)
+
+# Scored candidates of a job, in completion order
+screening_job_results = Table(
+    'screening_job_results',
+    metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('job_id', String(36), nullable=False, index=True),
+    Column('candidate', JSON, nullable=False),
+)
+
+
+class ScreeningJob:
+    """
+    State of one background screening job
+    
+    status: pending -> processing -> completed | failed
+    """
+    
+    def __init__(self, total_files: int, job_id: Optional[str] = None):
+        self.job_id = job_id or str(uuid.uuid4())
+        self.status = "pending"
+        self.total_files = total_files
+        self.processed_files = 0
+        self.results: List[Dict] = []
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+    
+    @classmethod
+    def from_row(cls, row, results: List[Dict]) -> 'ScreeningJob':
+        job = cls(row['total_files'], row['job_id'])
+        job.status = row['status']
+        job.processed_files = row['processed_files']
+        job.results = list(results)
+        job.error = row['error']
+        job.created_at = row['created_at']
+        job.finished_at = row['finished_at']
+        return job
+    
+    @property
+    def progress_percentage(self) -> float:
+        if self.total_files == 0:
+            return 100.0
+        return round(self.processed_files / self.total_files * 100, 1)
+    
+    @property
+    def processing_time(self) -> float:
+        end = self.finished_at or time.time()
+        return round(end - self.created_at, 2)
+    
+    def to_status(self) -> Dict:
+        """Serialize for BatchProcessingStatus (results are ranked, possibly partial)"""
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'total_files': self.total_files,
+            'processed_files': self.processed_files,
+            'progress_percentage': self.progress_percentage,
+            'results': sorted(self.results, key=lambda x: x.get('final_score', 0), reverse=True),
+            'error': self.error,
+            'processing_time': self.processing_time
+        }
+
+
+class JobManager:
+    """
+    Creates background screening jobs and keeps them for JOB_RETENTION_SECONDS
+    
+    A job runs in the process that accepted it; its status and results
+    are written to the database as they change, so a poll answered by any
+    worker sees the same progress. A job whose worker died stays in
+    'processing' until it expires.
+    """
+    
+    def __init__(self, database_url: str, retention_seconds: int = 3600):
+        self.db = create_engine(database_url, future=True)
+        metadata.create_all(self.db)
+        self.retention_seconds = retention_seconds
+        # Jobs running in this process; the event loop only keeps weak references to tasks
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    async def submit(
+        self,
+        uploads: List[Tuple[str, bytes]],
+        job_description: str,
+        ml_engine: EnhancedMLEngine,
+        skill_extractor: SkillExtractor
+    ) -> ScreeningJob:
+        """
+        Register a job and start processing it in the background
+        
+        Must be called from the event loop.
+        """
+        job = ScreeningJob(total_files=len(uploads))
+        await run_in_thread(self._create, job)
+        
+        task = asyncio.create_task(
+            self._run(job.job_id, uploads, job_description, ml_engine, skill_extractor)
+        )
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+        logger.info(f"Submitted job {job.job_id} with {job.total_files} files")
+        return job
+    
+    def get(self, job_id: str) -> Optional[ScreeningJob]:
+        """Current state of a job submitted to any worker (blocking: database read)"""
+        with self.db.connect() as conn:
+            row = conn.execute(
+                select(screening_jobs).where(screening_jobs.c.job_id == job_id)
+            ).mappings().first()
+            if row is None:
+                return None
+            results = conn.execute(
+                select(screening_job_results.c.candidate)
+                .where(screening_job_results.c.job_id == job_id)
+                .order_by(screening_job_results.c.id)
+            ).scalars().all()
+        return ScreeningJob.from_row(row, results)
+    
+    def _create(self, job: ScreeningJob):
+        self._purge_expired()
+        with self.db.begin() as conn:
+            conn.execute(screening_jobs.insert().values(
+                job_id=job.job_id,
+                status=job.status,
+                total_files=job.total_files,
+                processed_files=0,
+                created_at=job.created_at
+            ))
+    
+    def _update(self, job_id: str, values: Dict):
+        with self.db.begin() as conn:
+            conn.execute(screening_jobs.update().where(screening_jobs.c.job_id == job_id).values(**values))
+    
+    def _record(self, job_id: str, candidate: Optional[Dict]):
+        """Count one processed file and store its candidate (None: not a resume)"""
+        with self.db.begin() as conn:
+            conn.execute(
+                screening_jobs.update().where(screening_jobs.c.job_id == job_id)
+                .values(processed_files=screening_jobs.c.processed_files + 1)
+            )
+            if candidate is not None:
+                conn.execute(screening_job_results.insert().values(job_id=job_id, candidate=candidate))
+    
+    async def _run(
+        self,
+        job_id: str,
+        uploads: List[Tuple[str, bytes]],
+        job_description: str,
+        ml_engine: EnhancedMLEngine,
+        skill_extractor: SkillExtractor
+    ):
+        status, error = "completed", None
+        candidates = 0
+        try:
+            await run_in_thread(self._update, job_id, {'status': "processing"})
+            job_profile = await run_in_thread(
+                build_job_profile, job_description, ml_engine, skill_extractor
+            )
+            
+            async for _, candidate in iter_screening_results(
+                uploads, job_profile, ml_engine, skill_extractor
+            ):
+                await run_in_thread(self._record, job_id, candidate)
+                candidates += candidate is not None
+            
+            logger.info(f"Job {job_id} completed: {candidates} candidates")
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error(f"Job {job_id} failed: {e}")
+        
+        await run_in_thread(
+            self._update, job_id, {'status': status, 'error': error, 'finished_at': time.time()}
+        )
+    
+    def _purge_expired(self):
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        with self.db.begin() as conn:
+            expired = select(screening_jobs.c.job_id).where(screening_jobs.c.finished_at < cutoff)
+            conn.execute(screening_job_results.delete().where(screening_job_results.c.job_id.in_(expired)))
+            conn.execute(screening_jobs.delete().where(screening_jobs.c.finished_at < cutoff))
+
+
+# Singleton instance
+_job_manager = None
+
+
+def get_job_manager() -> JobManager:
+    """Get or create job manager singleton"""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(settings.DATABASE_URL, retention_seconds=settings.JOB_RETENTION_SECONDS)
+    return _job_manager
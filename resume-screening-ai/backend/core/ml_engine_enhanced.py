@@ -8,16 +8,159 @@ import torch
 from sentence_transformers import SentenceTransformer, InputExample, losses, evaluation
 from torch.utils.data import DataLoader
 from typing import List, Dict, Tuple, Optional
+from rapidfuzz import fuzz, process
 import logging
 from pathlib import Path
 import json
+import re
 from datetime import datetime
 
 from backend.core.config import settings
+from backend.core.embedding_cache import EmbeddingCache, embedding_key, get_embedding_cache
+from backend.core.encode_scheduler import EncodeScheduler, EncodeStats, token_backend_for
+from backend.core.embedding_service import RemoteEncodeScheduler
+from backend.core.onnx_encoder import load_onnx_encoder
 
 logger = logging.getLogger(__name__)
 
 
+# Seniority terms shared by job description and resume checks
+SENIOR_TERMS = ['senior', 'lead', 'principal', 'staff', 'architect']
+
+# Keyword patterns (capitalized words, acronyms, C++/Node.js style terms, common tech)
+KEYWORD_PATTERN = re.compile(r'\b[A-Z][a-z]+\b|\b[A-Z]{2,}\b|[a-zA-Z]+\+\+|[a-zA-Z]+\.js')
+TECHNICAL_TERMS_PATTERN = re.compile(
+    r'\b(?:python|java|react|django|flask|fastapi|aws|azure|gcp|docker|kubernetes|sql|api|rest|graphql|git|ci/cd|microservices|redis|postgresql|mongodb|machine learning|deep learning|nlp|tensorflow|pytorch)\b'
+)
+REQUIRED_YEARS_PATTERN = re.compile(r'(\d+)\+?\s*years?\s+(?:of\s+)?experience')
+
+
+# Words per chunk_text chunk (consecutive chunks overlap by half)
+CHUNK_MAX_LENGTH = 200
+
+
+def chunk_text(text: str, max_length: int = CHUNK_MAX_LENGTH) -> List[str]:
+    """Split text into overlapping word chunks"""
+    words = text.split()
+    chunks = []
+    for i in range(0, len(words), max_length // 2):
+        chunk = ' '.join(words[i:i + max_length])
+        if chunk.strip():
+            chunks.append(chunk)
+    return chunks if chunks else [text]
+
+
+def pool_chunk_embeddings(chunk_embeddings: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Normalized document embedding: chunk embeddings averaged by chunk length"""
+    pooled = np.asarray(lengths, dtype=np.float32) @ chunk_embeddings
+    return pooled / max(float(np.linalg.norm(pooled)), 1e-12)
+
+
+def extract_keywords(text: str) -> set:
+    """Extract important keywords (capitalized, technical terms)"""
+    words = set(KEYWORD_PATTERN.findall(text))
+    technical = set(TECHNICAL_TERMS_PATTERN.findall(text.lower()))
+    return words.union(technical)
+
+
+def detect_required_seniority(job_description: str) -> str:
+    """Detect the seniority level a job description asks for"""
+    jd_lower = job_description.lower()
+    if 'senior' in jd_lower or 'lead' in jd_lower or 'principal' in jd_lower:
+        return 'Senior'
+    elif 'mid-level' in jd_lower or 'intermediate' in jd_lower:
+        return 'Mid-Level'
+    elif 'junior' in jd_lower:
+        return 'Junior'
+    return 'Entry Level'
+
+
+def extract_required_years(job_description: str, default: float = 3.0) -> float:
+    """Extract required years of experience from a job description"""
+    match = REQUIRED_YEARS_PATTERN.search(job_description.lower())
+    return float(match.group(1)) if match else default
+
+
+# Skill importance weights (critical skills get higher weight)
+ENGINE_SKILL_WEIGHTS = {
+    # Programming Languages (HIGH PRIORITY)
+    'python': 1.5, 'java': 1.5, 'javascript': 1.5, 'typescript': 1.5,
+    'c++': 1.5, 'c#': 1.5, 'go': 1.5, 'rust': 1.5, 'kotlin': 1.5,
+    
+    # Frameworks (CRITICAL)
+    'django': 1.5, 'flask': 1.5, 'fastapi': 1.5, 'spring': 1.5,
+    'react': 1.5, 'angular': 1.5, 'vue': 1.5, 'node.js': 1.5,
+    'express': 1.5, '.net': 1.5, 'asp.net': 1.5,
+    
+    # Databases (HIGH PRIORITY)
+    'postgresql': 1.3, 'mysql': 1.3, 'mongodb': 1.3, 'redis': 1.3,
+    'oracle': 1.3, 'sql server': 1.3, 'cassandra': 1.3, 'dynamodb': 1.3,
+    
+    # Cloud & DevOps (HIGH PRIORITY)
+    'aws': 1.3, 'azure': 1.3, 'gcp': 1.3, 'docker': 1.3,
+    'kubernetes': 1.3, 'k8s': 1.3, 'terraform': 1.3, 'jenkins': 1.3,
+    'ci/cd': 1.3, 'gitlab': 1.3, 'github actions': 1.3,
+    
+    # Data Science/ML (HIGH PRIORITY for ML roles)
+    'tensorflow': 1.4, 'pytorch': 1.4, 'scikit-learn': 1.4,
+    'pandas': 1.4, 'numpy': 1.4, 'keras': 1.4, 'machine learning': 1.4,
+    'deep learning': 1.4, 'nlp': 1.4, 'computer vision': 1.4,
+    
+    # API & Architecture (MEDIUM PRIORITY)
+    'rest api': 1.2, 'graphql': 1.2, 'microservices': 1.2,
+    'api': 1.2, 'restful': 1.2, 'grpc': 1.2, 'soap': 1.2,
+    
+    # Version Control (STANDARD)
+    'git': 1.0, 'github': 1.0, 'gitlab': 1.0, 'bitbucket': 1.0,
+    
+    # Testing (MEDIUM PRIORITY)
+    'pytest': 1.2, 'unittest': 1.2, 'jest': 1.2, 'junit': 1.2,
+    'selenium': 1.2, 'cypress': 1.2, 'testing': 1.2,
+    
+    # Other skills (STANDARD)
+    'default': 1.0
+}
+
+
+# Skill synonyms
+ENGINE_SKILL_SYNONYMS = {
+    'javascript': ['js', 'node', 'nodejs'],
+    'typescript': ['ts'],
+    'kubernetes': ['k8s'],
+    'postgresql': ['postgres', 'psql'],
+    'mongodb': ['mongo'],
+}
+
+
+class JobProfile:
+    """
+    Precomputed job description features
+    Built once per request so each resume only pays for its own encoding
+    """
+    
+    def __init__(
+        self,
+        text: str,
+        full_embedding,
+        chunk_embeddings,
+        keywords: set,
+        has_senior_terms: bool,
+        required_seniority: str,
+        required_years: float,
+        required_skills: List[str]
+    ):
+        self.text = text
+        self.full_embedding = full_embedding
+        self.chunk_embeddings = chunk_embeddings
+        self.keywords = keywords
+        self.has_senior_terms = has_senior_terms
+        self.required_seniority = required_seniority
+        self.required_years = required_years
+        self.required_skills = required_skills
+        # SkillExtractor.prepare_required_skills() output, set by the screening layer
+        self.prepared_skills = None
+
+
 class EnhancedMLEngine:
     """
     Enhanced ML Engine with training capabilities
@@ -36,8 +179,17 @@ class EnhancedMLEngine:
             use_custom_model: If True, uses custom trained model, else pre-trained
         """
         self.model = None
+        self.encoder = None  # Runs inference: self.model or its ONNX export (INFERENCE_BACKEND)
+        self.inference_backend = None  # INFERENCE_BACKEND actually in use
+        self.scheduler: Optional[EncodeScheduler] = None  # Token-bucketed batching over self.encoder
+        self.encode_stats = EncodeStats()
+        self.weights_id = None  # Fingerprint of the loaded weights
+        self.model_id = None  # Fingerprint of the embeddings (weights + quantization), part of every embedding cache key
         self.custom_model_path = settings.MODELS_DIR / "custom_model"
         self.use_custom_model = use_custom_model
+        self.embedding_cache: Optional[EmbeddingCache] = (
+            get_embedding_cache() if settings.EMBEDDING_CACHE_ENABLED else None
+        )
         self.load_model()
     
     def load_model(self):
@@ -46,6 +198,7 @@ class EnhancedMLEngine:
             if self.use_custom_model and self.custom_model_path.exists():
                 logger.info(f"Loading custom trained model from {self.custom_model_path}")
                 self.model = SentenceTransformer(str(self.custom_model_path), local_files_only=True)
+                self._set_model_id(self._custom_model_id())
                 logger.info("Custom model loaded successfully")
             else:
                 logger.info(f"Loading pre-trained model: {settings.MODEL_NAME}")
@@ -54,6 +207,7 @@ class EnhancedMLEngine:
                     cache_folder=str(settings.MODEL_CACHE_DIR),
                     local_files_only=True
                 )
+                self._set_model_id(f"pretrained:{settings.MODEL_NAME}")
                 logger.info("Pre-trained model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
@@ -64,10 +218,74 @@ class EnhancedMLEngine:
                     settings.MODEL_NAME,
                     cache_folder=str(settings.MODEL_CACHE_DIR)
                 )
+                self._set_model_id(f"pretrained:{settings.MODEL_NAME}")
                 logger.info("Model loaded successfully from internet")
             except Exception as e2:
                 logger.error(f"Failed to load model: {e2}")
                 raise
+        
+        self._load_encoder()
+    
+    def _load_encoder(self):
+        """Pick the inference backend for the current weights and batch over it"""
+        self.encoder = self.model
+        self.inference_backend = "torch"
+        backend = settings.INFERENCE_BACKEND
+        if backend in ("onnx", "onnx-int8"):
+            try:
+                quantized = backend == "onnx-int8"
+                self.encoder = load_onnx_encoder(self.model, self.weights_id, quantized=quantized)
+                self.inference_backend = backend
+                if quantized:
+                    # int8 embeddings drift from fp32 ones; keep them out of their cache and vector store
+                    self._set_model_id(self.weights_id, variant="int8")
+                logger.info(f"Using ONNX Runtime inference backend ({backend})")
+            except Exception as e:
+                logger.error(f"ONNX Runtime backend unavailable, using PyTorch: {e}")
+        
+        token_backend = token_backend_for(self.encoder)
+        self.scheduler = EncodeScheduler(
+            token_backend, settings.ENCODE_TOKEN_BUDGET, settings.ENCODE_BATCH_SIZE, self.encode_stats
+        ) if token_backend is not None else None
+    
+    def use_embedding_service(self, address: str):
+        """
+        Run model passes in the embedding service at address (prefork
+        workers); tokenization, pooling and caching stay in this process
+        """
+        if self.scheduler is None:
+            logger.warning("Encoder has no token-level backend; not using the embedding service")
+            return
+        self.scheduler = RemoteEncodeScheduler(
+            address, self.scheduler.backend, settings.ENCODE_TOKEN_BUDGET, settings.ENCODE_BATCH_SIZE, self.encode_stats
+        )
+    
+    def _custom_model_id(self) -> str:
+        """
+        Fingerprint of the fine-tuned model on disk
+        Changes whenever train_custom_model() writes new weights
+        """
+        metadata_file = self.custom_model_path / "training_metadata.json"
+        try:
+            with open(metadata_file, 'r') as f:
+                trained_at = json.load(f).get('trained_at')
+            if trained_at:
+                return f"custom:{trained_at}"
+        except Exception:
+            pass
+        # No metadata: fall back to the newest file modification time
+        mtimes = [p.stat().st_mtime for p in self.custom_model_path.rglob('*') if p.is_file()]
+        return f"custom:mtime:{max(mtimes, default=0.0)}"
+    
+    def _set_model_id(self, weights_id: str, variant: str = ""):
+        """Switch the embedding cache namespace to the current weights (and quantization variant)"""
+        self.weights_id = weights_id
+        model_id = f"{weights_id}+{variant}" if variant else weights_id
+        self.model_id = model_id
+        if self.embedding_cache is not None and weights_id.startswith("custom:"):
+            # Embeddings from earlier fine-tuning runs can never be hit again
+            self.embedding_cache.purge_models(weights_id, prefix="custom:")
+        logger.info(f"Embedding cache namespace: {model_id}")
     
     def prepare_training_data(
         self, 
@@ -194,6 +412,10 @@ class EnhancedMLEngine:
             with open(metadata_file, 'w') as f:
                 json.dump(metadata, f, indent=2)
             
+            # self.model now holds the fine-tuned weights
+            self._set_model_id(self._custom_model_id())
+            self._load_encoder()
+            
             return metadata
             
         except Exception as e:
@@ -248,6 +470,143 @@ class EnhancedMLEngine:
         if len(feedback_data) >= 100:  # Retrain after 100 feedback samples
             logger.info("Enough feedback collected. Consider retraining the model.")
     
+    def build_job_profile(
+        self,
+        job_description: str,
+        required_skills: Optional[List[str]] = None
+    ) -> JobProfile:
+        """
+        Precompute everything about a job description that scoring needs
+        Build once per request, then score every resume against it
+        
+        Args:
+            job_description: Job description text
+            required_skills: Skills extracted from the job description
+            
+        Returns:
+            JobProfile with embeddings, keywords and requirements
+        """
+        # Normalized embeddings so cosine similarity is a plain dot product
+        full_embeddings, (chunk_embeddings,) = self.encode_document_views([job_description])
+        full_embedding = full_embeddings[0]
+        
+        jd_lower = job_description.lower()
+        
+        profile = JobProfile(
+            text=job_description,
+            full_embedding=full_embedding,
+            chunk_embeddings=chunk_embeddings,
+            keywords=extract_keywords(job_description),
+            has_senior_terms=any(term in jd_lower for term in SENIOR_TERMS),
+            required_seniority=detect_required_seniority(job_description),
+            required_years=extract_required_years(job_description),
+            required_skills=list(required_skills) if required_skills else []
+        )
+        
+        logger.info(
+            f"Built job profile: {len(chunk_embeddings)} chunks, {len(profile.keywords)} keywords, "
+            f"requires {profile.required_years} years ({profile.required_seniority})"
+        )
+        return profile
+    
+    def encode_documents(self, texts: List[str]) -> np.ndarray:
+        """Normalized full-document embeddings, shape (len(texts), dim)"""
+        return self.encode_document_views(texts)[0]
+    
+    def encode_document_chunks(self, texts: List[str]) -> List[np.ndarray]:
+        """Normalized chunk embeddings per text, each of shape (n_chunks, dim)"""
+        return self.encode_document_views(texts)[1]
+    
+    def encode_document_views(self, texts: List[str]) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Full-document and chunk embeddings of each text from a single encoding
+        
+        Each text is tokenized once and cut into half-overlapping windows of
+        max_seq_length tokens, so no token is truncated away. The full-document
+        embedding is the chunk embeddings pooled by token count, not a second
+        model pass over the first max_seq_length tokens.
+        Cached per text; windows of all uncached texts are encoded in one call.
+        
+        Returns:
+            (normalized embeddings of shape (len(texts), dim),
+             normalized chunk embeddings per text, each of shape (n_chunks, dim))
+        """
+        views = self._encode_cached(texts, self._document_params(), self._encode_document_views)
+        return np.vstack([view[0] for view in views]), [view[1:] for view in views]
+    
+    def warm_up(self, text: str):
+        """
+        Encode text once, bypassing the embedding cache, so lazy backend
+        initialization happens now rather than in the first request
+        """
+        self._encode_document_views([text])
+    
+    @property
+    def vector_model_id(self) -> Optional[str]:
+        """
+        Fingerprint of full-document embeddings: model_id plus how chunks
+        are pooled, so vectors stored under another scheme are not searched
+        """
+        if self.model_id is None:
+            return None
+        return f"{self.model_id}|{self._document_params()}"
+    
+    def _document_params(self) -> str:
+        """How documents are chunked and pooled, part of the cache key"""
+        if self.scheduler is not None:
+            backend = self.scheduler.backend
+            return f"pooled:windows:{backend.max_seq_length}/{backend.window_stride}"
+        return f"pooled:chunks:{CHUNK_MAX_LENGTH}"
+    
+    def _encode_document_views(self, texts: List[str]) -> List[np.ndarray]:
+        """Per text, the pooled document embedding stacked on its chunk embeddings"""
+        if self.scheduler is not None:
+            per_text_chunks, per_text_lengths = self.scheduler.encode_windows(texts)
+        else:
+            # Encoder without token-level access: word chunks, weighted by word count
+            chunks = [chunk_text(text) for text in texts]
+            embeddings = self.encoder.encode(
+                [chunk for text_chunks in chunks for chunk in text_chunks],
+                batch_size=settings.ENCODE_BATCH_SIZE,
+                normalize_embeddings=True
+            )
+            bounds = np.cumsum([0] + [len(text_chunks) for text_chunks in chunks])
+            per_text_chunks = [embeddings[bounds[i]:bounds[i + 1]] for i in range(len(texts))]
+            per_text_lengths = [[len(chunk.split()) or 1 for chunk in text_chunks] for text_chunks in chunks]
+        
+        return [
+            np.vstack([pool_chunk_embeddings(chunk_embeddings, lengths), chunk_embeddings])
+            for chunk_embeddings, lengths in zip(per_text_chunks, per_text_lengths)
+        ]
+    
+    def _encode_cached(self, texts: List[str], params: str, encode) -> List[np.ndarray]:
+        """
+        Encode each text as a (rows, dim) matrix through the embedding cache
+        
+        Args:
+            texts: Documents to encode
+            params: Description of encode, part of the cache key
+            encode: texts -> one (rows, dim) matrix per text
+        """
+        # Weights of unknown origin (model set from outside load_model) are never cached
+        cache = self.embedding_cache if self.model_id is not None else None
+        keys = [embedding_key(str(self.model_id), text, params) for text in texts]
+        found = cache.get_many(keys) if cache is not None else {}
+        
+        # First text for every key that still has to be encoded
+        missing = {}
+        for text, key in zip(texts, keys):
+            if key not in found:
+                missing.setdefault(key, text)
+        
+        if missing:
+            encoded = dict(zip(missing, encode(list(missing.values()))))
+            if cache is not None:
+                cache.put_many(self.model_id, encoded)
+            found.update(encoded)
+        
+        return [found[key] for key in keys]
+    
     def compute_semantic_similarity(self, text1: str, text2: str) -> float:
         """
         Compute semantic similarity between two texts with advanced techniques
@@ -260,107 +619,144 @@ class EnhancedMLEngine:
             Similarity score (0-100)
         """
         try:
-            from sentence_transformers import util
-            import torch
-            
-            # 1. Full document similarity
-            embedding1 = self.model.encode(text1, convert_to_tensor=True)
-            embedding2 = self.model.encode(text2, convert_to_tensor=True)
-            full_similarity = util.cos_sim(embedding1, embedding2).item()
-            
-            # 2. Chunk-based similarity (better for long documents)
-            # Split texts into sentences/chunks
-            def chunk_text(text, max_length=200):
-                """Split text into overlapping chunks"""
-                words = text.split()
-                chunks = []
-                for i in range(0, len(words), max_length // 2):
-                    chunk = ' '.join(words[i:i + max_length])
-                    if chunk.strip():
-                        chunks.append(chunk)
-                return chunks if chunks else [text]
-            
-            resume_chunks = chunk_text(text1)
-            jd_chunks = chunk_text(text2)
-            
-            # Encode all chunks
-            resume_embeddings = self.model.encode(resume_chunks, convert_to_tensor=True)
-            jd_embeddings = self.model.encode(jd_chunks, convert_to_tensor=True)
-            
-            # Compute max similarity for each JD chunk with all resume chunks
-            chunk_similarities = []
-            for jd_emb in jd_embeddings:
-                max_sim = max([util.cos_sim(jd_emb, res_emb).item() for res_emb in resume_embeddings])
-                chunk_similarities.append(max_sim)
+            return self.score_against_profile(text1, self.build_job_profile(text2))
+        except Exception as e:
+            logger.error(f"Error computing similarity: {e}")
+            return 0.0
+    
+    def score_against_profile(self, resume_text: str, profile: JobProfile) -> float:
+        """
+        Compute semantic similarity between a resume and a prebuilt job profile
+        Only the resume is encoded; all job description work is reused
+        
+        Args:
+            resume_text: Resume text
+            profile: JobProfile from build_job_profile()
             
-            chunk_similarity = sum(chunk_similarities) / len(chunk_similarities) if chunk_similarities else 0
+        Returns:
+            Similarity score (0-100)
+        """
+        return self.score_resumes_batch([resume_text], profile)[0]
+    
+    def score_resumes_batch(self, resume_texts: List[str], profile: JobProfile) -> List[float]:
+        """
+        Compute semantic similarity for many resumes against one job profile
+        
+        All resumes are encoded in one call (see encode_document_views). Every
+        JD-chunk x resume-chunk similarity is then a single matrix multiply,
+        reduced per resume with a segment-wise max.
+        
+        Args:
+            resume_texts: Resume texts
+            profile: JobProfile from build_job_profile()
             
-            # 3. Keyword overlap boost (helps with technical terms)
-            def extract_keywords(text):
-                """Extract important keywords (capitalized, technical terms)"""
-                import re
-                # Get words that are capitalized or contain special chars (technical terms)
-                words = set(re.findall(r'\b[A-Z][a-z]+\b|\b[A-Z]{2,}\b|[a-zA-Z]+\+\+|[a-zA-Z]+\.js', text))
-                # Add common technical terms in lowercase
-                technical = set(re.findall(r'\b(?:python|java|react|django|flask|fastapi|aws|azure|gcp|docker|kubernetes|sql|api|rest|graphql|git|ci/cd|microservices|redis|postgresql|mongodb|machine learning|deep learning|nlp|tensorflow|pytorch)\b', text.lower()))
-                return words.union(technical)
+        Returns:
+            Similarity scores (0-100), in the same order as resume_texts
+        """
+        return self.score_resumes_with_embeddings(resume_texts, profile)[0]
+    
+    def score_resumes_with_embeddings(
+        self,
+        resume_texts: List[str],
+        profile: JobProfile
+    ) -> Tuple[List[float], Optional[np.ndarray]]:
+        """
+        Same as score_resumes_batch, also returning the full-document embeddings
+        so later stages (e.g. KeyBERT) can reuse them instead of re-encoding
+        
+        Returns:
+            (scores, normalized embeddings of shape (n_resumes, dim) or None on error)
+        """
+        if not resume_texts:
+            return [], None
+        
+        try:
+            full_embeddings, per_resume_chunks = self.encode_document_views(resume_texts)
             
-            resume_keywords = extract_keywords(text1)
-            jd_keywords = extract_keywords(text2)
+            # 1. Full document similarity
+            full_similarities = full_embeddings @ profile.full_embedding
             
-            if jd_keywords:
-                keyword_overlap = len(resume_keywords.intersection(jd_keywords)) / len(jd_keywords)
-            else:
-                keyword_overlap = 0
+            # 2. Chunk-based similarity (better for long documents)
+            # Stack every resume's chunks, remembering where each resume starts
+            offsets = np.cumsum([0] + [len(c) for c in per_resume_chunks[:-1]])
+            chunk_embeddings = np.vstack(per_resume_chunks)
             
-            # 3.5. SENIORITY CONTEXT BOOST
-            # If JD mentions "senior" and resume has "senior", boost score
-            text1_lower = text1.lower()
-            text2_lower = text2.lower()
+            # (jd_chunks, total_resume_chunks) similarity matrix
+            similarity_matrix = profile.chunk_embeddings @ chunk_embeddings.T
             
-            seniority_boost = 0
-            senior_terms = ['senior', 'lead', 'principal', 'staff', 'architect']
-            jd_has_senior = any(term in text2_lower for term in senior_terms)
-            resume_has_senior = any(term in text1_lower for term in senior_terms)
+            # Best resume chunk for each JD chunk, per resume -> (jd_chunks, n_resumes)
+            best_per_resume = np.maximum.reduceat(similarity_matrix, offsets, axis=1)
+            chunk_similarities = best_per_resume.mean(axis=0)
             
-            if jd_has_senior and resume_has_senior:
+            scores = [
+                self._combine_semantic_signals(
+                    text, profile, float(full_similarities[i]), float(chunk_similarities[i])
+                )
+                for i, text in enumerate(resume_texts)
+            ]
+            return scores, full_embeddings
+        except Exception as e:
+            logger.error(f"Error computing batch similarity: {e}")
+            return [0.0] * len(resume_texts), None
+    
+    def _combine_semantic_signals(
+        self,
+        resume_text: str,
+        profile: JobProfile,
+        full_similarity: float,
+        chunk_similarity: float
+    ) -> float:
+        """
+        Blend embedding similarities with keyword and seniority signals
+        and apply the ChatGPT-style calibration curve
+        """
+        # 3. Keyword overlap boost (helps with technical terms)
+        if profile.keywords:
+            resume_keywords = extract_keywords(resume_text)
+            keyword_overlap = len(resume_keywords.intersection(profile.keywords)) / len(profile.keywords)
+        else:
+            keyword_overlap = 0
+        
+        # 3.5. SENIORITY CONTEXT BOOST
+        # If JD mentions "senior" and resume has "senior", boost score
+        seniority_boost = 0
+        if profile.has_senior_terms:
+            resume_lower = resume_text.lower()
+            if any(term in resume_lower for term in SENIOR_TERMS):
                 seniority_boost = 0.10  # 10% boost for matching seniority
-            elif jd_has_senior and not resume_has_senior:
-                seniority_boost = -0.15  # 15% penalty for seniority mismatch
-            
-            # 4. Combine scores with weights
-            # - Full document similarity: 50% (contextual understanding)
-            # - Chunk-based similarity: 30% (detailed matching)
-            # - Keyword overlap: 20% (exact technical terms)
-            combined_score = (
-                full_similarity * 0.50 +
-                chunk_similarity * 0.30 +
-                keyword_overlap * 0.20 +
-                seniority_boost  # Add seniority context
-            ) * 100
-            
-            # 5. SUPER AGGRESSIVE CALIBRATION like ChatGPT
-            # ChatGPT gives 85-95% for good matches, we do the same
-            if combined_score < 10:
-                # Very poor match - keep very low (0-15%)
-                calibrated_score = combined_score * 1.5
-            elif combined_score < 25:
-                # Poor match (15-40%)
-                calibrated_score = 15 + (combined_score - 10) * 1.67
-            elif combined_score < 40:
-                # Fair match (40-65%)
-                calibrated_score = 40 + (combined_score - 25) * 1.67
-            elif combined_score < 55:
-                # Good match (65-85%)
-                calibrated_score = 65 + (combined_score - 40) * 1.33
             else:
-                # Excellent match (85-98%) - LIKE CHATGPT
-                calibrated_score = 85 + (combined_score - 55) * 0.29
-            
-            return max(0, min(100, calibrated_score))
-        except Exception as e:
-            logger.error(f"Error computing similarity: {e}")
-            return 0.0
+                seniority_boost = -0.15  # 15% penalty for seniority mismatch
+        
+        # 4. Combine scores with weights
+        # - Full document similarity: 50% (contextual understanding)
+        # - Chunk-based similarity: 30% (detailed matching)
+        # - Keyword overlap: 20% (exact technical terms)
+        combined_score = (
+            full_similarity * 0.50 +
+            chunk_similarity * 0.30 +
+            keyword_overlap * 0.20 +
+            seniority_boost  # Add seniority context
+        ) * 100
+        
+        # 5. SUPER AGGRESSIVE CALIBRATION like ChatGPT
+        # ChatGPT gives 85-95% for good matches, we do the same
+        if combined_score < 10:
+            # Very poor match - keep very low (0-15%)
+            calibrated_score = combined_score * 1.5
+        elif combined_score < 25:
+            # Poor match (15-40%)
+            calibrated_score = 15 + (combined_score - 10) * 1.67
+        elif combined_score < 40:
+            # Fair match (40-65%)
+            calibrated_score = 40 + (combined_score - 25) * 1.67
+        elif combined_score < 55:
+            # Good match (65-85%)
+            calibrated_score = 65 + (combined_score - 40) * 1.33
+        else:
+            # Excellent match (85-98%) - LIKE CHATGPT
+            calibrated_score = 85 + (combined_score - 55) * 0.29
+        
+        return max(0, min(100, calibrated_score))
     
     def compute_skill_match_score(
         self, 
@@ -370,99 +766,56 @@ class EnhancedMLEngine:
         """
         Compute weighted skill match score with fuzzy matching
         Critical skills have higher weight
+        
+        Exact and synonym hits are set lookups; substring and fuzzy matches
+        for the remaining skills are computed as rapidfuzz cdist matrices.
         """
         if not required_skills:
             return 100.0
         
-        try:
-            from rapidfuzz import fuzz
-        except ImportError:
-            fuzz = None
-        
-        # Skill importance weights (critical skills get higher weight)
-        skill_weights = {
-            # Programming Languages (HIGH PRIORITY)
-            'python': 1.5, 'java': 1.5, 'javascript': 1.5, 'typescript': 1.5,
-            'c++': 1.5, 'c#': 1.5, 'go': 1.5, 'rust': 1.5, 'kotlin': 1.5,
-            
-            # Frameworks (CRITICAL)
-            'django': 1.5, 'flask': 1.5, 'fastapi': 1.5, 'spring': 1.5,
-            'react': 1.5, 'angular': 1.5, 'vue': 1.5, 'node.js': 1.5,
-            'express': 1.5, '.net': 1.5, 'asp.net': 1.5,
-            
-            # Databases (HIGH PRIORITY)
-            'postgresql': 1.3, 'mysql': 1.3, 'mongodb': 1.3, 'redis': 1.3,
-            'oracle': 1.3, 'sql server': 1.3, 'cassandra': 1.3, 'dynamodb': 1.3,
-            
-            # Cloud & DevOps (HIGH PRIORITY)
-            'aws': 1.3, 'azure': 1.3, 'gcp': 1.3, 'docker': 1.3,
-            'kubernetes': 1.3, 'k8s': 1.3, 'terraform': 1.3, 'jenkins': 1.3,
-            'ci/cd': 1.3, 'gitlab': 1.3, 'github actions': 1.3,
-            
-            # Data Science/ML (HIGH PRIORITY for ML roles)
-            'tensorflow': 1.4, 'pytorch': 1.4, 'scikit-learn': 1.4,
-            'pandas': 1.4, 'numpy': 1.4, 'keras': 1.4, 'machine learning': 1.4,
-            'deep learning': 1.4, 'nlp': 1.4, 'computer vision': 1.4,
-            
-            # API & Architecture (MEDIUM PRIORITY)
-            'rest api': 1.2, 'graphql': 1.2, 'microservices': 1.2,
-            'api': 1.2, 'restful': 1.2, 'grpc': 1.2, 'soap': 1.2,
-            
-            # Version Control (STANDARD)
-            'git': 1.0, 'github': 1.0, 'gitlab': 1.0, 'bitbucket': 1.0,
-            
-            # Testing (MEDIUM PRIORITY)
-            'pytest': 1.2, 'unittest': 1.2, 'jest': 1.2, 'junit': 1.2,
-            'selenium': 1.2, 'cypress': 1.2, 'testing': 1.2,
-            
-            # Other skills (STANDARD)
-            'default': 1.0
-        }
-        
-        # Skill synonyms
-        skill_synonyms = {
-            'javascript': ['js', 'node', 'nodejs'],
-            'typescript': ['ts'],
-            'kubernetes': ['k8s'],
-            'postgresql': ['postgres', 'psql'],
-            'mongodb': ['mongo'],
-        }
-        
-        found_skills_lower = [s.lower().strip() for s in found_skills]
+        found_skills_lower = list(dict.fromkeys(s.lower().strip() for s in found_skills if s.strip()))
+        found_skill_set = set(found_skills_lower)
         required_skills_lower = [s.lower().strip() for s in required_skills]
         
-        total_weight = 0.0
-        matched_weight = 0.0
-        
-        for skill in required_skills_lower:
-            # Get weight for this skill (default to 1.0)
-            weight = skill_weights.get(skill, skill_weights['default'])
-            total_weight += weight
-            
-            best_match = 0.0
-            
+        best_match = np.zeros(len(required_skills_lower))
+        for i, skill in enumerate(required_skills_lower):
             # Check if skill is found (exact)
-            if skill in found_skills_lower:
-                best_match = 1.0
-            else:
-                # Check synonyms
-                if skill in skill_synonyms:
-                    for syn in skill_synonyms[skill]:
-                        if syn in found_skills_lower:
-                            best_match = max(best_match, 0.95)
-                
-                # Partial match for similar skills (more generous)
-                for found_skill in found_skills_lower:
-                    if skill in found_skill or found_skill in skill:
-                        best_match = max(best_match, 0.85)  # Increased from 0.8
-                    
-                    # Fuzzy match (more forgiving)
-                    if fuzz and len(skill) > 3:
-                        similarity = fuzz.ratio(skill, found_skill) / 100
-                        if similarity > 0.80:  # Lowered from 0.85
-                            best_match = max(best_match, similarity * 0.95)  # Increased from 0.9
+            if skill in found_skill_set:
+                best_match[i] = 1.0
+            # Check synonyms
+            elif found_skill_set.intersection(ENGINE_SKILL_SYNONYMS.get(skill, ())):
+                best_match[i] = 0.95
+        
+        remaining = [i for i in range(len(required_skills_lower)) if best_match[i] < 1.0]
+        if remaining and found_skills_lower:
+            queries = [required_skills_lower[i] for i in remaining]
+            
+            # Partial match for similar skills (one contains the other)
+            containment = process.cdist(
+                queries, found_skills_lower,
+                scorer=fuzz.partial_ratio, score_cutoff=100,
+                workers=settings.FUZZY_MATCH_WORKERS
+            )
+            # Fuzzy match (more forgiving), only for skills longer than 3 characters
+            similarity = process.cdist(
+                queries, found_skills_lower,
+                scorer=fuzz.ratio, score_cutoff=80, dtype=np.float64,
+                workers=settings.FUZZY_MATCH_WORKERS
+            )
+            similarity[similarity <= 80] = 0
             
-            matched_weight += weight * best_match
+            for row, i in enumerate(remaining):
+                if containment[row].max() >= 100:
+                    best_match[i] = max(best_match[i], 0.85)
+                if len(required_skills_lower[i]) > 3:
+                    best_match[i] = max(best_match[i], similarity[row].max() / 100 * 0.95)
+        
+        weights = [
+            ENGINE_SKILL_WEIGHTS.get(skill, ENGINE_SKILL_WEIGHTS['default'])
+            for skill in required_skills_lower
+        ]
+        total_weight = sum(weights)
+        matched_weight = sum(weight * match for weight, match in zip(weights, best_match.tolist()))
         
         if total_weight == 0:
             return 100.0
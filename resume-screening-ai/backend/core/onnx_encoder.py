@@ -0,0 +1,338 @@
+"""
+ONNX Runtime Sentence Encoder
+Exports a sentence-transformer's transformer to ONNX once and runs CPU
+inference through onnxruntime with the model's own pooling and normalization
+"""
+
+import hashlib
+import inspect
+import json
+from pathlib import Path
+from typing import Dict, List, Union
+import numpy as np
+import logging
+
+from backend.core.config import settings
+from backend.core.encode_scheduler import pad_token_ids
+
+logger = logging.getLogger(__name__)
+
+# onnxruntime is optional (INFERENCE_BACKEND = "onnx" only)
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_FILE = "model_int8.onnx"  # quantize_onnx() output
+ONNX_CONFIG_FILE = "onnx_config.json"
+
+# Bump when the exported graph or the config format changes
+ONNX_EXPORT_VERSION = 1
+
+POOLING_MODES = ('mean', 'cls', 'max')
+
+
+def _module_config(model) -> Dict:
+    """Pooling and normalization of a SentenceTransformer, for the ONNX side"""
+    from sentence_transformers.models import Normalize, Pooling, Transformer
+    
+    modules = list(model)
+    if not modules or not isinstance(modules[0], Transformer):
+        raise ValueError("First module is not a sentence_transformers Transformer")
+    unsupported = [type(m).__name__ for m in modules[1:] if not isinstance(m, (Pooling, Normalize))]
+    if unsupported:
+        raise ValueError(f"Modules not supported by the ONNX backend: {unsupported}")
+    
+    pooling = next((m for m in modules if isinstance(m, Pooling)), None)
+    if pooling is None:
+        raise ValueError("Model has no Pooling module")
+    # Newer sentence-transformers store a mode name, older ones one flag per mode
+    pooling_config = pooling.get_config_dict()
+    modes = pooling_config.get('pooling_mode')
+    if modes is None:
+        modes = [mode for mode in POOLING_MODES if pooling_config.get(f"pooling_mode_{mode}_token" if mode == 'cls' else f"pooling_mode_{mode}_tokens")]
+    elif isinstance(modes, str):
+        modes = [modes]
+    if len(modes) != 1 or modes[0] not in POOLING_MODES:
+        raise ValueError(f"Only single mean, cls or max pooling is supported, not {modes}")
+    mode = modes[0]
+    
+    return {
+        'pooling_mode': mode,
+        'normalize': any(isinstance(m, Normalize) for m in modules),
+        'max_seq_length': int(model.max_seq_length),
+        'do_lower_case': bool(getattr(modules[0], 'do_lower_case', False)),
+        'dimension': int(model.get_sentence_embedding_dimension())
+    }
+
+
+def export_onnx(model, output_dir: Path, source_id: str) -> Path:
+    """
+    Export the transformer of a loaded SentenceTransformer to ONNX
+    
+    The graph maps token ids to token embeddings; pooling and normalization
+    run in numpy (see OnnxSentenceEncoder). The tokenizer and the module
+    config are saved next to it.
+    
+    Args:
+        model: Loaded SentenceTransformer (pre-trained or fine-tuned)
+        output_dir: Directory to write model.onnx, tokenizer and config to
+        source_id: Fingerprint of the weights (EnhancedMLEngine.model_id)
+    
+    Returns:
+        output_dir
+    """
+    import torch
+    
+    config = _module_config(model)
+    transformer = model[0]
+    tokenizer = transformer.tokenizer
+    if not getattr(tokenizer, 'is_fast', False):
+        raise ValueError("The ONNX backend needs a fast (tokenizers) tokenizer")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # A quantized graph of the previous weights must not outlive them
+    (output_dir / ONNX_CONFIG_FILE).unlink(missing_ok=True)
+    (output_dir / ONNX_INT8_FILE).unlink(missing_ok=True)
+    
+    sample = tokenizer(["export sample", "a second, longer export sample"], padding=True, return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+        
+        def forward(self, *inputs):
+            return self.auto_model(**dict(zip(input_names, inputs)), return_dict=True).last_hidden_state
+    
+    wrapper = TokenEmbeddings(transformer.auto_model).eval()
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['token_embeddings'] = {0: 'batch', 1: 'sequence'}
+    # Newer torch defaults to the dynamo exporter; the TorchScript one handles dynamic_axes
+    extra = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            tuple(sample[name] for name in input_names),
+            str(output_dir / ONNX_MODEL_FILE),
+            input_names=input_names,
+            output_names=['token_embeddings'],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **extra
+        )
+    tokenizer.save_pretrained(str(output_dir))
+    
+    config.update({
+        'version': ONNX_EXPORT_VERSION,
+        'source': source_id,
+        'input_names': input_names,
+        'pad_token': tokenizer.pad_token,
+        'pad_token_id': tokenizer.pad_token_id
+    })
+    # Written last: a directory without it is an incomplete export
+    with open(output_dir / ONNX_CONFIG_FILE, 'w') as f:
+        json.dump(config, f, indent=2)
+    
+    logger.info(f"Exported {source_id} to ONNX at {output_dir}")
+    return output_dir
+
+
+def quantize_onnx(model_dir: Path) -> Path:
+    """
+    Dynamic int8 quantization of an export's weights (MatMul/Gemm); activations
+    are quantized on the fly, so no calibration data is needed
+    
+    Returns:
+        Path of the quantized graph
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    
+    model_dir = Path(model_dir)
+    output = model_dir / ONNX_INT8_FILE
+    partial = model_dir / f"{ONNX_INT8_FILE}.partial"
+    quantize_dynamic(
+        str(model_dir / ONNX_MODEL_FILE), str(partial),
+        weight_type=QuantType.QInt8, per_channel=True
+    )
+    partial.replace(output)
+    logger.info(f"Quantized ONNX model written to {output}")
+    return output
+
+
+def read_export_config(model_dir: Path) -> Dict:
+    """Config of an export, or {} if there is no complete export"""
+    try:
+        with open(Path(model_dir) / ONNX_CONFIG_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in for SentenceTransformer.encode backed by onnxruntime
+    
+    Tokenization, length-sorted batching, pooling and normalization follow
+    sentence-transformers, so embeddings match the PyTorch path up to
+    floating point noise. token_ids() and embed() make it a token backend
+    for EncodeScheduler.
+    """
+    
+    def __init__(self, model_dir: Path, threads: int = 0, model_file: str = ONNX_MODEL_FILE):
+        """
+        Args:
+            model_dir: export_onnx() output directory
+            threads: onnxruntime intra-op threads (0 = onnxruntime default)
+            model_file: ONNX graph inside model_dir
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime is not installed. Install with: pip install onnxruntime")
+        # The tokenizers library directly: transformers would import torch
+        from tokenizers import Tokenizer
+        
+        self.model_dir = Path(model_dir)
+        self.config = read_export_config(self.model_dir)
+        if self.config.get('version') != ONNX_EXPORT_VERSION:
+            raise ValueError(f"No usable ONNX export in {self.model_dir}")
+        
+        self.max_seq_length = self.config['max_seq_length']
+        self.input_names = self.config['input_names']
+        self.pad_token_id = self.config['pad_token_id']
+        self.window_stride = self.max_seq_length // 2
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.no_padding()
+        # Same vocabulary, but overflow is kept as extra half-overlapping windows
+        self.window_tokenizer = Tokenizer.from_str(self.tokenizer.to_str())
+        self.window_tokenizer.enable_truncation(max_length=self.max_seq_length, stride=self.window_stride)
+        
+        self.model_file = model_file
+        self.session = None
+        self.reopen(threads)
+    
+    def reopen(self, threads: int = 0):
+        """
+        (Re)create the inference session
+        Needed after fork: the parent's onnxruntime thread pool does not exist in the child
+        """
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(self.model_dir / self.model_file), options, providers=['CPUExecutionProvider']
+        )
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config['dimension']
+    
+    def token_ids(self, texts: List[str]) -> List[List[int]]:
+        """Token ids with special tokens, truncated to max_seq_length, unpadded"""
+        return [encoding.ids for encoding in self.tokenizer.encode_batch(self._prepare(texts))]
+    
+    def window_token_ids(self, texts: List[str]) -> List[List[List[int]]]:
+        """
+        Every token of each text, as max_seq_length windows with special tokens
+        Consecutive windows share window_stride tokens
+        """
+        return [
+            [encoding.ids] + [overflow.ids for overflow in encoding.overflowing]
+            for encoding in self.window_tokenizer.encode_batch(self._prepare(texts))
+        ]
+    
+    def _prepare(self, texts: List[str]) -> List[str]:
+        """Strip (and lower-case) like SentenceTransformer.encode"""
+        texts = [str(text).strip() for text in texts]
+        if self.config['do_lower_case']:
+            texts = [text.lower() for text in texts]
+        return texts
+    
+    def embed(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Sentence embeddings of one padded batch (normalized if the model normalizes)"""
+        features = {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            # Single-sequence inputs: every token is segment 0
+            'token_type_ids': np.zeros_like(input_ids)
+        }
+        token_embeddings = self.session.run(None, {name: features[name] for name in self.input_names})[0]
+        embeddings = self._pool(token_embeddings, attention_mask)
+        if self.config['normalize']:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+    
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        mode = self.config['pooling_mode']
+        if mode == 'cls':
+            return token_embeddings[:, 0]
+        mask = attention_mask[:, :, None].astype(token_embeddings.dtype)
+        if mode == 'max':
+            return np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+        return (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = None,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Embeddings as a float32 array, (len(sentences), dim) or (dim,) for a string
+        
+        Extra SentenceTransformer.encode keyword arguments are accepted and ignored.
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        if len(sentences) == 0:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        
+        # Longest first, like sentence-transformers, so batches pad little
+        order = np.argsort([-len(str(s)) for s in sentences], kind='stable')
+        embeddings = np.empty((len(sentences), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            batch = order[start:start + batch_size]
+            input_ids, attention_mask = pad_token_ids(self.token_ids([sentences[i] for i in batch]), self.pad_token_id)
+            embeddings[batch] = self.embed(input_ids, attention_mask)
+        
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+def ensure_onnx_export(model, model_id: str, quantized: bool = False, force: bool = False) -> Path:
+    """
+    Export directory for a loaded SentenceTransformer, exporting it on first use
+    
+    Exports live under ONNX_DIR, one directory per model fingerprint, and
+    are reused until the weights change (e.g. after fine-tuning).
+    
+    Args:
+        model: Loaded SentenceTransformer
+        model_id: Fingerprint of its weights
+        quantized: Also make sure the int8 graph exists
+        force: Export (and quantize) again even if up to date
+    """
+    digest = hashlib.sha256(model_id.encode('utf-8')).hexdigest()[:16]
+    model_dir = settings.ONNX_DIR / digest
+    config = read_export_config(model_dir)
+    if force or config.get('version') != ONNX_EXPORT_VERSION or config.get('source') != model_id:
+        export_onnx(model, model_dir, model_id)
+    if quantized and (force or not (model_dir / ONNX_INT8_FILE).exists()):
+        quantize_onnx(model_dir)
+    return model_dir
+
+
+def load_onnx_encoder(model, model_id: str, quantized: bool = False) -> OnnxSentenceEncoder:
+    """ONNX encoder (fp32 or int8) for a loaded SentenceTransformer"""
+    model_dir = ensure_onnx_export(model, model_id, quantized)
+    return OnnxSentenceEncoder(
+        model_dir, settings.ONNX_THREADS, ONNX_INT8_FILE if quantized else ONNX_MODEL_FILE
+    )
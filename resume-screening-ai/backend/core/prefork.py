@@ -0,0 +1,234 @@
+"""
+Prefork Server
+Loads the models once in a parent process, then forks uvicorn workers that
+all accept on the parent's listening socket. Model weights, the spaCy
+pipeline and the skill index are shared copy-on-write, so each extra
+worker costs little more than its own activations and request state.
+With EMBEDDING_SERVICE_ENABLED, one more forked process runs every model
+pass and workers only tokenize, pool and cache (see embedding_service).
+"""
+
+import gc
+import os
+import signal
+import socket
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+import logging
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies sooner than this after starting is restarted with a delay
+RESTART_BACKOFF_SECONDS = 1.0
+
+# How long workers are held back while the embedding service starts listening
+SERVICE_START_TIMEOUT_SECONDS = 30.0
+
+
+def _listen(host: str, port: int) -> socket.socket:
+    """Listening socket created before fork, shared by every worker"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _prepare_worker(threads: int, service_address: Optional[str] = None):
+    """
+    Runs in each worker right after fork
+    Threads, thread pools and SQLite connections do not survive fork; the
+    parent never started the former and its connections are replaced here.
+    """
+    import torch
+    from backend.core.ml_engine_enhanced import get_enhanced_ml_engine
+    from backend.utils.skill_extractor import get_skill_extractor
+    
+    torch.set_num_threads(threads)
+    engine = get_enhanced_ml_engine()
+    if engine.embedding_cache is not None:
+        engine.embedding_cache.reopen()
+    if hasattr(engine.encoder, 'reopen'):
+        engine.encoder.reopen(threads)  # ONNX Runtime session
+    if service_address and engine.scheduler is not None:
+        engine.use_embedding_service(service_address)
+        # KeyBERT's document and candidate embeddings go through the service too
+        get_skill_extractor().attach_keybert_model(engine.scheduler)
+
+
+def _restart_delay(started: float, now: float) -> float:
+    """Seconds to wait before replacing a child started at started (monotonic) that exited at now"""
+    return RESTART_BACKOFF_SECONDS if now - started < RESTART_BACKOFF_SECONDS else 0.0
+
+
+def _run_worker(app, sock: socket.socket, threads: int, service_address: Optional[str]):
+    """Serve the app on the inherited socket until told to stop"""
+    import uvicorn
+    from backend.core.ml_engine_enhanced import get_enhanced_ml_engine
+    
+    _prepare_worker(threads, service_address)
+    scheduler = get_enhanced_ml_engine().scheduler
+    if hasattr(scheduler, 'close'):
+        # Frees this worker's shared-memory buffers (uvicorn re-raises SIGTERM after run() returns)
+        app.on_event("shutdown")(scheduler.close)
+    config = uvicorn.Config(app, log_level="info")
+    # The startup event runs the warm-up encode, so /ready turns 200 per worker
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _run_embedding_service(address: str, threads: int):
+    """Serve the preloaded model to the workers until terminated"""
+    import torch
+    from backend.core.embedding_service import EmbeddingService
+    from backend.core.ml_engine_enhanced import get_enhanced_ml_engine
+    from backend.core.warmup import WARMUP_TEXT
+    
+    torch.set_num_threads(threads)
+    engine = get_enhanced_ml_engine()
+    if hasattr(engine.encoder, 'reopen'):
+        engine.encoder.reopen(threads)
+    if os.path.exists(address):
+        os.unlink(address)  # Socket of a crashed predecessor
+    service = EmbeddingService(
+        engine.scheduler, address,
+        max_wait=settings.EMBEDDING_SERVICE_MAX_WAIT_MS / 1000,
+        max_batch_tokens=settings.EMBEDDING_SERVICE_MAX_BATCH_TOKENS
+    )
+    engine.scheduler.encode([WARMUP_TEXT])
+    service.serve_forever()
+
+
+def _wait_for_socket(address: str, pid: int) -> bool:
+    """Wait until the service listens at address; False if it exited first"""
+    deadline = time.monotonic() + SERVICE_START_TIMEOUT_SECONDS
+    while not os.path.exists(address) and time.monotonic() < deadline:
+        if os.waitpid(pid, os.WNOHANG) != (0, 0):
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def serve(workers: int = 0, host: str = None, port: int = None):
+    """
+    Run the API as one parent and N forked workers (blocks until SIGTERM/SIGINT)
+    
+    Args:
+        workers: Number of workers (0 = one per CPU core)
+        host: Bind address (default: settings.HOST)
+        port: Bind port (default: settings.PORT)
+    """
+    workers = workers or os.cpu_count() or 1
+    threads = settings.SERVER_WORKER_THREADS or max(1, (os.cpu_count() or 1) // workers)
+    host = host or settings.HOST
+    port = port or settings.PORT
+    service_address = None
+    if settings.EMBEDDING_SERVICE_ENABLED:
+        service_address = settings.EMBEDDING_SERVICE_SOCKET or os.path.join(
+            tempfile.gettempdir(), f"resume-screening-embeddings-{os.getpid()}.sock"
+        )
+    
+    # Workers are the parallelism: resume processing runs in each worker's
+    # own threads instead of a process pool per worker. Set before the app
+    # import below, which creates the warm-up components from it.
+    settings.PROCESS_POOL_WORKERS = 0
+    
+    from backend.main import app
+    from backend.core.warmup import preload, readiness_status
+    
+    start = time.perf_counter()
+    preload()
+    failed = [name for name, c in readiness_status()['components'].items() if c['state'] == 'failed']
+    if failed:
+        logger.warning(f"Not preloaded (workers will retry): {', '.join(failed)}")
+    if service_address:
+        from backend.core.ml_engine_enhanced import get_enhanced_ml_engine
+        if 'ml_engine' in failed or get_enhanced_ml_engine().scheduler is None:
+            logger.warning("Embedding service disabled: no token-level encoder loaded")
+            service_address = None
+    logger.info(f"Models loaded in {time.perf_counter() - start:.1f}s; forking {workers} workers ({threads} threads each)")
+    
+    sock = _listen(host, port)
+    # Objects alive now are never collected; keeps the GC from writing to (and copying) shared pages
+    gc.freeze()
+    
+    children: Dict[int, Tuple[str, float]] = {}  # pid -> (role, start time)
+    stopping = False
+    
+    def spawn(role: str = 'worker'):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                if role == 'embedding service':
+                    sock.close()
+                    # The only process running the model, so it gets every core
+                    _run_embedding_service(service_address, settings.SERVER_WORKER_THREADS or os.cpu_count() or 1)
+                else:
+                    _run_worker(app, sock, threads, service_address)
+            except BaseException:
+                logger.exception(f"{role.capitalize()} crashed")
+                code = 1
+            finally:
+                # Never return into the parent's supervision loop
+                os._exit(code)
+        children[pid] = (role, time.monotonic())
+        return pid
+    
+    def terminate(roles):
+        for pid, (role, _) in list(children.items()):
+            if role in roles:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+    
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        # Workers first; the service keeps serving their in-flight requests
+        terminate({'worker'})
+    
+    if service_address:
+        if os.path.exists(service_address):
+            os.unlink(service_address)  # Left by a killed server; its presence signals the new one is up
+        pid = spawn('embedding service')
+        if not _wait_for_socket(service_address, pid):
+            logger.error("Embedding service exited during startup; workers encode locally")
+            children.pop(pid)
+            service_address = None
+    for _ in range(workers):
+        spawn()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info(f"Serving on http://{host}:{port} with workers {sorted(children)}")
+    
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        role, started = children.pop(pid, (None, None))
+        if role is None:
+            continue
+        if stopping:
+            if all(other == 'embedding service' for other, _ in children.values()):
+                terminate({'embedding service'})
+            continue
+        logger.warning(f"{role.capitalize()} {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+        delay = _restart_delay(started, time.monotonic())
+        if delay:
+            # A child that keeps crashing on startup must not spin the parent
+            time.sleep(delay)
+        spawn(role)
+    
+    sock.close()
+    if service_address and os.path.exists(service_address):
+        os.unlink(service_address)
+    logger.info("All workers stopped")
@@ -0,0 +1,383 @@
+"""
+Resume Analysis Pipeline
+Per-resume work for a screening request:
+1. Job-independent analysis (parsing, cleaning, validation, features) - cached
+2. Scoring of an analyzed resume against a job profile
+"""
+
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from backend.core.ml_engine_enhanced import EnhancedMLEngine, JobProfile
+from backend.core.vector_store import ResumeVectorStore
+from backend.utils.parser import ResumeParser
+from backend.utils.nlp_processor import DocumentContext
+from backend.utils.contact_extractor import ContactExtractor
+from backend.utils.resume_validator import get_resume_validator
+from backend.utils.experience_education_extractor import extract_experience_and_education
+from backend.utils.helpers import generate_content_hash
+from backend.utils.resume_cache import get_resume_cache
+from backend.utils.skill_extractor import SkillExtractor, get_skill_extractor
+
+logger = logging.getLogger(__name__)
+
+
+def extract_resume_features(resume_text: str, context: Optional[DocumentContext] = None) -> Dict:
+    """
+    Extract contact, experience and education features from cleaned resume text
+    
+    Args:
+        resume_text: Cleaned resume text
+        context: Shared DocumentContext for resume_text
+    
+    Returns:
+        {
+            'name': str, 'email': Optional[str], 'phone': Optional[str],
+            'experience_years': float,
+            'seniority_level': str,
+            'education': List[str]
+        }
+    """
+    # Extract contact information
+    contact_info = ContactExtractor.extract_all_contact_info(resume_text)
+    
+    # ENHANCED: Extract experience using advanced extractor
+    exp_edu_data = extract_experience_and_education(resume_text, context)
+    
+    # Use the better experience extraction
+    experience_years = exp_edu_data.get('years_of_experience', 0)
+    if experience_years == 0:
+        # Fallback to old method
+        experience_years = contact_info.get('experience_years', 0)
+    
+    seniority_level = exp_edu_data.get('seniority_level', 'Entry Level')
+    education_data = exp_edu_data.get('education', contact_info.get('education', []))
+    
+    # Convert education dicts to strings for schema compatibility
+    if education_data and isinstance(education_data[0], dict):
+        education_list = [
+            f"{edu.get('degree', '')} in {edu.get('specialization', 'Unknown')}"
+            if edu.get('specialization')
+            else edu.get('degree', 'Unknown')
+            for edu in education_data
+        ]
+    else:
+        education_list = education_data
+    
+    logger.info(f"Experience: {experience_years} years ({seniority_level})")
+    logger.info(f"Education: {len(education_list)} degrees found")
+    
+    return {
+        'name': contact_info.get('name', 'Unknown'),
+        'email': contact_info.get('email'),
+        'phone': contact_info.get('phone'),
+        'experience_years': experience_years,
+        'seniority_level': seniority_level,
+        'education': education_list
+    }
+
+
+def analyze_resume_texts(texts: List[str]) -> List[Dict]:
+    """
+    Validate and extract features from many cleaned resume texts
+    
+    spaCy runs over all texts in one nlp.pipe call (SPACY_BATCH_SIZE,
+    SPACY_N_PROCESS); each resulting Doc is shared by validation and
+    feature extraction. Also suitable for offline corpus processing.
+    
+    Returns:
+        One {'validation': Dict, 'features': Optional[Dict]} per text
+    """
+    validator = get_resume_validator()
+    contexts = validator.nlp_processor.analyze_batch(texts)
+    
+    results = []
+    for text, context in zip(texts, contexts):
+        # NLP VALIDATION: Check if document is actually a resume
+        is_resume, validation_details = validator.validate_resume(text, context)
+        features = extract_resume_features(text, context) if is_resume else None
+        results.append({'validation': validation_details, 'features': features})
+    
+    return results
+
+
+def analyze_resumes(files: List[Tuple[str, bytes]], use_cache: bool = True) -> List[Dict]:
+    """
+    Parse, clean, validate and extract features from resume files
+    
+    Results are cached by the SHA-256 of the raw bytes, so the same file
+    screened against another job skips all of this work. Cache misses
+    are analyzed together with analyze_resume_texts().
+    
+    Args:
+        files: (filename, content) pairs; filename is used to detect the file type
+        use_cache: Whether to read/write the resume cache
+    
+    Returns:
+        One dict per file, in order:
+        {
+            'content_hash': str,
+            'text': Optional[str],        # None if no text could be extracted
+            'validation': Optional[Dict], # None if no text could be extracted
+            'features': Optional[Dict]    # None unless validated as a resume
+        }
+    """
+    cache = get_resume_cache() if use_cache else None
+    results: List[Optional[Dict]] = [None] * len(files)
+    misses = []
+    
+    for i, (filename, content) in enumerate(files):
+        content_hash = generate_content_hash(content)
+        
+        if cache is not None:
+            cached = cache.get(content_hash)
+            if cached is not None:
+                logger.info(f"Resume cache hit for {filename} ({content_hash[:12]})")
+                results[i] = dict(cached, content_hash=content_hash)
+                continue
+        
+        entry = {'text': None, 'validation': None, 'features': None}
+        
+        # Parse resume in memory (no temp files on disk)
+        resume_text = ResumeParser.parse_resume(content, filename)
+        if resume_text:
+            logger.info(f"Extracted {len(resume_text)} characters from {filename}")
+            
+            # Clean text
+            entry['text'] = ResumeParser.clean_text(resume_text)
+        
+        results[i] = entry
+        misses.append((i, content_hash))
+    
+    to_analyze = [i for i, _ in misses if results[i]['text']]
+    analyses = analyze_resume_texts([results[i]['text'] for i in to_analyze])
+    for i, analysis in zip(to_analyze, analyses):
+        results[i].update(analysis)
+    
+    for i, content_hash in misses:
+        if cache is not None:
+            cache.put(content_hash, results[i])
+        results[i] = dict(results[i], content_hash=content_hash)
+    
+    return results
+
+
+def analyze_resume(filename: str, content: bytes, use_cache: bool = True) -> Dict:
+    """
+    Parse, clean, validate and extract features from one resume file
+    
+    Returns:
+        See analyze_resumes()
+    """
+    return analyze_resumes([(filename, content)], use_cache)[0]
+
+
+def analyze_resume_for_screening(filename: str, content: bytes) -> Dict:
+    """
+    Full per-resume CPU work for a screening request
+    Runs inside process pool workers (see backend/core/worker_pool.py)
+    
+    Returns:
+        analyze_resume() result plus 'filename' and 'skills' (List[str],
+        dictionary matches only; KeyBERT runs in the API process next to the
+        embedding model, see add_keyword_skills())
+    """
+    analysis = analyze_resume(filename, content)
+    analysis['filename'] = filename
+    analysis['skills'] = []
+    
+    if analysis['features']:
+        analysis['skills'] = sorted(get_skill_extractor().extract_dictionary_skills(analysis['text']))
+    
+    return analysis
+
+
+def is_screenable(analysis: Dict) -> bool:
+    """
+    Whether an analyzed file is a readable resume (logs why not)
+    """
+    filename = analysis['filename']
+    
+    if not analysis['text']:
+        logger.warning(f"Could not extract text from {filename}")
+        logger.warning(f"This might be a scanned/image-based PDF. Consider using OCR or text-based PDFs.")
+        return False
+    
+    validation_details = analysis['validation']
+    if not validation_details['is_resume']:
+        validation_msg = get_resume_validator().get_validation_message(validation_details)
+        logger.warning(f"❌ {filename} rejected: {validation_msg}")
+        logger.warning(f"Validation details: {validation_details}")
+        return False
+    
+    return True
+
+
+def add_keyword_skills(
+    analyses: List[Dict],
+    skill_extractor: SkillExtractor,
+    doc_embeddings=None
+) -> List[Dict]:
+    """
+    Merge KeyBERT skills into each analysis['skills'] (one batched KeyBERT call)
+    
+    Args:
+        analyses: Results of analyze_resume_for_screening()
+        skill_extractor: Extractor with KeyBERT on the engine's model
+        doc_embeddings: Resume embeddings from semantic scoring (avoids re-encoding)
+    """
+    keyword_skills = skill_extractor.extract_keyword_skills_batch(
+        [analysis['text'] for analysis in analyses], doc_embeddings
+    )
+    for analysis, skills in zip(analyses, keyword_skills):
+        if skills:
+            analysis['skills'] = sorted(set(analysis['skills']) | skills)
+    return analyses
+
+
+def store_resume_vectors(
+    analyses: List[Dict],
+    embeddings,
+    vector_store: ResumeVectorStore,
+    model_id: str
+) -> int:
+    """
+    Add analyzed resumes to the talent pool used by POST /search
+    
+    Args:
+        analyses: Screenable results of analyze_resume_for_screening()
+        embeddings: Their normalized full-document embeddings
+        vector_store: Store to write to
+        model_id: Fingerprint of the model that produced the embeddings
+    
+    Returns:
+        Number of stored resumes
+    """
+    records = []
+    rows = []
+    for i, analysis in enumerate(analyses):
+        features = analysis.get('features')
+        if not features:
+            continue
+        records.append({
+            'content_hash': analysis['content_hash'],
+            'filename': analysis['filename'],
+            'name': features['name'],
+            'email': features['email'],
+            'phone': features['phone'],
+            'experience_years': features['experience_years'],
+            'seniority_level': features['seniority_level'],
+            'education': features['education'],
+            'skills': analysis['skills']
+        })
+        rows.append(i)
+    
+    if not records:
+        return 0
+    return vector_store.upsert(model_id, records, embeddings[rows])
+
+
+def build_candidate_result(
+    analysis: Dict,
+    job_profile: JobProfile,
+    ml_engine: EnhancedMLEngine,
+    skill_extractor: SkillExtractor
+) -> Optional[Dict]:
+    """
+    Score one analyzed resume against a job profile (all but semantic score)
+    
+    Args:
+        analysis: Result of analyze_resume_for_screening()
+        job_profile: JobProfile for the job description
+        ml_engine: Engine providing the scoring formulas
+        skill_extractor: Extractor used for skill matching
+        
+    Returns:
+        Candidate dict (semantic_score/final_score filled by apply_semantic_score),
+        or None if the file is not a usable resume
+    """
+    if not is_screenable(analysis):
+        return None
+    
+    filename = analysis['filename']
+    validation_details = analysis['validation']
+    logger.info(f"✓ {filename} validated as resume (confidence: {validation_details['confidence']}%)")
+    logger.info(f"Sections found: {', '.join(validation_details['sections_found'])}")
+    
+    features = analysis['features']
+    experience_years = features['experience_years']
+    seniority_level = features['seniority_level']
+    education_list = features['education']
+    required_seniority = job_profile.required_seniority
+    
+    # Compute skill match score with details
+    skill_match_score, matched_skills, missing_skills = skill_extractor.compute_skill_match_score(
+        set(analysis['skills']), job_profile.prepared_skills or job_profile.required_skills
+    )
+    
+    experience_score = ml_engine.compute_experience_score(
+        experience_years, job_profile.required_years
+    )
+    
+    # SENIORITY PENALTY: REDUCED to be more like ChatGPT (8% per level instead of 20%)
+    seniority_hierarchy = {'Entry Level': 0, 'Junior': 1, 'Mid-Level': 2, 'Senior': 3, 'Lead/Principal': 4}
+    candidate_level = seniority_hierarchy.get(seniority_level, 0)
+    required_level = seniority_hierarchy.get(required_seniority, 0)
+    
+    if candidate_level < required_level:
+        level_gap = required_level - candidate_level
+        penalty = level_gap * 8  # REDUCED: 8% penalty per level (was 20%)
+        experience_score = max(0, experience_score - penalty)
+        logger.warning(f"Seniority gap: {seniority_level} → {required_seniority}. Penalty: -{penalty}%")
+    elif candidate_level > required_level:
+        # Over-qualified: small bonus
+        bonus = (candidate_level - required_level) * 3
+        experience_score = min(100, experience_score + bonus)
+        logger.info(f"Over-qualified: {seniority_level} → {required_seniority}. Bonus: +{bonus}%")
+    
+    education_score = ml_engine.compute_education_score(
+        education_list
+    )
+    
+    return {
+        'name': features['name'],
+        'email': features['email'],
+        'phone': features['phone'],
+        'filename': filename,
+        'final_score': 0.0,
+        'semantic_score': 0.0,
+        'skill_match_score': skill_match_score,
+        'experience_score': experience_score,
+        'education_score': education_score,
+        'experience_years': experience_years,
+        'seniority_level': seniority_level,
+        'education': education_list,
+        'skills_found': matched_skills,
+        'missing_skills': missing_skills
+    }
+
+
+def apply_semantic_score(
+    candidate: Dict,
+    semantic_score: float,
+    ml_engine: EnhancedMLEngine
+) -> Dict:
+    """Fill in the semantic score and compute the final weighted score"""
+    candidate['semantic_score'] = semantic_score
+    candidate['final_score'] = ml_engine.calculate_final_score(
+        semantic_score,
+        candidate['skill_match_score'],
+        candidate['experience_score'],
+        candidate['education_score']
+    )
+    
+    # Detailed logging for debugging
+    logger.info(f"=== SCORES FOR {candidate['filename']} ===")
+    logger.info(f"Semantic: {semantic_score:.1f}% (weight: 20%)")
+    logger.info(f"Skills: {candidate['skill_match_score']:.1f}% (weight: 40%)")
+    logger.info(f"Experience: {candidate['experience_score']:.1f}% (weight: 30%)")
+    logger.info(f"Education: {candidate['education_score']:.1f}% (weight: 10%)")
+    logger.info(f"FINAL SCORE: {candidate['final_score']:.1f}%")
+    logger.info(f"Matched skills: {len(candidate['skills_found'])}, Missing: {len(candidate['missing_skills'])}")
+    
+    return candidate
@@ -0,0 +1,204 @@
+"""
+Screening Orchestration
+Async coordination of one screening request: job profile, worker pool and batched scoring
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import logging
+
+from backend.core.config import settings
+from backend.core.ml_engine_enhanced import EnhancedMLEngine, JobProfile
+from backend.core.resume_pipeline import (
+    analyze_resume_for_screening, is_screenable, add_keyword_skills,
+    store_resume_vectors, build_candidate_result, apply_semantic_score
+)
+from backend.core.vector_store import get_vector_store
+from backend.core.worker_pool import run_in_process_pool, run_in_thread
+from backend.utils.skill_extractor import SkillExtractor
+
+logger = logging.getLogger(__name__)
+
+
+def build_job_profile(
+    job_description: str,
+    ml_engine: EnhancedMLEngine,
+    skill_extractor: SkillExtractor
+) -> JobProfile:
+    """Encode the job description once and extract its required skills"""
+    job_profile = ml_engine.build_job_profile(job_description)
+    
+    # KeyBERT reuses the JD embedding instead of encoding the text again
+    required_skills = skill_extractor.extract_skills(job_description, job_profile.full_embedding)
+    job_profile.required_skills = list(required_skills)
+    # Normalized and weighted once, reused for every resume
+    job_profile.prepared_skills = skill_extractor.prepare_required_skills(job_profile.required_skills)
+    logger.info(f"Found {len(required_skills)} required skills in job description")
+    logger.info(f"Job requires: {job_profile.required_years} years ({job_profile.required_seniority})")
+    return job_profile
+
+
+def score_analyses(
+    analyses: List[Dict],
+    job_profile: JobProfile,
+    ml_engine: EnhancedMLEngine,
+    skill_extractor: SkillExtractor
+) -> List[Optional[Dict]]:
+    """
+    Score analyzed resumes against a job profile in one batch
+    
+    Full-document embeddings from semantic scoring are handed to one
+    batched KeyBERT call, so every resume is encoded once by the shared model.
+    
+    Returns:
+        Candidate dicts (None where scoring failed), in the order of analyses
+    """
+    semantic_scores, embeddings = ml_engine.score_resumes_with_embeddings(
+        [analysis['text'] for analysis in analyses], job_profile
+    )
+    
+    add_keyword_skills(analyses, skill_extractor, embeddings)
+    
+    if settings.VECTOR_STORE_ENABLED and embeddings is not None and ml_engine.vector_model_id:
+        try:
+            store_resume_vectors(analyses, embeddings, get_vector_store(), ml_engine.vector_model_id)
+        except Exception as e:
+            # The talent pool is best effort; never fail a screening over it
+            logger.error(f"Could not store resume vectors: {e}")
+    
+    candidates = []
+    for analysis, semantic_score in zip(analyses, semantic_scores):
+        try:
+            candidate = build_candidate_result(analysis, job_profile, ml_engine, skill_extractor)
+            if candidate is not None:
+                apply_semantic_score(candidate, semantic_score, ml_engine)
+        except Exception as e:
+            logger.error(f"Error scoring {analysis['filename']}: {e}")
+            candidate = None
+        candidates.append(candidate)
+    
+    return candidates
+
+
+def search_talent_pool(
+    job_description: str,
+    top_k: int,
+    ml_engine: EnhancedMLEngine,
+    skill_extractor: SkillExtractor
+) -> Dict:
+    """
+    Rank previously screened resumes against a job description
+    
+    Candidates are ranked by cosine similarity of the stored full-document
+    embeddings to the JD embedding; skill matches are computed from the
+    stored skills. Nothing is re-parsed or re-encoded except the JD.
+    
+    Returns:
+        {'results': List[Dict], 'pool_size': int, 'required_skills': List[str]}
+    """
+    job_profile = build_job_profile(job_description, ml_engine, skill_extractor)
+    model_id = ml_engine.vector_model_id
+    if not model_id:
+        # Embeddings of an unidentified model were never stored
+        return {'results': [], 'pool_size': 0, 'required_skills': job_profile.required_skills}
+    vector_store = get_vector_store()
+    
+    start = time.perf_counter()
+    hits = vector_store.search(model_id, job_profile.full_embedding, top_k)
+    
+    results = []
+    for similarity, record in hits:
+        skill_match_score, matched_skills, missing_skills = skill_extractor.compute_skill_match_score(
+            set(record['skills'] or []), job_profile.prepared_skills
+        )
+        results.append({
+            'name': record['name'],
+            'email': record['email'],
+            'phone': record['phone'],
+            'filename': record['filename'],
+            'similarity': round(max(0.0, min(100.0, similarity * 100)), 2),
+            'skill_match_score': skill_match_score,
+            'experience_years': record['experience_years'],
+            'seniority_level': record['seniority_level'],
+            'education': record['education'] or [],
+            'skills_found': matched_skills,
+            'missing_skills': missing_skills,
+            'indexed_at': record['updated_at']
+        })
+    
+    logger.info(f"Talent pool search: {len(results)} hits in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return {
+        'results': results,
+        'pool_size': vector_store.count(model_id),
+        'required_skills': job_profile.required_skills
+    }
+
+
+async def iter_screening_results(
+    uploads: List[Tuple[str, bytes]],
+    job_profile: JobProfile,
+    ml_engine: EnhancedMLEngine,
+    skill_extractor: SkillExtractor
+) -> AsyncIterator[Tuple[str, Optional[Dict]]]:
+    """
+    Screen resumes and yield each one as soon as it is scored
+    
+    Analysis runs in the process pool. Whenever analyses finish, all
+    resumes that are ready are semantically scored together in one
+    batch, so batches grow naturally while the scorer is busy. KeyBERT
+    skill extraction then reuses the embeddings from that batch.
+    
+    Args:
+        uploads: (filename, content) pairs
+        job_profile: JobProfile for the job description
+        ml_engine: Engine used for scoring
+        skill_extractor: Extractor used for skill matching
+    
+    Yields:
+        (filename, candidate) in completion order; candidate is None for
+        files that failed or are not resumes
+    """
+    tasks = {
+        asyncio.ensure_future(
+            run_in_process_pool(analyze_resume_for_screening, filename, content)
+        ): filename
+        for filename, content in uploads
+    }
+    pending = set(tasks)
+    
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            
+            ready = []
+            for task in done:
+                filename = tasks[task]
+                try:
+                    analysis = task.result()
+                    usable = is_screenable(analysis)
+                except Exception as e:
+                    logger.error(f"Error processing {filename}: {e}")
+                    usable = False
+                
+                if usable:
+                    ready.append(analysis)
+                else:
+                    yield filename, None
+            
+            if not ready:
+                continue
+            
+            # Semantic similarity and KeyBERT for every resume that is ready, in one batch
+            candidates = await run_in_thread(
+                score_analyses, ready, job_profile, ml_engine, skill_extractor
+            )
+            
+            for analysis, candidate in zip(ready, candidates):
+                if candidate is not None:
+                    logger.info(f"Processed {candidate['filename']}: Score = {candidate['final_score']}")
+                yield analysis['filename'], candidate
+    finally:
+        # Consumer stopped early (e.g. client disconnected)
+        for task in pending:
+            task.cancel()
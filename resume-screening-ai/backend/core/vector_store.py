@@ -0,0 +1,535 @@
+"""
+Resume Vector Store
+Persists every screened resume's embedding and extracted features so a job
+description can be searched against the whole historical talent pool
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import logging
+
+from sqlalchemy import (
+    JSON, Column, Float, Integer, MetaData, String, Table, UniqueConstraint,
+    create_engine, func, select, update
+)
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from backend.core.ann_index import IVFPQIndex
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rows allocated when a vector file is first created
+INITIAL_CAPACITY = 1024
+
+# Tries of an upsert that lost a race with another process (same resume
+# inserted concurrently, or the database stayed locked past its busy timeout)
+_UPSERT_ATTEMPTS = 5
+
+# Rows per IVFPQIndex.add call while building an index
+_ANN_ADD_BLOCK = 65536
+
+# Rows written by other processes are picked up by updated_at, which a writer
+# stamps before its transaction commits; look back this far to not miss them
+_ANN_SYNC_SLACK = 60.0
+
+metadata = MetaData()
+
+# One row per (resume content, model); row_index points into that model's vector file
+resume_vectors = Table(
+    'resume_vectors',
+    metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('model_id', String(255), nullable=False, index=True),
+    Column('content_hash', String(64), nullable=False),
+    Column('row_index', Integer, nullable=False),
+    Column('filename', String(512)),
+    Column('name', String(255)),
+    Column('email', String(255)),
+    Column('phone', String(64)),
+    Column('experience_years', Float),
+    Column('seniority_level', String(64)),
+    Column('education', JSON),
+    Column('skills', JSON),
+    Column('updated_at', Float, nullable=False),
+    UniqueConstraint('model_id', 'content_hash', name='uq_resume_vectors_model_content'),
+    UniqueConstraint('model_id', 'row_index', name='uq_resume_vectors_model_row'),
+)
+
+# Next free row_index per model. Allocating rows updates this row, which
+# locks it until commit, so allocation and vector file growth of a model are
+# serialized across processes on databases with row locks.
+resume_vector_rows = Table(
+    'resume_vector_rows',
+    metadata,
+    Column('model_id', String(255), primary_key=True),
+    Column('next_row', Integer, nullable=False),
+)
+
+
+class _VectorFile:
+    """
+    (capacity, dim) float32 memmap holding one model's resume embeddings
+    Rows past the store's size are unused; the file grows by doubling
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.matrix: Optional[np.memmap] = None
+    
+    def _open(self, dim: int):
+        capacity = os.path.getsize(self.path) // (dim * 4)
+        self.matrix = np.memmap(self.path, dtype=np.float32, mode='r+', shape=(capacity, dim))
+    
+    def ensure(self, rows: int, dim: int):
+        """Make sure rows fit, re-opening if another process grew the file"""
+        if self.matrix is not None and self.matrix.shape[0] >= rows:
+            return
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = os.path.getsize(self.path) if self.path.exists() else 0
+        capacity = size // (dim * 4)
+        if capacity < rows:
+            capacity = max(INITIAL_CAPACITY, capacity)
+            while capacity < rows:
+                capacity *= 2
+            with open(self.path, 'ab') as f:
+                f.truncate(capacity * dim * 4)
+        self._open(dim)
+    
+    def view(self, rows: int, dim: int) -> Optional[np.ndarray]:
+        """First rows of the matrix (None if the file does not exist yet)"""
+        if not self.path.exists():
+            return None
+        if self.matrix is None or self.matrix.shape[0] < rows or self.matrix.shape[1] != dim:
+            self._open(dim)
+        return self.matrix[:rows]
+
+
+def _model_digest(model_id: str) -> str:
+    return hashlib.sha256(model_id.encode('utf-8')).hexdigest()[:16]
+
+
+def _snapshot_time(name: str) -> int:
+    """Creation time (ns) of an ANN snapshot directory named '<time_ns>-<pid>'"""
+    try:
+        return int(name.split('-')[0])
+    except ValueError:
+        return -1
+
+
+class _AnnState:
+    """
+    One model's ANN index plus what it has seen of the store
+    index.info holds 'built_size' (pool size at training) and 'synced_at'
+    """
+    
+    def __init__(self, index: IVFPQIndex):
+        self.index = index
+        # row_index -> updated_at of rows indexed inside the current slack window
+        self.recent: Dict[int, float] = {}
+
+
+class ResumeVectorStore:
+    """
+    Resume embeddings in numpy memmaps, features in the DATABASE_URL database
+    
+    Vectors of each model fingerprint live in their own file, since
+    embeddings of different models are not comparable. A resume that is
+    screened again keeps its row: its vector and features are overwritten.
+    Several processes can upsert into the same store: row indexes come
+    from a per-model counter row updated inside the upsert transaction
+    (which SQLite runs as BEGIN IMMEDIATE, holding the database write lock
+    throughout), the vector file is grown while that lock is held, and an
+    upsert that loses a race is retried.
+    
+    Pools of at least ann_min_pool_size resumes are searched through an
+    IVF-PQ index (None = always scan). The index is built in a background
+    thread once a search finds the pool large enough (searches scan until
+    it is ready), caught up with changed rows before every search and
+    snapshotted (also in the background) under vectors_dir, where other
+    processes load it memory-mapped.
+    """
+    
+    def __init__(self, vectors_dir: Path, database_url: str, ann_min_pool_size: Optional[int] = None):
+        self.vectors_dir = Path(vectors_dir)
+        self.vectors_dir.mkdir(parents=True, exist_ok=True)
+        self.db = create_engine(database_url, future=True)
+        metadata.create_all(self.db)
+        self.ann_min_pool_size = ann_min_pool_size
+        self._files: Dict[str, _VectorFile] = {}
+        self._ann: Dict[str, _AnnState] = {}
+        self._ann_tasks: Dict[str, threading.Thread] = {}  # Background build or snapshot per model
+        self._lock = threading.Lock()
+        self._ann_lock = threading.Lock()
+    
+    def _file(self, model_id: str) -> _VectorFile:
+        vector_file = self._files.get(model_id)
+        if vector_file is None:
+            vector_file = _VectorFile(self.vectors_dir / f"vectors-{_model_digest(model_id)}.f32")
+            self._files[model_id] = vector_file
+        return vector_file
+    
+    def upsert(self, model_id: str, records: List[Dict], embeddings: np.ndarray) -> int:
+        """
+        Store resumes and their normalized embeddings
+        
+        Args:
+            model_id: Fingerprint of the model that produced the embeddings
+            records: Dicts with 'content_hash' and optional 'filename', 'name',
+                     'email', 'phone', 'experience_years', 'seniority_level',
+                     'education', 'skills'
+            embeddings: (len(records), dim) matrix
+        
+        Returns:
+            Number of stored resumes
+        """
+        if not records:
+            return 0
+        
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(records), -1)
+        now = time.time()
+        for attempt in range(_UPSERT_ATTEMPTS):
+            try:
+                with self._lock, self._write_transaction() as conn:
+                    self._upsert_rows(conn, model_id, records, embeddings, now)
+                break
+            except (IntegrityError, OperationalError) as e:
+                if attempt == _UPSERT_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"Retrying vector store upsert after a concurrent write: {e}")
+                time.sleep(0.05 * (attempt + 1))
+        
+        return len(records)
+    
+    @contextmanager
+    def _write_transaction(self):
+        """
+        Connection in a transaction that commits on success
+        On SQLite it starts with BEGIN IMMEDIATE: the write lock is taken
+        (waiting for other writers) before anything is read, instead of on
+        the first write, where a concurrent writer would fail it
+        """
+        with self.db.connect() as conn:
+            if self.db.dialect.name == 'sqlite':
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+    
+    def _upsert_rows(self, conn, model_id: str, records: List[Dict], embeddings: np.ndarray, now: float):
+        """Write records and their vectors (caller holds the write transaction)"""
+        columns = [
+            'filename', 'name', 'email', 'phone',
+            'experience_years', 'seniority_level', 'education', 'skills'
+        ]
+        hashes = [record['content_hash'] for record in records]
+        existing = dict(conn.execute(
+            select(resume_vectors.c.content_hash, resume_vectors.c.row_index).where(
+                resume_vectors.c.model_id == model_id,
+                resume_vectors.c.content_hash.in_(hashes)
+            )
+        ).all())
+        new_hashes = list(dict.fromkeys(h for h in hashes if h not in existing))
+        next_row = self._allocate_rows(conn, model_id, len(new_hashes))
+        for content_hash in new_hashes:
+            existing[content_hash] = next_row
+            next_row += 1
+        
+        rows = []
+        inserted = set()
+        for record in records:
+            values = {column: record.get(column) for column in columns}
+            values['updated_at'] = now
+            content_hash = record['content_hash']
+            row_index = existing[content_hash]
+            if content_hash in new_hashes and content_hash not in inserted:
+                inserted.add(content_hash)
+                conn.execute(resume_vectors.insert().values(
+                    model_id=model_id, content_hash=content_hash, row_index=row_index, **values
+                ))
+            else:
+                conn.execute(resume_vectors.update().where(
+                    resume_vectors.c.model_id == model_id,
+                    resume_vectors.c.row_index == row_index
+                ).values(**values))
+            rows.append(row_index)
+        
+        # Still inside the transaction: file growth is serialized with row allocation
+        vector_file = self._file(model_id)
+        vector_file.ensure(max(rows) + 1, embeddings.shape[1])
+        vector_file.matrix[rows] = embeddings
+        vector_file.matrix.flush()
+    
+    def _allocate_rows(self, conn, model_id: str, count: int) -> int:
+        """
+        First of count consecutive new row indexes for a model
+        The counter row stays locked until the transaction ends; two
+        processes creating a model's counter at once make one of them fail
+        with an IntegrityError (and retry)
+        """
+        counter = resume_vector_rows.c.model_id == model_id
+        claimed = conn.execute(
+            update(resume_vector_rows).where(counter).values(next_row=resume_vector_rows.c.next_row + count)
+        ).rowcount
+        if claimed:
+            return conn.execute(select(resume_vector_rows.c.next_row).where(counter)).scalar_one() - count
+        
+        # First upsert for this model (or a store written before the counter existed)
+        first = conn.execute(
+            select(func.coalesce(func.max(resume_vectors.c.row_index), -1))
+            .where(resume_vectors.c.model_id == model_id)
+        ).scalar_one() + 1
+        conn.execute(resume_vector_rows.insert().values(model_id=model_id, next_row=first + count))
+        return first
+    
+    def count(self, model_id: str) -> int:
+        """Number of stored resumes for a model"""
+        with self.db.connect() as conn:
+            return conn.execute(
+                select(func.count()).select_from(resume_vectors)
+                .where(resume_vectors.c.model_id == model_id)
+            ).scalar_one()
+    
+    def search(
+        self,
+        model_id: str,
+        query_embedding: np.ndarray,
+        top_k: int = 10
+    ) -> List[Tuple[float, Dict]]:
+        """
+        Most similar stored resumes by cosine similarity
+        
+        Args:
+            model_id: Fingerprint of the model that produced query_embedding
+            query_embedding: Normalized (dim,) embedding
+            top_k: Number of results
+        
+        Returns:
+            (similarity, record) pairs, most similar first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        started = time.time()
+        
+        with self.db.connect() as conn:
+            size = conn.execute(
+                select(func.coalesce(func.max(resume_vectors.c.row_index), -1))
+                .where(resume_vectors.c.model_id == model_id)
+            ).scalar_one() + 1
+            if size == 0 or top_k <= 0:
+                return []
+            
+            with self._lock:
+                matrix = self._file(model_id).view(size, query.shape[0])
+            if matrix is None:
+                return []
+            
+            if self.ann_min_pool_size is not None and size >= self.ann_min_pool_size:
+                # Approximate candidates, re-scored exactly against the stored vectors
+                candidates = self._ann_candidates(
+                    conn, model_id, matrix, query, top_k * settings.ANN_RERANK_FACTOR, started
+                )
+            else:
+                candidates = None
+            if candidates is not None:
+                candidates = np.sort(candidates)
+                scores = matrix[candidates] @ query
+            else:
+                scores = matrix @ query
+            
+            top_k = min(top_k, len(scores))
+            if top_k == 0:
+                return []
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+            top_rows = top if candidates is None else candidates[top]
+            
+            rows = conn.execute(
+                select(resume_vectors).where(
+                    resume_vectors.c.model_id == model_id,
+                    resume_vectors.c.row_index.in_([int(i) for i in top_rows])
+                )
+            ).mappings().all()
+        
+        by_row = {row['row_index']: dict(row) for row in rows}
+        return [
+            (float(scores[i]), by_row[int(row)])
+            for i, row in zip(top, top_rows) if int(row) in by_row
+        ]
+    
+    def _ann_candidates(
+        self,
+        conn,
+        model_id: str,
+        matrix: np.ndarray,
+        query: np.ndarray,
+        n_candidates: int,
+        started: float
+    ) -> Optional[np.ndarray]:
+        """
+        Row indexes of the approximate nearest stored vectors, or None
+        while the model's first index is still being built (scan instead)
+        """
+        with self._ann_lock:
+            state = self._ann.get(model_id)
+            if state is None:
+                index = self._load_index(model_id)
+                state = _AnnState(index) if index is not None else None
+            if state is not None and state.index.dim != matrix.shape[1]:
+                state = None
+            
+            if state is None or len(matrix) > state.index.info['built_size'] * settings.ANN_RETRAIN_GROWTH:
+                # Until the new index is ready an outgrown one keeps serving
+                self._start_task(model_id, self._run_build, matrix, time.time())
+            if state is None:
+                return None
+            
+            self._catch_up(conn, model_id, state, matrix, started)
+            self._ann[model_id] = state
+            if state.index.pending >= settings.ANN_SNAPSHOT_EVERY:
+                self._start_task(model_id, self._run_snapshot, state.index.copy())
+            
+            ids, _ = state.index.search(query, n_candidates, settings.ANN_NPROBE)
+        return ids
+    
+    def _start_task(self, model_id: str, target, *args):
+        """Run target(model_id, *args) on a background thread unless one is running (caller holds _ann_lock)"""
+        if model_id in self._ann_tasks:
+            return
+        thread = threading.Thread(target=target, args=(model_id, *args), name="ann-index", daemon=True)
+        self._ann_tasks[model_id] = thread
+        thread.start()
+    
+    def _run_build(self, model_id: str, matrix: np.ndarray, started: float):
+        try:
+            index = self._build_index(model_id, matrix, started)
+        except Exception as e:
+            logger.error(f"ANN index build failed; searches keep scanning: {e}")
+            index = None
+        with self._ann_lock:
+            if index is not None:
+                # Rows changed since started are caught up by the next search
+                self._ann[model_id] = _AnnState(index)
+            del self._ann_tasks[model_id]
+    
+    def _run_snapshot(self, model_id: str, index: IVFPQIndex):
+        """
+        Snapshot a copy of the live index and swap in its reload; rows the
+        live index took in meanwhile are re-added by the next catch-up,
+        which starts again from the copy's synced_at
+        """
+        index = self._save_index(model_id, index)
+        with self._ann_lock:
+            self._ann[model_id] = _AnnState(index)
+            del self._ann_tasks[model_id]
+    
+    def _build_index(self, model_id: str, matrix: np.ndarray, started: float) -> IVFPQIndex:
+        """Train an index on a sample of the pool, add every row and snapshot it"""
+        size, dim = matrix.shape
+        logger.info(f"Building ANN index over {size} resumes")
+        build_start = time.perf_counter()
+        
+        # ~4 * sqrt(N) inverted lists keeps list scans and centroid ranking balanced
+        index = IVFPQIndex(
+            dim, max(1, int(4 * np.sqrt(size))),
+            IVFPQIndex.choose_subvectors(dim, settings.ANN_SUBVECTORS)
+        )
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(size, size=min(size, settings.ANN_TRAIN_SAMPLE), replace=False))
+        index.train(matrix[sample])
+        for start in range(0, size, _ANN_ADD_BLOCK):
+            end = min(start + _ANN_ADD_BLOCK, size)
+            index.add(np.arange(start, end), matrix[start:end])
+        index.info = {'built_size': size, 'synced_at': started}
+        
+        logger.info(f"ANN index built in {time.perf_counter() - build_start:.1f}s")
+        return self._save_index(model_id, index)
+    
+    def _catch_up(self, conn, model_id: str, state: _AnnState, matrix: np.ndarray, started: float):
+        """Re-index rows inserted or updated (by any process) since the last sync"""
+        changed = conn.execute(
+            select(resume_vectors.c.row_index, resume_vectors.c.updated_at).where(
+                resume_vectors.c.model_id == model_id,
+                resume_vectors.c.updated_at >= state.index.info['synced_at'] - _ANN_SYNC_SLACK
+            )
+        ).all()
+        # Rows past the matrix were committed after it was sized; the next search takes them
+        changed = [(row, updated_at) for row, updated_at in changed if row < len(matrix)]
+        
+        fresh = np.array([row for row, updated_at in changed if state.recent.get(row) != updated_at], dtype=np.int64)
+        if len(fresh):
+            state.index.add(fresh, matrix[fresh])
+        
+        state.recent = {row: updated_at for row, updated_at in changed if updated_at >= started - _ANN_SYNC_SLACK}
+        state.index.info['synced_at'] = started
+    
+    def _ann_dir(self, model_id: str) -> Path:
+        return self.vectors_dir / f"ann-{_model_digest(model_id)}"
+    
+    def _save_index(self, model_id: str, index: IVFPQIndex) -> IVFPQIndex:
+        """
+        Snapshot to a fresh directory, point CURRENT at it and return the
+        memory-mapped reload (which drops the in-memory insert lists), or
+        index itself if the snapshot could not be written or read back
+        """
+        root = self._ann_dir(model_id)
+        pointer = root / "CURRENT"
+        snapshot = root / f"{time.time_ns()}-{os.getpid()}"
+        try:
+            previous = pointer.read_text().strip() if pointer.exists() else None
+            index.save(snapshot)
+            
+            tmp_pointer = root / f"CURRENT.{os.getpid()}.tmp"
+            tmp_pointer.write_text(snapshot.name)
+            os.replace(tmp_pointer, pointer)
+        except OSError as e:
+            logger.warning(f"Could not snapshot ANN index, keeping it in memory: {e}")
+            return index
+        
+        # Only snapshots older than the one this save replaced: newer ones may
+        # be another process's, about to be loaded. Readers that still map an
+        # old snapshot keep their open files.
+        if previous is not None:
+            cutoff = _snapshot_time(previous)
+            for old in root.iterdir():
+                if old.is_dir() and _snapshot_time(old.name) < cutoff and (old / "meta.json").exists():
+                    shutil.rmtree(old, ignore_errors=True)
+        
+        try:
+            return IVFPQIndex.load(snapshot)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not reload ANN snapshot, keeping the index in memory: {e}")
+            return index
+    
+    def _load_index(self, model_id: str) -> Optional[IVFPQIndex]:
+        """Latest snapshot written by any process (None if there is none)"""
+        pointer = self._ann_dir(model_id) / "CURRENT"
+        if not pointer.exists():
+            return None
+        try:
+            return IVFPQIndex.load(self._ann_dir(model_id) / pointer.read_text().strip())
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load ANN snapshot, rebuilding: {e}")
+            return None
+
+
+# Singleton instance
+_vector_store = None
+
+
+def get_vector_store() -> ResumeVectorStore:
+    """Get or create resume vector store singleton"""
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = ResumeVectorStore(
+            settings.VECTOR_STORE_DIR,
+            settings.DATABASE_URL,
+            ann_min_pool_size=settings.ANN_MIN_POOL_SIZE if settings.ANN_ENABLED else None
+        )
+    return _vector_store
@@ -0,0 +1,166 @@
+"""
+Model Warm-up and Readiness
+Heavy resources (sentence-transformer, KeyBERT, spaCy, NLTK, worker
+processes) load lazily, normally in a background thread started with the
+server, so the app accepts connections (and passes /health) immediately.
+/ready reports the load state and timing of every component.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Encoded once after loading so the first request does not pay for lazy
+# backend initialization (allocator growth, kernel selection, ONNX session warm-up)
+WARMUP_TEXT = (
+    "Senior Python developer with 5 years of experience building Django and "
+    "FastAPI services on AWS, PostgreSQL and Docker."
+)
+
+
+class ComponentRegistry:
+    """
+    Load-once components with per-component state and timings
+    
+    state: pending -> loading -> ready | failed
+    A failed component is retried by the next load() call. Concurrent
+    callers of load() wait for the same load instead of starting another.
+    """
+    
+    def __init__(self, names: List[str]):
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in names}
+        self._values = {}
+        self._status: Dict[str, Dict] = {
+            name: {'state': 'pending', 'seconds': None, 'error': None} for name in names
+        }
+    
+    def load(self, name: str, loader: Callable):
+        """Value of a component, calling loader() on first use"""
+        with self._load_locks[name]:
+            if name in self._values:
+                return self._values[name]
+            
+            self._update(name, state='loading', error=None)
+            start = time.perf_counter()
+            try:
+                value = loader()
+            except Exception as e:
+                self._update(name, state='failed', seconds=round(time.perf_counter() - start, 3), error=str(e))
+                logger.error(f"Failed to load {name}: {e}")
+                raise
+            seconds = round(time.perf_counter() - start, 3)
+            self._values[name] = value
+            self._update(name, state='ready', seconds=seconds)
+            logger.info(f"Loaded {name} in {seconds:.2f}s")
+            return value
+    
+    def _update(self, name: str, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+    
+    def status(self) -> Dict:
+        """{'ready': bool, 'components': {name: {'state', 'seconds', 'error'}}}"""
+        with self._lock:
+            components = {name: dict(status) for name, status in self._status.items()}
+        return {
+            'ready': all(status['state'] == 'ready' for status in components.values()),
+            'components': components
+        }
+
+
+def _component_names() -> List[str]:
+    """Components this process needs before it can serve screening requests"""
+    names = ['ml_engine', 'encoder_warmup', 'skill_extractor']
+    # Per-resume parsing and NLP run in pool workers, or here when there is no pool
+    names.append('worker_pool' if settings.PROCESS_POOL_WORKERS > 0 else 'nlp')
+    return names
+
+
+_registry = ComponentRegistry(_component_names())
+
+
+def _load_engine():
+    from backend.core.ml_engine_enhanced import get_enhanced_ml_engine
+    return get_enhanced_ml_engine(use_custom=True)
+
+
+def _load_skill_extractor(engine):
+    from backend.utils.skill_extractor import get_skill_extractor
+    # KeyBERT runs on the engine's model (and inference backend) instead of loading its own
+    return get_skill_extractor(keybert_model=engine.encoder)
+
+
+def _load_nlp():
+    from backend.utils.resume_validator import get_resume_validator
+    return get_resume_validator()
+
+
+def _start_workers():
+    from backend.core.worker_pool import start_process_pool_workers
+    return start_process_pool_workers()
+
+
+def get_ml_engine():
+    """The scoring engine (custom model if trained), loaded and warmed up on first use"""
+    engine = _registry.load('ml_engine', _load_engine)
+    _registry.load('encoder_warmup', lambda: engine.warm_up(WARMUP_TEXT))
+    return engine
+
+
+def get_screening_models() -> Tuple:
+    """(EnhancedMLEngine, SkillExtractor), loading them on first use (blocking)"""
+    engine = get_ml_engine()
+    skill_extractor = _registry.load('skill_extractor', lambda: _load_skill_extractor(engine))
+    return engine, skill_extractor
+
+
+def _load_resume_processing():
+    """spaCy/NLTK here, or the worker processes (each loading its own) when pooled"""
+    if settings.PROCESS_POOL_WORKERS > 0:
+        _registry.load('worker_pool', _start_workers)
+    else:
+        _registry.load('nlp', _load_nlp)
+
+
+def preload():
+    """
+    Load every component without running inference (the prefork parent:
+    the warm-up encode happens in each worker, after fork)
+    """
+    engine = _registry.load('ml_engine', _load_engine)
+    _registry.load('skill_extractor', lambda: _load_skill_extractor(engine))
+    _load_resume_processing()
+
+
+def warm_up():
+    """Load every component; failures are logged and retried on first use"""
+    start = time.perf_counter()
+    for load in (get_screening_models, _load_resume_processing):
+        try:
+            load()
+        except Exception:
+            pass  # State and error are in readiness_status()
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def start_warmup() -> threading.Thread:
+    """Run warm_up() in a daemon thread (once per process)"""
+    global _warmup_thread
+    if _warmup_thread is None:
+        _warmup_thread = threading.Thread(target=warm_up, name="model-warmup", daemon=True)
+        _warmup_thread.start()
+    return _warmup_thread
+
+
+def readiness_status() -> Dict:
+    """Per-component load state and timings, for /ready"""
+    return _registry.status()
@@ -0,0 +1,118 @@
+"""
+Worker Pool for CPU-Bound Resume Processing
+Keeps PDF parsing, spaCy, KeyBERT and torch inference off the event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+import logging
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    """
+    Runs once in every worker process when it starts
+    Loads the per-process models so individual tasks don't pay for it
+    """
+    try:
+        import torch
+        # N workers x M torch threads must not oversubscribe the cores
+        torch.set_num_threads(settings.WORKER_TORCH_THREADS)
+    except ImportError:
+        pass
+    
+    from backend.utils.resume_validator import get_resume_validator
+    from backend.utils.skill_extractor import get_skill_extractor
+    
+    get_resume_validator()
+    get_skill_extractor()
+
+
+# Singleton instance
+_process_pool = None
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get or create the process pool singleton
+    
+    Returns:
+        ProcessPoolExecutor, or None when PROCESS_POOL_WORKERS is 0
+        (work then runs in the event loop's default thread pool)
+    """
+    global _process_pool
+    if settings.PROCESS_POOL_WORKERS <= 0:
+        return None
+    
+    if _process_pool is None:
+        logger.info(
+            f"Starting process pool with {settings.PROCESS_POOL_WORKERS} workers "
+            f"({settings.PROCESS_POOL_START_METHOD})"
+        )
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context(settings.PROCESS_POOL_START_METHOD),
+            initializer=_init_worker
+        )
+    return _process_pool
+
+
+def _worker_pid(_) -> int:
+    return os.getpid()
+
+
+def start_process_pool_workers() -> int:
+    """
+    Start the pool's workers now rather than on the first request
+    Each one runs _init_worker as it starts
+    
+    Returns:
+        Number of workers that answered (0 without a pool)
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return 0
+    # One task per worker; workers are spawned on submit while none is idle
+    return len(set(pool.map(_worker_pid, range(settings.PROCESS_POOL_WORKERS))))
+
+
+def shutdown_process_pool():
+    """Stop worker processes (called on application shutdown)"""
+    global _process_pool
+    if _process_pool is not None:
+        logger.info("Shutting down process pool")
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+async def run_in_process_pool(fn: Callable, *args):
+    """
+    Run a picklable module-level function in the worker pool
+    
+    A crashed worker breaks the whole executor, so the pool is dropped
+    and recreated on the next call.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_process_pool(), fn, *args)
+    except BrokenProcessPool:
+        logger.error("Process pool is broken; it will be restarted on the next request")
+        shutdown_process_pool()
+        raise
+
+
+async def run_in_thread(fn: Callable, *args):
+    """
+    Run a blocking function in the default thread pool
+    Used for work that needs objects living in the API process (e.g. the
+    sentence-transformer), where torch releases the GIL during inference
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, fn, *args)
@@ -16,6 +16,8 @@ sys.path.insert(0, str(root_dir))
 
 from backend.api.routes import router as api_router
 from backend.core.config import settings
+from backend.core.warmup import readiness_status, start_warmup
+from backend.core.worker_pool import shutdown_process_pool
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -39,6 +41,19 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Load models in the background; the server accepts requests meanwhile"""
+    if settings.WARMUP_ON_STARTUP:
+        start_warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background worker processes"""
+    shutdown_process_pool()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -59,6 +74,16 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once every model is loaded and warmed up, else 503
+    Reports the state (pending, loading, ready, failed) and load time of each component
+    """
+    status = readiness_status()
+    return JSONResponse(status_code=200 if status['ready'] else 503, content=status)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
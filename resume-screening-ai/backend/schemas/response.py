@@ -27,6 +27,31 @@ class StatisticsResponse(BaseModel):
     qualified_candidates: int
 
 
+class SearchResult(BaseModel):
+    """Schema for one talent pool search hit"""
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    filename: Optional[str] = None
+    similarity: float  # Cosine similarity to the job description (0-100)
+    skill_match_score: float
+    experience_years: Optional[float] = None
+    seniority_level: Optional[str] = None
+    education: List[str] = []
+    skills_found: List[str] = []
+    missing_skills: List[str] = []
+    indexed_at: Optional[float] = None  # Unix time the resume was last screened
+
+
+class SearchResponse(BaseModel):
+    """Schema for talent pool search response"""
+    results: List[SearchResult]
+    total_results: int
+    pool_size: int  # Resumes searchable with the current model
+    required_skills: List[str]
+    search_time: float
+
+
 class BatchProcessingStatus(BaseModel):
     """Schema for batch processing status"""
     job_id: str
@@ -34,4 +59,6 @@ class BatchProcessingStatus(BaseModel):
     total_files: int
     processed_files: int
     progress_percentage: float
-    results: Optional[List[Dict[str, Any]]] = None
+    results: Optional[List[Dict[str, Any]]] = None  # Ranked, partial while processing
+    error: Optional[str] = None
+    processing_time: Optional[float] = None
@@ -10,6 +10,9 @@ from pathlib import Path
 from typing import Optional, Tuple
 import logging
 
+from backend.utils.helpers import is_path_source, read_source_bytes, as_binary_stream
+from backend.utils.parser import ResumeSource
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,16 +63,20 @@ class AdvancedTextExtractor:
         return text
     
     @staticmethod
-    def extract_from_pdf(file_path: str) -> Tuple[str, bool]:
+    def extract_from_pdf(source: ResumeSource) -> Tuple[str, bool]:
         """
         Extract text from PDF using PyMuPDF
+        Accepts a path, PDF bytes or a binary stream (parsed in memory)
         Returns: (text, success)
         """
         try:
             text_chunks = []
             
-            # Open PDF
-            doc = fitz.open(file_path)
+            # Open PDF (in-memory content never touches the disk)
+            if is_path_source(source):
+                doc = fitz.open(str(source))
+            else:
+                doc = fitz.open(stream=read_source_bytes(source), filetype="pdf")
             
             # Extract from each page
             for page_num, page in enumerate(doc):
@@ -104,13 +111,14 @@ class AdvancedTextExtractor:
             return "", False
     
     @staticmethod
-    def extract_from_docx(file_path: str) -> Tuple[str, bool]:
+    def extract_from_docx(source: ResumeSource) -> Tuple[str, bool]:
         """
         Extract text from DOCX
+        Accepts a path, DOCX bytes or a binary stream (parsed in memory)
         Returns: (text, success)
         """
         try:
-            doc = docx.Document(file_path)
+            doc = docx.Document(str(source) if is_path_source(source) else as_binary_stream(source))
             
             text_chunks = []
             
@@ -144,22 +152,28 @@ class AdvancedTextExtractor:
             return "", False
     
     @staticmethod
-    def extract_text(file_path: str) -> str:
+    def extract_text(source: ResumeSource, filename: Optional[str] = None) -> str:
         """
         Auto-detect file type and extract text
+        For bytes or streams the file type is taken from ``filename``
         """
-        path = Path(file_path)
-        extension = path.suffix.lower()
+        if is_path_source(source):
+            filename = filename or str(source)
+        elif not filename:
+            logger.error("A filename is required to extract in-memory content")
+            return ""
+        
+        extension = Path(filename).suffix.lower()
         
         if extension == '.pdf':
-            text, success = AdvancedTextExtractor.extract_from_pdf(file_path)
+            text, success = AdvancedTextExtractor.extract_from_pdf(source)
         elif extension in ['.docx', '.doc']:
-            text, success = AdvancedTextExtractor.extract_from_docx(file_path)
+            text, success = AdvancedTextExtractor.extract_from_docx(source)
         else:
             logger.error(f"Unsupported file type: {extension}")
             return ""
         
         if not success:
-            logger.error(f"Failed to extract text from {file_path}")
+            logger.error(f"Failed to extract text from {filename}")
         
         return text
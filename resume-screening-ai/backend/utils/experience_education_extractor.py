@@ -10,7 +10,7 @@ Uses regex patterns and NLP (spaCy NER) to extract:
 import re
 from typing import Dict, List, Tuple, Optional
 import logging
-from backend.utils.nlp_processor import NLPProcessor
+from backend.utils.nlp_processor import DocumentContext, get_nlp_processor
 
 logger = logging.getLogger(__name__)
 
@@ -18,18 +18,22 @@ logger = logging.getLogger(__name__)
 class ExperienceExtractor:
     """
     Extract work experience from resume using NLP + regex
+    
+    Stateless after construction, so one instance (get_experience_extractor)
+    is shared across requests and threads. All regexes are compiled once
+    when the class is loaded.
     """
     
     def __init__(self):
         """Initialize with NLP processor for date extraction"""
         try:
-            self.nlp_processor = NLPProcessor()
+            self.nlp_processor = get_nlp_processor()
         except Exception as e:
             logger.warning(f"NLP processor not available: {e}")
             self.nlp_processor = None
     
     # Experience patterns
-    EXPERIENCE_PATTERNS = [
+    EXPERIENCE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
         # "5 years of experience"
         r'(\d+(?:\.\d+)?)\s*(?:\+)?\s*years?\s+(?:of\s+)?experience',
         
@@ -44,14 +48,39 @@ class ExperienceExtractor:
         
         # "5 years in Python"
         r'(\d+(?:\.\d+)?)\s*(?:\+)?\s*years?\s+(?:in|with|using)',
-    ]
+    ]]
+    
+    # Work history date ranges
+    DATE_RANGE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+        # YYYY - YYYY or YYYY-YYYY
+        r'(\d{4})\s*[-–—]\s*(\d{4})',
+        # YYYY - Present/Current
+        r'(\d{4})\s*[-–—]\s*(?:present|current|now)',
+        # Month YYYY - Month YYYY (e.g., "Jan 2019 - Dec 2023")
+        r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+(\d{4})\s*[-–—]\s*(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+(\d{4})',
+        # Month YYYY - Present
+        r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+(\d{4})\s*[-–—]\s*(?:present|current|now)',
+    ]]
     
-    def extract_years_of_experience(self, text: str) -> float:
+    # Common job title patterns
+    TITLE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'(?:software|backend|frontend|full[- ]stack|data|ml|devops|cloud)\s+(?:engineer|developer|architect|scientist|analyst)',
+        r'(?:senior|junior|lead|principal|staff)\s+(?:engineer|developer|architect|scientist)',
+        r'(?:team|tech|technical)\s+lead',
+        r'(?:engineering|development)\s+manager',
+        r'(?:cto|vp|director)\s+(?:of\s+)?(?:engineering|technology)',
+    ]]
+    
+    def extract_years_of_experience(self, text: str, context: Optional[DocumentContext] = None) -> float:
         """
         Extract total years of experience from resume
         Uses ChatGPT's logic: Calculate from work history dates
         Enhanced with spaCy NER for DATE extraction
         
+        Args:
+            text: Resume text
+            context: Shared DocumentContext (avoids another spaCy pass)
+        
         Returns:
             Years of experience (float)
         """
@@ -60,7 +89,7 @@ class ExperienceExtractor:
             return 0.0
         
         # PRIMARY METHOD: Calculate from work history date ranges (like ChatGPT does)
-        years_from_dates = self._calculate_from_date_ranges(text)
+        years_from_dates = self._calculate_from_date_ranges(text, context)
         if years_from_dates > 0:
             logger.info(f"✓ Extracted {years_from_dates} years from work history dates")
             return years_from_dates
@@ -70,7 +99,7 @@ class ExperienceExtractor:
         found_years = []
         
         for pattern in self.EXPERIENCE_PATTERNS:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
+            matches = pattern.findall(text_lower)
             for match in matches:
                 try:
                     years = float(match)
@@ -101,7 +130,7 @@ class ExperienceExtractor:
         logger.warning("⚠ Could not extract years of experience - defaulting to 3 years")
         return 3.0  # Default to mid-level instead of 0
     
-    def _calculate_from_date_ranges(self, text: str) -> float:
+    def _calculate_from_date_ranges(self, text: str, context: Optional[DocumentContext] = None) -> float:
         """
         Calculate experience from date ranges in resume (ChatGPT's approach)
         Enhanced with spaCy NER for DATE entity extraction
@@ -114,7 +143,7 @@ class ExperienceExtractor:
         # PRIORITY 1: Try spaCy NER DATE extraction first
         if self.nlp_processor and self.nlp_processor.nlp:
             try:
-                date_entities = self.nlp_processor.extract_dates(text)
+                date_entities = self.nlp_processor.extract_dates(text, context)
                 if date_entities:
                     logger.info(f"  ✓ Found {len(date_entities)} DATE entities via NLP: {date_entities[:5]}")
                     # Fall through to regex patterns which will also capture these
@@ -122,24 +151,13 @@ class ExperienceExtractor:
                 logger.debug(f"  NLP date extraction failed: {e}")
         
         # PRIORITY 2: Regex patterns (comprehensive fallback)
-        date_patterns = [
-            # YYYY - YYYY or YYYY-YYYY
-            r'(\d{4})\s*[-–—]\s*(\d{4})',
-            # YYYY - Present/Current
-            r'(\d{4})\s*[-–—]\s*(?:present|current|now)',
-            # Month YYYY - Month YYYY (e.g., "Jan 2019 - Dec 2023")
-            r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+(\d{4})\s*[-–—]\s*(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+(\d{4})',
-            # Month YYYY - Present
-            r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+(\d{4})\s*[-–—]\s*(?:present|current|now)',
-        ]
-        
         total_experience = 0.0
         found_ranges = set()
         
         text_lower = text.lower()
         
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
+        for pattern in self.DATE_RANGE_PATTERNS:
+            matches = pattern.findall(text_lower)
             for match in matches:
                 try:
                     if isinstance(match, str):  # Single capture (present/current)
@@ -204,19 +222,9 @@ class ExperienceExtractor:
         Extract job titles from resume
         Enhanced with spaCy NER for ORG entities
         """
-        # Common job title patterns
-        title_patterns = [
-            r'(?:software|backend|frontend|full[- ]stack|data|ml|devops|cloud)\s+(?:engineer|developer|architect|scientist|analyst)',
-            r'(?:senior|junior|lead|principal|staff)\s+(?:engineer|developer|architect|scientist)',
-            r'(?:team|tech|technical)\s+lead',
-            r'(?:engineering|development)\s+manager',
-            r'(?:cto|vp|director)\s+(?:of\s+)?(?:engineering|technology)',
-        ]
-        
         titles = []
-        for pattern in title_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            titles.extend(matches)
+        for pattern in self.TITLE_PATTERNS:
+            titles.extend(pattern.findall(text))
         
         return list(set(titles))
 
@@ -225,12 +233,14 @@ class EducationExtractor:
     """
     Extract education information from resume
     Enhanced with spaCy NER for ORG entities (universities)
+    
+    Stateless after construction; shared via get_education_extractor.
     """
     
     def __init__(self):
         """Initialize with NLP processor for enhanced extraction"""
         try:
-            self.nlp_processor = NLPProcessor()
+            self.nlp_processor = get_nlp_processor()
             logger.info("✓ EducationExtractor initialized with NLP processor")
         except Exception as e:
             logger.warning(f"NLP processor not available for EducationExtractor: {e}")
@@ -238,12 +248,18 @@ class EducationExtractor:
     
     # Degree patterns
     DEGREE_PATTERNS = {
-        'PhD': r'\b(?:ph\.?d\.?|doctorate|doctoral)\b',
-        'Master': r'\b(?:master|m\.?s\.?|m\.?tech|m\.?sc\.?|mba|m\.?e\.?|mca)\b',
-        'Bachelor': r'\b(?:bachelor|b\.?s\.?|b\.?tech|b\.?sc\.?|b\.?e\.?|b\.?a\.?|bca)\b',
-        'Diploma': r'\b(?:diploma|associate|a\.?a\.?|a\.?s\.?)\b',
+        degree: re.compile(pattern, re.IGNORECASE) for degree, pattern in {
+            'PhD': r'\b(?:ph\.?d\.?|doctorate|doctoral)\b',
+            'Master': r'\b(?:master|m\.?s\.?|m\.?tech|m\.?sc\.?|mba|m\.?e\.?|mca)\b',
+            'Bachelor': r'\b(?:bachelor|b\.?s\.?|b\.?tech|b\.?sc\.?|b\.?e\.?|b\.?a\.?|bca)\b',
+            'Diploma': r'\b(?:diploma|associate|a\.?a\.?|a\.?s\.?)\b',
+        }.items()
     }
     
+    # "in <specialization>" and graduation years (1980-2039)
+    SPECIALIZATION_IN_PATTERN = re.compile(r'in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})')
+    YEAR_PATTERN = re.compile(r'\b(19[89]\d|20[0-3]\d)\b')
+    
     # Specializations
     SPECIALIZATIONS = [
         'Computer Science', 'CS', 'CSE', 'Computer Engineering', 'Information Technology',
@@ -253,11 +269,15 @@ class EducationExtractor:
         'Business Administration', 'Management', 'Finance', 'Economics'
     ]
     
-    def extract_education(self, text: str) -> List[Dict]:
+    def extract_education(self, text: str, context: Optional[DocumentContext] = None) -> List[Dict]:
         """
         Extract education details
         Enhanced with spaCy NER for university names (ORG entities)
         
+        Args:
+            text: Resume text
+            context: Shared DocumentContext (avoids another spaCy pass)
+        
         Returns:
             List of education dicts with degree, specialization, year, institution
         """
@@ -268,7 +288,7 @@ class EducationExtractor:
         universities = []
         if self.nlp_processor and self.nlp_processor.nlp:
             try:
-                universities = self.nlp_processor.extract_organizations(text)
+                universities = self.nlp_processor.extract_organizations(text, context)
                 if universities:
                     logger.info(f"  ✓ Found {len(universities)} institutions via NLP: {universities[:3]}")
             except Exception as e:
@@ -278,7 +298,7 @@ class EducationExtractor:
         
         # Find degrees
         for degree_type, pattern in self.DEGREE_PATTERNS.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+            matches = pattern.finditer(text)
             for match in matches:
                 # Get context around the match (next 100 characters)
                 start_pos = match.start()
@@ -325,8 +345,7 @@ class EducationExtractor:
                 return spec
         
         # Look for "in <specialization>" pattern
-        in_pattern = r'in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})'
-        match = re.search(in_pattern, text)
+        match = self.SPECIALIZATION_IN_PATTERN.search(text)
         if match:
             return match.group(1)
         
@@ -337,8 +356,7 @@ class EducationExtractor:
         Extract graduation year
         """
         # Look for 4-digit years between 1980-2030
-        year_pattern = r'\b(19[89]\d|20[0-3]\d)\b'
-        matches = re.findall(year_pattern, text)
+        matches = self.YEAR_PATTERN.findall(text)
         
         if matches:
             # Return the most recent year
@@ -395,11 +413,37 @@ class EducationExtractor:
         return False
 
 
+# Singleton instances
+_experience_extractor = None
+_education_extractor = None
+
+
+def get_experience_extractor() -> ExperienceExtractor:
+    """Get or create experience extractor singleton"""
+    global _experience_extractor
+    if _experience_extractor is None:
+        _experience_extractor = ExperienceExtractor()
+    return _experience_extractor
+
+
+def get_education_extractor() -> EducationExtractor:
+    """Get or create education extractor singleton"""
+    global _education_extractor
+    if _education_extractor is None:
+        _education_extractor = EducationExtractor()
+    return _education_extractor
+
+
 # Convenience functions
-def extract_experience_and_education(text: str) -> Dict:
+def extract_experience_and_education(text: str, context: Optional[DocumentContext] = None) -> Dict:
     """
     Extract both experience and education from resume
     
+    Args:
+        text: Resume text
+        context: Shared DocumentContext; created here if not given so both
+                 extractors reuse a single spaCy Doc
+    
     Returns:
         {
             'years_of_experience': float,
@@ -410,11 +454,14 @@ def extract_experience_and_education(text: str) -> Dict:
             'has_relevant_degree': bool
         }
     """
-    exp_extractor = ExperienceExtractor()
-    edu_extractor = EducationExtractor()
+    exp_extractor = get_experience_extractor()
+    edu_extractor = get_education_extractor()
+    
+    if context is None and exp_extractor.nlp_processor is not None:
+        context = exp_extractor.nlp_processor.analyze(text)
     
-    years = exp_extractor.extract_years_of_experience(text)
-    education = edu_extractor.extract_education(text)
+    years = exp_extractor.extract_years_of_experience(text, context)
+    education = edu_extractor.extract_education(text, context)
     
     return {
         'years_of_experience': years,
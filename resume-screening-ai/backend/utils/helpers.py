@@ -4,29 +4,91 @@ Common utility functions
 """
 
 import os
+import io
 import hashlib
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union, BinaryIO
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def generate_file_hash(file_path: str) -> str:
+def generate_file_hash(file_path: str, algorithm: str = "md5") -> str:
     """
-    Generate MD5 hash of a file
+    Generate hash of a file
     
     Args:
         file_path: Path to file
+        algorithm: hashlib algorithm name (md5, sha256, ...)
         
     Returns:
-        MD5 hash string
+        Hex digest string
     """
-    hash_md5 = hashlib.md5()
+    file_hash = hashlib.new(algorithm)
     with open(file_path, "rb") as f:
         for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def generate_content_hash(content: bytes, algorithm: str = "sha256") -> str:
+    """
+    Generate hash of in-memory file content
+    Matches generate_file_hash() for the same bytes and algorithm
+    
+    Args:
+        content: Raw file bytes
+        algorithm: hashlib algorithm name (sha256 by default)
+        
+    Returns:
+        Hex digest string
+    """
+    return hashlib.new(algorithm, content).hexdigest()
+
+
+def is_path_source(source) -> bool:
+    """
+    Check whether a document source is a filesystem path
+    (as opposed to raw bytes or a file-like stream)
+    """
+    return isinstance(source, (str, Path))
+
+
+def read_source_bytes(source: Union[str, Path, bytes, BinaryIO]) -> bytes:
+    """
+    Read the raw bytes of a document source
+    
+    Args:
+        source: Path, bytes or binary file-like object
+        
+    Returns:
+        File content as bytes
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if is_path_source(source):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source.read()
+
+
+def as_binary_stream(source: Union[bytes, BinaryIO]) -> BinaryIO:
+    """
+    Wrap in-memory content as a seekable binary stream
+    
+    Args:
+        source: Bytes or binary file-like object
+        
+    Returns:
+        Binary stream positioned at the start
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
 
 
 def cleanup_temp_files(directory: Path, max_age_hours: int = 24):
@@ -5,26 +5,130 @@ Tokenization, Lemmatization, POS Tagging, NER
 
 import spacy
 import nltk
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Tuple, Set, Optional, FrozenSet
 import logging
+import multiprocessing
 import re
+import threading
+
+from backend.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Download NLTK data (stopwords)
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+# spaCy model and NLTK stop words are loaded on first use, once per process
+_load_lock = threading.Lock()
+_spacy_model = None
+_spacy_loaded = False
+_stop_words: Optional[FrozenSet[str]] = None
+
+
+def get_spacy_model():
+    """The en_core_web_sm pipeline (None if it is not installed)"""
+    global _spacy_model, _spacy_loaded
+    with _load_lock:
+        if not _spacy_loaded:
+            try:
+                _spacy_model = spacy.load("en_core_web_sm")
+            except OSError:
+                logger.error("spaCy model not found. Run: python -m spacy download en_core_web_sm")
+            _spacy_loaded = True
+        return _spacy_model
+
+
+def get_english_stop_words() -> FrozenSet[str]:
+    """
+    NLTK English stop words
+    Never downloads: without the corpus (python -m nltk.downloader stopwords)
+    spaCy's built-in English list is used instead.
+    """
+    global _stop_words
+    with _load_lock:
+        if _stop_words is None:
+            try:
+                nltk.data.find('corpora/stopwords')
+                from nltk.corpus import stopwords
+                _stop_words = frozenset(stopwords.words('english'))
+            except LookupError:
+                logger.warning("NLTK stopwords not found, using spaCy's. Run: python -m nltk.downloader stopwords")
+                from spacy.lang.en.stop_words import STOP_WORDS
+                _stop_words = frozenset(STOP_WORDS)
+        return _stop_words
 
-from nltk.corpus import stopwords
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    logger.error("spaCy model not found. Run: python -m spacy download en_core_web_sm")
-    nlp = None
+class DocumentContext:
+    """
+    Per-document NLP analysis shared by every extractor
+    
+    The spaCy pipeline runs at most once (lazily, on first access) and the
+    Doc, entities and sentences are reused by the validator, experience,
+    education and name extractors.
+    """
+    
+    def __init__(self, text: str, nlp_model=None, doc=None):
+        self.text = text or ""
+        self._nlp = nlp_model if nlp_model is not None else get_spacy_model()
+        self._doc = doc
+        self._entities = None
+    
+    @property
+    def available(self) -> bool:
+        """Whether NLP analysis can be provided (spaCy model loaded or Doc given)"""
+        return self._doc is not None or (self._nlp is not None and bool(self.text))
+    
+    @property
+    def doc(self):
+        """spaCy Doc for the whole text (computed once)"""
+        if self._doc is None and self._nlp is not None and self.text:
+            self._doc = self._nlp(self.text)
+        return self._doc
+    
+    @property
+    def entities(self) -> List[Tuple[str, str, int]]:
+        """(label, text, start_char) for every entity, in document order"""
+        if self._entities is None:
+            doc = self.doc
+            self._entities = [(ent.label_, ent.text, ent.start_char) for ent in doc.ents] if doc is not None else []
+        return self._entities
+    
+    def entities_by_label(self, max_chars: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Unique entity texts grouped by label
+        
+        Args:
+            max_chars: Only consider entities starting within the first N characters
+        """
+        grouped = {}
+        for label, text, start in self.entities:
+            if max_chars is not None and start >= max_chars:
+                continue
+            grouped.setdefault(label, []).append(text)
+        return {k: list(set(v)) for k, v in grouped.items()}
+    
+    def entity_texts(self, label: str, max_chars: Optional[int] = None) -> List[str]:
+        """Entity texts with the given label, in document order (duplicates kept)"""
+        return [
+            text for ent_label, text, start in self.entities
+            if ent_label == label and (max_chars is None or start < max_chars)
+        ]
+    
+    @property
+    def dates(self) -> List[str]:
+        return self.entity_texts('DATE')
+    
+    @property
+    def organizations(self) -> List[str]:
+        return list(set(self.entity_texts('ORG')))
+    
+    @property
+    def sentences(self) -> List[str]:
+        doc = self.doc
+        if doc is None:
+            return []
+        try:
+            return [sent.text for sent in doc.sents]
+        except ValueError:
+            # Pipeline without a parser/senter cannot split sentences
+            return []
 
 
 class NLPProcessor:
@@ -33,14 +137,60 @@ class NLPProcessor:
     """
     
     def __init__(self):
-        self.nlp = nlp
-        self.stop_words = set(stopwords.words('english'))
+        self.nlp = get_spacy_model()
+        self.stop_words = get_english_stop_words()
         
         # Technical terms that should NOT be removed even if they look like stop words
         self.technical_preserve = {
             'in', 'to', 'with', 'for', 'as', 'or', 'and', 'not'  # Common in tech (SQL, etc.)
         }
     
+    def analyze(self, text: str) -> DocumentContext:
+        """
+        Create a shared analysis context for one document
+        Pass it to the extractors so spaCy runs once per resume
+        """
+        return DocumentContext(text, self.nlp)
+    
+    def analyze_batch(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        n_process: Optional[int] = None
+    ) -> List[DocumentContext]:
+        """
+        Run the spaCy pipeline over many documents with nlp.pipe
+        
+        Args:
+            texts: Documents to analyze
+            batch_size: Documents per batch (default: SPACY_BATCH_SIZE)
+            n_process: Worker processes for nlp.pipe (default: SPACY_N_PROCESS)
+            
+        Returns:
+            One DocumentContext per text (same order) with its Doc already computed
+        """
+        if not self.nlp or not hasattr(self.nlp, 'pipe'):
+            return [DocumentContext(text, self.nlp) for text in texts]
+        
+        batch_size = batch_size or settings.SPACY_BATCH_SIZE
+        n_process = n_process or settings.SPACY_N_PROCESS
+        if n_process > 1 and multiprocessing.current_process().daemon:
+            # Process pool workers are daemonic and cannot start children
+            n_process = 1
+        
+        # Empty documents are skipped so they don't occupy batch slots
+        indices = [i for i, text in enumerate(texts) if text]
+        docs = self.nlp.pipe(
+            (texts[i] for i in indices), batch_size=batch_size, n_process=n_process
+        )
+        
+        contexts = [DocumentContext(text, self.nlp) for text in texts]
+        for i, doc in zip(indices, docs):
+            contexts[i] = DocumentContext(texts[i], self.nlp, doc=doc)
+        
+        logger.info(f"Analyzed {len(indices)} documents with nlp.pipe (batch_size={batch_size}, n_process={n_process})")
+        return contexts
+    
     def preprocess_text(
         self, 
         text: str, 
@@ -86,10 +236,20 @@ class NLPProcessor:
             logger.error(f"Error preprocessing text: {e}")
             return text
     
-    def extract_named_entities(self, text: str) -> Dict[str, List[str]]:
+    def extract_named_entities(
+        self,
+        text: str,
+        context: Optional[DocumentContext] = None,
+        max_chars: Optional[int] = None
+    ) -> Dict[str, List[str]]:
         """
         Extract named entities using spaCy NER
         
+        Args:
+            text: Input text
+            context: Shared DocumentContext (reuses its Doc instead of re-running spaCy)
+            max_chars: Only entities within the first N characters
+        
         Returns:
             Dictionary of entity types and their values
             {
@@ -100,20 +260,16 @@ class NLPProcessor:
                 ...
             }
         """
-        if not self.nlp or not text:
+        if context is None:
+            if not self.nlp or not text:
+                return {}
+            context = DocumentContext(text[:max_chars] if max_chars else text, self.nlp)
+        elif not context.available:
             return {}
         
         try:
-            doc = self.nlp(text)
-            
-            entities = {}
-            for ent in doc.ents:
-                if ent.label_ not in entities:
-                    entities[ent.label_] = []
-                entities[ent.label_].append(ent.text)
-            
-            # Remove duplicates
-            entities = {k: list(set(v)) for k, v in entities.items()}
+            # Duplicates removed
+            entities = context.entities_by_label(max_chars)
             
             logger.info(f"Extracted {sum(len(v) for v in entities.values())} entities")
             return entities
@@ -122,19 +278,20 @@ class NLPProcessor:
             logger.error(f"Error extracting entities: {e}")
             return {}
     
-    def extract_candidate_name(self, text: str) -> str:
+    def extract_candidate_name(self, text: str, context: Optional[DocumentContext] = None) -> str:
         """
         Extract candidate name from resume using NER
         """
-        if not self.nlp or not text:
+        if not text or (context is None and not self.nlp):
             return "Anonymous"
         
         try:
             # Look in first 500 characters (name usually at top)
-            doc = self.nlp(text[:500])
+            if context is None:
+                context = DocumentContext(text[:500], self.nlp)
             
             # Find PERSON entities
-            persons = [ent.text for ent in doc.ents if ent.label_ == 'PERSON']
+            persons = context.entity_texts('PERSON', max_chars=500)
             
             if persons:
                 # Return first person found
@@ -164,32 +321,30 @@ class NLPProcessor:
             logger.error(f"Error extracting name: {e}")
             return "Anonymous"
     
-    def extract_organizations(self, text: str) -> List[str]:
+    def extract_organizations(self, text: str, context: Optional[DocumentContext] = None) -> List[str]:
         """
         Extract company/organization names from resume
         """
-        if not self.nlp or not text:
+        context = context or DocumentContext(text, self.nlp)
+        if not context.available:
             return []
         
         try:
-            doc = self.nlp(text)
-            orgs = [ent.text for ent in doc.ents if ent.label_ == 'ORG']
-            return list(set(orgs))
+            return context.organizations
         except Exception as e:
             logger.error(f"Error extracting organizations: {e}")
             return []
     
-    def extract_dates(self, text: str) -> List[str]:
+    def extract_dates(self, text: str, context: Optional[DocumentContext] = None) -> List[str]:
         """
         Extract dates from resume (work experience periods)
         """
-        if not self.nlp or not text:
+        context = context or DocumentContext(text, self.nlp)
+        if not context.available:
             return []
         
         try:
-            doc = self.nlp(text)
-            dates = [ent.text for ent in doc.ents if ent.label_ == 'DATE']
-            return dates
+            return context.dates
         except Exception as e:
             logger.error(f"Error extracting dates: {e}")
             return []
@@ -237,3 +392,15 @@ class NLPProcessor:
         except Exception as e:
             logger.error(f"Error tokenizing: {e}")
             return text.split()
+
+
+# Singleton instance
+_nlp_processor = None
+
+
+def get_nlp_processor() -> NLPProcessor:
+    """Get or create NLP processor singleton"""
+    global _nlp_processor
+    if _nlp_processor is None:
+        _nlp_processor = NLPProcessor()
+    return _nlp_processor
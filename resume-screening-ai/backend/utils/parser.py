@@ -6,34 +6,50 @@ Extract text from PDF and DOCX files
 import PyPDF2
 import docx
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union, BinaryIO
 import logging
+from contextlib import nullcontext
+
+from backend.utils.helpers import is_path_source, as_binary_stream
 
 logger = logging.getLogger(__name__)
 
+# A resume can be given as a path, raw bytes or a binary file-like object
+ResumeSource = Union[str, Path, bytes, BinaryIO]
+
 
 class ResumeParser:
     """Parser for extracting text from resume files"""
     
     @staticmethod
-    def extract_text_from_pdf(file_path: str) -> Optional[str]:
+    def extract_text_from_pdf(source: ResumeSource, name: str = "<memory>") -> Optional[str]:
         """
         Extract text from PDF file
         
         Args:
-            file_path: Path to PDF file
+            source: Path to PDF file, PDF bytes or binary stream
+            name: Display name used in log messages
             
         Returns:
             Extracted text or None if error
         """
+        if is_path_source(source):
+            name = str(source)
+        
         try:
             text = ""
-            with open(file_path, 'rb') as file:
+            if is_path_source(source):
+                opened = open(source, 'rb')
+            else:
+                # Caller owns the stream, so don't close it
+                opened = nullcontext(as_binary_stream(source))
+            
+            with opened as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 
                 # Check if PDF has pages
                 if len(pdf_reader.pages) == 0:
-                    logger.warning(f"PDF has no pages: {file_path}")
+                    logger.warning(f"PDF has no pages: {name}")
                     return None
                 
                 # Try to extract text from each page
@@ -43,66 +59,81 @@ class ResumeParser:
                         if page_text:
                             text += page_text + "\n"
                     except Exception as e:
-                        logger.warning(f"Error extracting page {page_num} from {file_path}: {e}")
+                        logger.warning(f"Error extracting page {page_num} from {name}: {e}")
                         continue
                 
                 text = text.strip()
                 
                 # Check if we got any text
                 if not text or len(text) < 10:
-                    logger.warning(f"PDF appears to be empty or image-based: {file_path}")
+                    logger.warning(f"PDF appears to be empty or image-based: {name}")
                     logger.warning(f"Extracted only {len(text)} characters. PDF might be scanned.")
                     return None
                 
                 return text
                 
         except Exception as e:
-            logger.error(f"Error extracting text from PDF {file_path}: {e}")
+            logger.error(f"Error extracting text from PDF {name}: {e}")
             return None
     
     @staticmethod
-    def extract_text_from_docx(file_path: str) -> Optional[str]:
+    def extract_text_from_docx(source: ResumeSource, name: str = "<memory>") -> Optional[str]:
         """
         Extract text from DOCX file
         
         Args:
-            file_path: Path to DOCX file
+            source: Path to DOCX file, DOCX bytes or binary stream
+            name: Display name used in log messages
             
         Returns:
             Extracted text or None if error
         """
+        if is_path_source(source):
+            name = str(source)
+        
         try:
-            doc = docx.Document(file_path)
+            doc = docx.Document(str(source) if is_path_source(source) else as_binary_stream(source))
             text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
             return text.strip()
         except Exception as e:
-            logger.error(f"Error extracting text from DOCX {file_path}: {e}")
+            logger.error(f"Error extracting text from DOCX {name}: {e}")
             return None
     
     @staticmethod
-    def parse_resume(file_path: str) -> Optional[str]:
+    def parse_resume(source: ResumeSource, filename: Optional[str] = None) -> Optional[str]:
         """
         Parse resume file and extract text
         Automatically detects file type
         
+        In-memory content (bytes or a stream) is parsed without touching
+        the disk; the file type is then taken from ``filename``.
+        
         Args:
-            file_path: Path to resume file
+            source: Path to resume file, file bytes or binary stream
+            filename: Original file name (required for in-memory content)
             
         Returns:
             Extracted text or None if error
         """
-        file_path = Path(file_path)
-        
-        if not file_path.exists():
-            logger.error(f"File not found: {file_path}")
+        if is_path_source(source):
+            file_path = Path(source)
+            
+            if not file_path.exists():
+                logger.error(f"File not found: {file_path}")
+                return None
+            
+            source = str(file_path)
+            filename = filename or file_path.name
+        elif not filename:
+            logger.error("A filename is required to parse in-memory resume content")
             return None
         
-        file_extension = file_path.suffix.lower()
+        file_extension = Path(filename).suffix.lower()
         
         if file_extension == '.pdf':
-            return ResumeParser.extract_text_from_pdf(str(file_path))
+            return ResumeParser.extract_text_from_pdf(source, filename)
         elif file_extension in ['.docx', '.doc']:
-            return ResumeParser.extract_text_from_docx(str(file_path))
+            return ResumeParser.extract_text_from_docx(source, filename)
         else:
             logger.error(f"Unsupported file format: {file_extension}")
             return None
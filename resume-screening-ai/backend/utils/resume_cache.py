@@ -0,0 +1,158 @@
+"""
+Content-Addressed Resume Cache
+Caches extracted text, validation result and parsed features per file content
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever parsing, cleaning, validation or feature extraction changes
+# so entries produced by older extractors are ignored
+#   2: validation and feature entities come from one full-text spaCy Doc (DocumentContext)
+EXTRACTOR_VERSION = "2"
+
+
+class ResumeCache:
+    """
+    Two-tier cache keyed by the SHA-256 of the raw resume bytes
+    
+    1. In-memory LRU (bounded by max_entries)
+    2. JSON files on disk, shared across restarts and processes
+    
+    Entries look like:
+    {
+        'version': str,
+        'text': Optional[str],        # cleaned text, None if extraction failed
+        'validation': Optional[Dict], # ResumeValidator details
+        'features': Optional[Dict]    # contact, experience and education data
+    }
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_entries: int = 512,
+        version: str = EXTRACTOR_VERSION
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.version = version
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _entry_path(self, content_hash: str) -> Path:
+        """Shard files by hash prefix to keep directories small"""
+        return self.cache_dir / content_hash[:2] / f"{content_hash}.json"
+    
+    def get(self, content_hash: str) -> Optional[Dict]:
+        """
+        Look up a cached entry
+        
+        Returns:
+            Cached entry or None on miss / stale version
+        """
+        with self._lock:
+            entry = self._memory.get(content_hash)
+            if entry is not None:
+                self._memory.move_to_end(content_hash)
+                self.hits += 1
+                return entry
+        
+        entry = self._read_disk(content_hash)
+        
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(content_hash, entry)
+        return entry
+    
+    def put(self, content_hash: str, entry: Dict):
+        """Store an entry in memory and on disk"""
+        entry = dict(entry, version=self.version)
+        
+        with self._lock:
+            self._remember(content_hash, entry)
+        
+        self._write_disk(content_hash, entry)
+    
+    def clear(self):
+        """Drop the in-memory tier (disk entries are kept)"""
+        with self._lock:
+            self._memory.clear()
+    
+    def stats(self) -> Dict:
+        """Cache hit/miss counters"""
+        with self._lock:
+            return {
+                'entries_in_memory': len(self._memory),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'version': self.version
+            }
+    
+    def _remember(self, content_hash: str, entry: Dict):
+        """Insert into the LRU, evicting the oldest entries (lock held)"""
+        self._memory[content_hash] = entry
+        self._memory.move_to_end(content_hash)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def _read_disk(self, content_hash: str) -> Optional[Dict]:
+        path = self._entry_path(content_hash)
+        if not path.exists():
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path.name}: {e}")
+            return None
+        
+        if entry.get('version') != self.version:
+            logger.debug(f"Stale cache entry {path.name} (version {entry.get('version')})")
+            return None
+        
+        return entry
+    
+    def _write_disk(self, content_hash: str, entry: Dict):
+        path = self._entry_path(content_hash)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a partial file
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist cache entry {path.name}: {e}")
+
+
+# Singleton instance
+_resume_cache = None
+
+
+def get_resume_cache() -> ResumeCache:
+    """Get or create resume cache singleton"""
+    global _resume_cache
+    if _resume_cache is None:
+        _resume_cache = ResumeCache(
+            settings.PROCESSED_DIR / "resume_cache",
+            max_entries=settings.RESUME_CACHE_SIZE
+        )
+    return _resume_cache
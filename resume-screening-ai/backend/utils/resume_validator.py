@@ -4,9 +4,9 @@ Uses spaCy NER, keyword detection, and structure analysis to validate if a docum
 """
 
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional
 import logging
-from backend.utils.nlp_processor import NLPProcessor
+from backend.utils.nlp_processor import DocumentContext, get_nlp_processor
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ class ResumeValidator:
     """
     
     def __init__(self):
-        self.nlp_processor = NLPProcessor()
+        self.nlp_processor = get_nlp_processor()
         
         # Resume section keywords (must find at least 2-3 of these)
         self.section_keywords = {
@@ -51,10 +51,14 @@ class ResumeValidator:
             'once upon a time', 'the end', 'story'
         ]
     
-    def validate_resume(self, text: str) -> Tuple[bool, Dict]:
+    def validate_resume(self, text: str, context: Optional[DocumentContext] = None) -> Tuple[bool, Dict]:
         """
         Validate if document is a resume using multiple NLP checks
         
+        Args:
+            text: Resume text
+            context: Shared DocumentContext for this text (spaCy runs once per resume)
+        
         Returns:
             (is_valid, validation_details)
             
@@ -175,7 +179,9 @@ class ResumeValidator:
         
         # 6. NLP ENTITY EXTRACTION (PERSON, ORG, DATE)
         try:
-            entities = self.nlp_processor.extract_named_entities(text[:2000])  # Check first 2000 chars
+            entities = self.nlp_processor.extract_named_entities(
+                text, context=context, max_chars=2000
+            )  # Check first 2000 chars
             
             person_count = len(entities.get('PERSON', []))
             org_count = len(entities.get('ORG', []))
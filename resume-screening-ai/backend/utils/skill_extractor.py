@@ -8,45 +8,230 @@ Uses:
 """
 
 import re
-from typing import List, Set, Dict, Tuple
-from rapidfuzz import fuzz
+import threading
+import time
+from typing import List, Set, Dict, Tuple, Union
+import numpy as np
+from rapidfuzz import fuzz, process
 import logging
 
+from backend.core.config import settings
+from backend.utils.skill_matcher import SkillMatcher, SkillMatch
+from backend.utils.skill_taxonomy import SkillTaxonomy, load_skill_taxonomy, file_signature
+
 logger = logging.getLogger(__name__)
 
 # KeyBERT is optional
 try:
     from keybert import KeyBERT
+    from keybert.backend import BaseEmbedder
+    from sklearn.feature_extraction.text import CountVectorizer
     KEYBERT_AVAILABLE = True
 except ImportError:
     KEYBERT_AVAILABLE = False
     logger.warning("KeyBERT not available. Install with: pip install keybert")
 
 
+if KEYBERT_AVAILABLE:
+    class EncoderBackend(BaseEmbedder):
+        """KeyBERT backend for encoders with a SentenceTransformer-style encode() (e.g. ONNX Runtime)"""
+        
+        def __init__(self, encoder):
+            super().__init__(embedding_model=encoder)
+        
+        def embed(self, documents: List[str], verbose: bool = False) -> np.ndarray:
+            return self.embedding_model.encode(
+                documents, batch_size=settings.ENCODE_BATCH_SIZE, show_progress_bar=verbose
+            )
+    
+    class PerDocumentCandidates:
+        """
+        KeyBERT vectorizer that caps candidates per document, not per call
+        
+        Each document keeps its own max_candidates most frequent n-grams
+        (ties broken by the n-gram), so its keyphrases do not depend on
+        which other documents share the KeyBERT call. The vocabulary is the
+        union of those sets, so shared n-grams are still embedded once.
+        """
+        
+        def __init__(self, max_candidates: int, **count_kwargs):
+            self.max_candidates = max_candidates
+            self.count_kwargs = count_kwargs
+            self._vectorizer = None
+        
+        def fit(self, docs: List[str]) -> 'PerDocumentCandidates':
+            counter = CountVectorizer(**self.count_kwargs)
+            counts = counter.fit_transform(docs).tocsr()
+            names = counter.get_feature_names_out()
+            vocabulary = sorted({
+                names[counts.indices[entry]]
+                for row in range(counts.shape[0]) for entry in self._top_entries(counts, row, names)
+            })
+            self._vectorizer = CountVectorizer(vocabulary=vocabulary, **self.count_kwargs).fit(docs)
+            return self
+        
+        def get_feature_names_out(self) -> np.ndarray:
+            return self._vectorizer.get_feature_names_out()
+        
+        def transform(self, docs: List[str]):
+            """Counts over the shared vocabulary, zeroed outside each document's own candidates"""
+            counts = self._vectorizer.transform(docs).tocsr()
+            names = self.get_feature_names_out()
+            keep = np.zeros(counts.nnz, dtype=bool)
+            for row in range(counts.shape[0]):
+                keep[self._top_entries(counts, row, names)] = True
+            counts.data[~keep] = 0
+            counts.eliminate_zeros()
+            return counts
+        
+        def _top_entries(self, counts, row: int, names) -> List[int]:
+            """Positions in counts.data of the row's max_candidates most frequent n-grams"""
+            entries = range(counts.indptr[row], counts.indptr[row + 1])
+            ranked = sorted(entries, key=lambda entry: (-counts.data[entry], names[counts.indices[entry]]))
+            return ranked[:self.max_candidates]
+
+
+# Skill importance weights
+SKILL_WEIGHTS = {
+    # Critical skills (1.5x weight)
+    'Python': 1.5, 'Java': 1.5, 'JavaScript': 1.5, 'Django': 1.5, 'React': 1.5,
+    'AWS': 1.5, 'Kubernetes': 1.5, 'Docker': 1.5,
+    
+    # High priority (1.3x weight)
+    'PostgreSQL': 1.3, 'MongoDB': 1.3, 'Redis': 1.3, 'TensorFlow': 1.3,
+    'PyTorch': 1.3, 'Machine Learning': 1.3, 'Deep Learning': 1.3,
+    
+    # Medium priority (1.2x weight)
+    'REST API': 1.2, 'GraphQL': 1.2, 'Microservices': 1.2, 'CI/CD': 1.2,
+}
+# Standard (1.0x weight)
+DEFAULT_SKILL_WEIGHT = 1.0
+
+# Minimum rapidfuzz ratio (0-100) for a fuzzy skill match
+FUZZY_MATCH_CUTOFF = 85
+
+
+class RequiredSkills:
+    """
+    A job's required skills, normalized and weighted once per job description
+    """
+    
+    def __init__(self, normalized: List[str], weights: List[float]):
+        self.normalized = normalized
+        self.lowered = [s.lower() for s in normalized]
+        self.weights = weights
+        self.total_weight = sum(weights)
+    
+    def __len__(self) -> int:
+        return len(self.normalized)
+
+
 class SkillExtractor:
     """
     Extract and normalize technical skills from text
+    
+    Dictionary matching is cheap and runs anywhere (e.g. in process pool
+    workers). KeyBERT only runs when a sentence-transformer is attached,
+    normally the scoring engine's model, so no second model is loaded.
     """
     
-    def __init__(self):
-        # Initialize KeyBERT for automatic keyword extraction
-        if KEYBERT_AVAILABLE:
-            try:
-                self.keybert = KeyBERT()
-            except Exception as e:
-                logger.warning(f"KeyBERT initialization failed: {e}")
-                self.keybert = None
-        else:
+    def __init__(self, keybert_model=None):
+        """
+        Args:
+            keybert_model: SentenceTransformer (or encoder with the same encode())
+                           for KeyBERT keyword extraction (None = dictionary matching only)
+        """
+        self.keybert = None
+        if keybert_model is not None:
+            self.attach_keybert_model(keybert_model)
+        
+        # Built-in skill database and synonyms, extended by the taxonomy file
+        self.taxonomy_path = settings.SKILLS_JSON_PATH
+        self.reload_interval = settings.SKILLS_RELOAD_INTERVAL
+        self._reload_lock = threading.Lock()
+        self._last_reload_check = time.monotonic()
+        self.taxonomy = self._load_taxonomy()
+    
+    def attach_keybert_model(self, model):
+        """Build KeyBERT on an already loaded SentenceTransformer or encoder"""
+        if not KEYBERT_AVAILABLE:
+            return
+        try:
+            if not type(model).__module__.startswith('sentence_transformers'):
+                model = EncoderBackend(model)
+            self.keybert = KeyBERT(model=model)
+        except Exception as e:
+            logger.warning(f"KeyBERT initialization failed: {e}")
             self.keybert = None
+    
+    def _load_taxonomy(self) -> SkillTaxonomy:
+        """Merge built-ins with SKILLS_JSON_PATH (compiled index cached under PROCESSED_DIR)"""
+        return load_skill_taxonomy(
+            self.taxonomy_path,
+            self._build_skill_database(),
+            self._build_synonyms(),
+            index_dir=settings.PROCESSED_DIR / "skill_index"
+        )
+    
+    def reload_if_changed(self, wait: bool = False) -> bool:
+        """
+        Hot-reload the taxonomy when its file changed
+        Checks the file at most once per SKILLS_RELOAD_INTERVAL seconds; the
+        rebuild runs in a background thread while the current taxonomy keeps serving
+        
+        Args:
+            wait: Rebuild in the calling thread instead
+        
+        Returns:
+            True if a reload was started
+        """
+        if self.reload_interval <= 0:
+            return False
+        
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_interval:
+            return False
+        self._last_reload_check = now
         
-        # Comprehensive skill database
-        self.skill_database = self._build_skill_database()
+        if file_signature(self.taxonomy_path) == self.taxonomy.source_signature:
+            return False
         
-        # Skill synonyms and variations
-        self.skill_synonyms = self._build_synonyms()
+        # Only one rebuild at a time
+        if not self._reload_lock.acquire(blocking=False):
+            return False
         
-        # Skill normalization map
-        self.normalization_map = self._build_normalization_map()
+        logger.info(f"Skill taxonomy {self.taxonomy_path} changed, reloading")
+        if wait:
+            self._reload()
+        else:
+            threading.Thread(target=self._reload, name="skill-taxonomy-reload", daemon=True).start()
+        return True
+    
+    def _reload(self):
+        """Build the new taxonomy and swap it in (releases _reload_lock)"""
+        try:
+            # One assignment, so readers see either the old or the new taxonomy
+            self.taxonomy = self._load_taxonomy()
+        except Exception as e:
+            logger.error(f"Skill taxonomy reload failed: {e}")
+        finally:
+            self._reload_lock.release()
+    
+    @property
+    def skill_database(self) -> Dict[str, List[str]]:
+        return self.taxonomy.skill_database
+    
+    @property
+    def skill_synonyms(self) -> Dict[str, List[str]]:
+        return self.taxonomy.skill_synonyms
+    
+    @property
+    def normalization_map(self) -> Dict[str, str]:
+        return self.taxonomy.normalization_map
+    
+    @property
+    def skill_matcher(self) -> SkillMatcher:
+        return self.taxonomy.matcher
     
     def _build_skill_database(self) -> Dict[str, List[str]]:
         """
@@ -163,19 +348,6 @@ class SkillExtractor:
             'GCP': ['Google Cloud Platform', 'Google Cloud'],
         }
     
-    def _build_normalization_map(self) -> Dict[str, str]:
-        """
-        Build normalization map (variations -> canonical form)
-        """
-        norm_map = {}
-        
-        for canonical, variations in self.skill_synonyms.items():
-            for var in variations:
-                norm_map[var.lower()] = canonical
-            norm_map[canonical.lower()] = canonical
-        
-        return norm_map
-    
     def normalize_skill(self, skill: str) -> str:
         """
         Normalize skill to canonical form
@@ -184,72 +356,124 @@ class SkillExtractor:
         - 'postgres' -> 'PostgreSQL'
         - 'k8s' -> 'Kubernetes'
         """
-        skill_lower = skill.lower().strip()
-        return self.normalization_map.get(skill_lower, skill)
+        return self.taxonomy.normalize_skill(skill)
     
-    def extract_skills(self, text: str) -> Set[str]:
+    def extract_skills(self, text: str, doc_embedding=None) -> Set[str]:
         """
         Extract skills from text using multiple strategies
         Alias for extract_skills_from_text for backward compatibility
         """
-        return self.extract_skills_from_text(text)
+        return self.extract_skills_from_text(text, doc_embedding)
     
-    def extract_skills_from_text(self, text: str) -> Set[str]:
+    def extract_skill_matches(self, text: str) -> List[SkillMatch]:
+        """
+        Find database skills and synonyms in text with their offsets
+        
+        Returns:
+            SkillMatch(skill, start, end, term) list ordered by position
+        """
+        self.reload_if_changed()
+        return self.skill_matcher.find_all(text)
+    
+    def extract_skills_from_text(self, text: str, doc_embedding=None) -> Set[str]:
         """
         Extract skills from text using multiple strategies
+        
+        Args:
+            text: Resume or job description text
+            doc_embedding: Embedding of text from the KeyBERT model, if already computed
         """
         if not text:
             return set()
         
-        found_skills = set()
-        text_lower = text.lower()
-        
-        # Strategy 1: Direct matching from skill database
-        for category, skills in self.skill_database.items():
-            for skill in skills:
-                # Exact match (case-insensitive)
-                if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower):
-                    found_skills.add(self.normalize_skill(skill))
-                    continue
-                
-                # Partial match with context
-                if skill.lower() in text_lower:
-                    # Verify it's a real skill mention, not part of another word
-                    pattern = r'[\W_]' + re.escape(skill.lower()) + r'[\W_]'
-                    if re.search(pattern, ' ' + text_lower + ' '):
-                        found_skills.add(self.normalize_skill(skill))
-        
-        # Strategy 2: Check synonyms
-        for canonical, variations in self.skill_synonyms.items():
-            for var in variations:
-                if re.search(r'\b' + re.escape(var.lower()) + r'\b', text_lower):
-                    found_skills.add(canonical)
-        
-        # Strategy 3: Use KeyBERT for auto-detection (finds skills not in database)
-        if self.keybert:
-            try:
-                keywords = self.keybert.extract_keywords(
-                    text,
-                    keyphrase_ngram_range=(1, 3),
-                    stop_words='english',
-                    top_n=50,
-                    use_mmr=True,
-                    diversity=0.7
-                )
-                
-                # Filter keywords that look like technical skills
-                for keyword, score in keywords:
-                    if score > 0.3:  # Relevance threshold
-                        # Check if it matches any skill pattern
-                        keyword_normalized = self.normalize_skill(keyword)
-                        if self._is_technical_term(keyword_normalized):
-                            found_skills.add(keyword_normalized)
-            except Exception as e:
-                logger.warning(f"KeyBERT extraction failed: {e}")
+        found_skills = self.extract_dictionary_skills(text)
+        found_skills |= self.extract_keyword_skills(text, doc_embedding)
         
         logger.info(f"Extracted {len(found_skills)} skills")
         return found_skills
     
+    def extract_dictionary_skills(self, text: str) -> Set[str]:
+        """
+        Strategy 1 & 2: Database skills and synonyms in one automaton pass
+        """
+        if not text:
+            return set()
+        
+        self.reload_if_changed()
+        return self.skill_matcher.find_skills(text)
+    
+    def extract_keyword_skills(self, text: str, doc_embedding=None) -> Set[str]:
+        """
+        Strategy 3: Use KeyBERT for auto-detection (finds skills not in database)
+        
+        Args:
+            text: Document text
+            doc_embedding: Precomputed document embedding (e.g. from semantic
+                           scoring) so KeyBERT does not encode the document again
+        """
+        doc_embeddings = None if doc_embedding is None else np.asarray(doc_embedding).reshape(1, -1)
+        return self.extract_keyword_skills_batch([text], doc_embeddings)[0]
+    
+    def extract_keyword_skills_batch(self, texts: List[str], doc_embeddings=None) -> List[Set[str]]:
+        """
+        KeyBERT skill detection for many documents in one call
+        
+        Candidate n-grams are capped at KEYBERT_MAX_CANDIDATES per document
+        (its most frequent ones) to bound embedding and MMR cost; n-grams
+        shared by several documents are embedded once. A document gets the
+        same keyphrases alone or in any batch.
+        
+        Args:
+            texts: Documents
+            doc_embeddings: (len(texts), dim) precomputed document embeddings, optional
+            
+        Returns:
+            Skills per document, in the same order as texts
+        """
+        results = [set() for _ in texts]
+        if not self.keybert:
+            return results
+        
+        indices = [i for i, text in enumerate(texts) if text]
+        if not indices:
+            return results
+        
+        docs = [texts[i] for i in indices]
+        if doc_embeddings is not None:
+            doc_embeddings = np.asarray(doc_embeddings)[indices]
+        
+        try:
+            vectorizer = PerDocumentCandidates(
+                settings.KEYBERT_MAX_CANDIDATES,
+                ngram_range=(1, 3),
+                stop_words='english'
+            )
+            keywords_per_doc = self.keybert.extract_keywords(
+                docs,
+                vectorizer=vectorizer,
+                top_n=settings.KEYBERT_TOP_N,
+                use_mmr=True,
+                diversity=0.7,
+                doc_embeddings=doc_embeddings
+            )
+            if len(docs) == 1:
+                # KeyBERT unwraps the result for a single document
+                keywords_per_doc = [keywords_per_doc]
+        except Exception as e:
+            logger.warning(f"KeyBERT extraction failed: {e}")
+            return results
+        
+        for i, keywords in zip(indices, keywords_per_doc):
+            # Filter keywords that look like technical skills
+            for keyword, score in keywords:
+                if score > 0.3:  # Relevance threshold
+                    # Check if it matches any skill pattern
+                    keyword_normalized = self.normalize_skill(keyword)
+                    if self._is_technical_term(keyword_normalized):
+                        results[i].add(keyword_normalized)
+        
+        return results
+    
     def _is_technical_term(self, term: str) -> bool:
         """
         Check if a term looks like a technical skill
@@ -270,14 +494,30 @@ class SkillExtractor:
         
         return False
     
+    def prepare_required_skills(self, required_skills: List[str]) -> 'RequiredSkills':
+        """
+        Normalize and weight a job's required skills once
+        Reuse the result for every resume screened against the same job
+        """
+        normalized = [self.normalize_skill(str(s)) for s in required_skills]
+        return RequiredSkills(normalized, [SKILL_WEIGHTS.get(s, DEFAULT_SKILL_WEIGHT) for s in normalized])
+    
     def compute_skill_match_score(
         self,
         resume_skills: Set[str],
-        required_skills: List[str]
+        required_skills: Union[List[str], 'RequiredSkills']
     ) -> Tuple[float, List[str], List[str]]:
         """
         Compute skill match score with details
         
+        Exact and synonym hits are set lookups after normalization; only the
+        remaining required skills are fuzzy-matched, as one rapidfuzz cdist
+        matrix against all resume skills.
+        
+        Args:
+            resume_skills: Skills found in the resume
+            required_skills: Required skills, or prepare_required_skills() output
+        
         Returns:
             - Match score (0-100)
             - Matched skills
@@ -286,68 +526,55 @@ class SkillExtractor:
         if not required_skills:
             return 100.0, [], []
         
-        # Normalize all skills
-        if isinstance(resume_skills, list):
-            resume_skills = set(resume_skills)
+        if not isinstance(required_skills, RequiredSkills):
+            required_skills = self.prepare_required_skills(required_skills)
         
-        resume_skills_normalized = {self.normalize_skill(str(s)) for s in resume_skills}
-        required_skills_normalized = [self.normalize_skill(str(s)) for s in required_skills]
+        # Normalize all skills (sorted so fuzzy ties resolve deterministically)
+        resume_skills_normalized = sorted({self.normalize_skill(str(s)) for s in resume_skills})
+        resume_skill_set = set(resume_skills_normalized)
         
-        matched_skills = []
-        missing_skills = []
+        # Exact match
+        exact = [skill in resume_skill_set for skill in required_skills.normalized]
         
-        # Skill importance weights
-        skill_weights = {
-            # Critical skills (1.5x weight)
-            'Python': 1.5, 'Java': 1.5, 'JavaScript': 1.5, 'Django': 1.5, 'React': 1.5,
-            'AWS': 1.5, 'Kubernetes': 1.5, 'Docker': 1.5,
-            
-            # High priority (1.3x weight)
-            'PostgreSQL': 1.3, 'MongoDB': 1.3, 'Redis': 1.3, 'TensorFlow': 1.3,
-            'PyTorch': 1.3, 'Machine Learning': 1.3, 'Deep Learning': 1.3,
-            
-            # Medium priority (1.2x weight)
-            'REST API': 1.2, 'GraphQL': 1.2, 'Microservices': 1.2, 'CI/CD': 1.2,
-            
-            # Standard (1.0x weight)
-            'default': 1.0
-        }
+        # Fuzzy match: (unmatched required x resume skills) similarity matrix
+        unmatched = [i for i, hit in enumerate(exact) if not hit]
+        best_scores = {}
+        if unmatched and resume_skills_normalized:
+            similarity = process.cdist(
+                [required_skills.lowered[i] for i in unmatched],
+                [s.lower() for s in resume_skills_normalized],
+                scorer=fuzz.ratio,
+                score_cutoff=FUZZY_MATCH_CUTOFF,
+                dtype=np.float64,
+                workers=settings.FUZZY_MATCH_WORKERS
+            )
+            best_columns = similarity.argmax(axis=1)
+            for row, i in enumerate(unmatched):
+                score = similarity[row, best_columns[row]]
+                # Accept fuzzy matches above 85%
+                if score >= FUZZY_MATCH_CUTOFF:
+                    best_scores[i] = (score / 100, resume_skills_normalized[best_columns[row]])
         
-        total_weight = 0.0
+        matched_skills = []
+        missing_skills = []
         matched_weight = 0.0
         
-        for req_skill in required_skills_normalized:
-            weight = skill_weights.get(req_skill, skill_weights['default'])
-            total_weight += weight
-            
-            # Exact match
-            if req_skill in resume_skills_normalized:
+        for i, (req_skill, weight) in enumerate(zip(required_skills.normalized, required_skills.weights)):
+            if exact[i]:
                 matched_skills.append(req_skill)
                 matched_weight += weight
-                continue
-            
-            # Fuzzy match
-            best_match_score = 0
-            best_match_skill = None
-            
-            for resume_skill in resume_skills_normalized:
-                similarity = fuzz.ratio(req_skill.lower(), str(resume_skill).lower()) / 100
-                if similarity > best_match_score:
-                    best_match_score = similarity
-                    best_match_skill = resume_skill
-            
-            # Accept fuzzy matches above 85%
-            if best_match_score >= 0.85:
+            elif i in best_scores:
+                best_match_score, best_match_skill = best_scores[i]
                 matched_skills.append(f"{req_skill} (~{best_match_skill})")
                 matched_weight += weight * best_match_score
             else:
                 missing_skills.append(req_skill)
         
         # Calculate score
-        if total_weight == 0:
+        if required_skills.total_weight == 0:
             score = 100.0
         else:
-            score = (matched_weight / total_weight) * 100
+            score = (matched_weight / required_skills.total_weight) * 100
         
         return round(score, 2), matched_skills, missing_skills
     
@@ -384,9 +611,17 @@ class SkillExtractor:
 _skill_extractor = None
 
 
-def get_skill_extractor() -> SkillExtractor:
-    """Get or create skill extractor singleton"""
+def get_skill_extractor(keybert_model=None) -> SkillExtractor:
+    """
+    Get or create skill extractor singleton
+    
+    Args:
+        keybert_model: SentenceTransformer to enable KeyBERT with (attached
+                       to the existing singleton if it has none yet)
+    """
     global _skill_extractor
     if _skill_extractor is None:
-        _skill_extractor = SkillExtractor()
+        _skill_extractor = SkillExtractor(keybert_model)
+    elif keybert_model is not None and _skill_extractor.keybert is None:
+        _skill_extractor.attach_keybert_model(keybert_model)
     return _skill_extractor
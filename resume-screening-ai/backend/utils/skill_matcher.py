@@ -0,0 +1,178 @@
+"""
+Multi-Pattern Skill Matcher
+Aho-Corasick automaton over skill names and synonyms:
+finds every skill mention in a single linear pass over the text
+"""
+
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Unicode code points fit in 21 bits
+_CHAR_BITS = 21
+
+
+class SkillMatch(NamedTuple):
+    """One skill mention in a text"""
+    skill: str   # Canonical skill name
+    start: int   # Offset of the first character in the original text
+    end: int     # Offset one past the last character
+    term: str    # Matched text as written in the original text
+
+
+class SkillMatcher:
+    """
+    Case-insensitive Aho-Corasick automaton mapping terms to canonical skills
+    
+    A match only counts when it is not glued to a letter, digit or
+    underscore on either side (like regex \\b), so 'Java' does not match
+    inside 'JavaScript' or 'java_utils' while 'C++' and 'C#' still match
+    before punctuation.
+    
+    Transitions live in one flat dict keyed by (state << 21) | ord(char),
+    which pickles to a few compact arrays (see __getstate__) so a large
+    taxonomy's matcher loads from disk in milliseconds.
+    """
+    
+    def __init__(self, terms: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            terms: (term, canonical_skill) pairs; later pairs win when the
+                   same term (case-insensitive) appears more than once
+        """
+        term_map: Dict[str, str] = {}
+        for term, canonical in terms:
+            term = term.strip().lower()
+            if term:
+                term_map[term] = canonical
+        
+        # _delta[key(state, char)] -> state, _fail[state] -> state,
+        # _outputs[state] -> ((term_length, canonical), ...) for states ending a term
+        self._delta: Dict[int, int] = {}
+        self._fail: List[int] = [0]
+        self._outputs: Dict[int, Tuple[Tuple[int, str], ...]] = {}
+        
+        children: List[List[Tuple[str, int]]] = [[]]
+        for term, canonical in term_map.items():
+            state = 0
+            for char in term:
+                key = (state << _CHAR_BITS) | ord(char)
+                next_state = self._delta.get(key)
+                if next_state is None:
+                    next_state = len(self._fail)
+                    self._delta[key] = next_state
+                    self._fail.append(0)
+                    children.append([])
+                    children[state].append((char, next_state))
+                state = next_state
+            self._outputs[state] = ((len(term), canonical),)
+        
+        self._build_failure_links(children)
+        
+        self.term_count = len(term_map)
+        logger.debug(f"Built skill matcher: {self.term_count} terms, {len(self._fail)} states")
+    
+    def _build_failure_links(self, children: List[List[Tuple[str, int]]]):
+        """Breadth-first: each state's failure link points at its longest proper suffix state"""
+        delta, fail, outputs = self._delta, self._fail, self._outputs
+        queue = [state for _, state in children[0]]
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in children[state]:
+                queue.append(next_state)
+                
+                code = ord(char)
+                fallback = fail[state]
+                while fallback and ((fallback << _CHAR_BITS) | code) not in delta:
+                    fallback = fail[fallback]
+                suffix = delta.get((fallback << _CHAR_BITS) | code, 0)
+                fail[next_state] = suffix
+                
+                # Inherit matches that end at the suffix state
+                if suffix in outputs:
+                    outputs[next_state] = outputs.get(next_state, ()) + outputs[suffix]
+    
+    def find_all(self, text: str) -> List[SkillMatch]:
+        """
+        Find every word-bounded skill mention (overlapping mentions included)
+        
+        Returns:
+            SkillMatch list ordered by start offset
+        """
+        if not text:
+            return []
+        
+        lowered = text.lower()
+        # lower() can expand a few characters (e.g. 'İ'); map offsets back if so
+        offsets = None if len(lowered) == len(text) else self._lowered_offsets(text)
+        
+        delta, fail, outputs = self._delta, self._fail, self._outputs
+        length = len(lowered)
+        matches = []
+        state = 0
+        
+        for index, char in enumerate(lowered):
+            code = ord(char)
+            next_state = delta.get((state << _CHAR_BITS) | code)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = delta.get((state << _CHAR_BITS) | code)
+            state = next_state or 0
+            
+            found = outputs.get(state)
+            if found is None:
+                continue
+            
+            end = index + 1
+            if end < length and (lowered[end].isalnum() or lowered[end] == '_'):
+                continue
+            for term_length, canonical in found:
+                start = end - term_length
+                if start > 0 and (lowered[start - 1].isalnum() or lowered[start - 1] == '_'):
+                    continue
+                if offsets is not None:
+                    orig_start, orig_end = offsets[start], offsets[end]
+                else:
+                    orig_start, orig_end = start, end
+                matches.append(SkillMatch(canonical, orig_start, orig_end, text[orig_start:orig_end]))
+        
+        matches.sort(key=lambda m: (m.start, -m.end))
+        return matches
+    
+    def find_skills(self, text: str) -> Set[str]:
+        """Canonical names of all skills mentioned in text"""
+        return {match.skill for match in self.find_all(text)}
+    
+    @staticmethod
+    def _lowered_offsets(text: str) -> List[int]:
+        """Original-text offset for every index of text.lower() (plus the end)"""
+        offsets = []
+        for index, char in enumerate(text):
+            offsets.extend([index] * len(char.lower()))
+        offsets.append(len(text))
+        return offsets
+    
+    def __getstate__(self) -> Dict:
+        """Pickle transitions as flat integer arrays instead of a large dict"""
+        return {
+            'term_count': self.term_count,
+            'delta_keys': array('q', self._delta.keys()).tobytes(),
+            'delta_values': array('q', self._delta.values()).tobytes(),
+            'fail': array('q', self._fail).tobytes(),
+            'outputs': self._outputs
+        }
+    
+    def __setstate__(self, state: Dict):
+        keys, values, fail = array('q'), array('q'), array('q')
+        keys.frombytes(state['delta_keys'])
+        values.frombytes(state['delta_values'])
+        fail.frombytes(state['fail'])
+        
+        self.term_count = state['term_count']
+        self._delta = dict(zip(keys.tolist(), values.tolist()))
+        self._fail = fail.tolist()
+        self._outputs = state['outputs']
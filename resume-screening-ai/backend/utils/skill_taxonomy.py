@@ -0,0 +1,277 @@
+"""
+Skill Taxonomy Loading
+Merges the built-in skill database with the external taxonomy at
+SKILLS_JSON_PATH and caches the compiled matching index on disk
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from backend.utils.skill_matcher import SkillMatcher
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever SkillTaxonomy or SkillMatcher internals change
+# so pickled indexes from older code are rebuilt
+INDEX_VERSION = "2"
+
+DEFAULT_CATEGORY = "other"
+
+
+class SkillTaxonomy:
+    """
+    Everything SkillExtractor needs to find and normalize skills
+    
+    skill_database: category -> canonical skill names
+    skill_synonyms: canonical skill -> variations
+    normalization_map: lowercase variation/canonical -> canonical
+    matcher: SkillMatcher over all skills and synonyms
+    """
+    
+    def __init__(
+        self,
+        skill_database: Dict[str, List[str]],
+        skill_synonyms: Dict[str, List[str]],
+        source_signature: Optional[Tuple[float, int]] = None
+    ):
+        self.skill_database = skill_database
+        self.skill_synonyms = skill_synonyms
+        self.normalization_map = self._build_normalization_map(skill_synonyms)
+        self.matcher = self._build_matcher()
+        # (mtime, size) of the taxonomy file this was built from
+        self.source_signature = source_signature
+    
+    @staticmethod
+    def _build_normalization_map(skill_synonyms: Dict[str, List[str]]) -> Dict[str, str]:
+        norm_map = {}
+        for canonical, variations in skill_synonyms.items():
+            for var in variations:
+                norm_map[var.lower()] = canonical
+            norm_map[canonical.lower()] = canonical
+        return norm_map
+    
+    def normalize_skill(self, skill: str) -> str:
+        return self.normalization_map.get(skill.lower().strip(), skill)
+    
+    def _build_matcher(self) -> SkillMatcher:
+        """Database skills map to their normalized name, synonyms to their canonical skill"""
+        terms = [
+            (skill, self.normalize_skill(skill))
+            for skills in self.skill_database.values()
+            for skill in skills
+        ]
+        terms.extend(
+            (var, canonical)
+            for canonical, variations in self.skill_synonyms.items()
+            for var in variations
+        )
+        return SkillMatcher(terms)
+    
+    @property
+    def skill_count(self) -> int:
+        return sum(len(skills) for skills in self.skill_database.values())
+
+
+def parse_taxonomy_entries(data) -> List[Dict]:
+    """
+    Normalize the supported taxonomy file layouts into entry dicts
+    
+    Supported layouts:
+        {"skills": ["python", ...]}
+        {"skills": [{"name": "Python", "category": "languages", "synonyms": ["py"]}, ...]}
+        {"skills": {"languages": ["Python", ...], ...}}
+        ESCO-style entries using "preferredLabel" / "altLabels" / "skillType"
+    
+    Returns:
+        [{'name': str, 'category': str, 'synonyms': List[str]}, ...]
+    """
+    skills = data.get('skills', data) if isinstance(data, dict) else data
+    
+    if isinstance(skills, dict):
+        items = [
+            dict(item, category=item.get('category', category)) if isinstance(item, dict)
+            else {'name': item, 'category': category}
+            for category, category_items in skills.items()
+            for item in category_items
+        ]
+    else:
+        items = list(skills)
+    
+    entries = []
+    for item in items:
+        if isinstance(item, str):
+            item = {'name': item}
+        if not isinstance(item, dict):
+            continue
+        
+        name = item.get('name') or item.get('preferredLabel')
+        if not name or not str(name).strip():
+            continue
+        
+        synonyms = item.get('synonyms', item.get('altLabels', []))
+        if isinstance(synonyms, str):
+            # ESCO CSV exports keep alternative labels newline-separated
+            synonyms = synonyms.splitlines()
+        
+        entries.append({
+            'name': str(name).strip(),
+            'category': item.get('category') or item.get('skillType') or DEFAULT_CATEGORY,
+            'synonyms': [str(s).strip() for s in synonyms if str(s).strip()]
+        })
+    
+    return entries
+
+
+def merge_taxonomy(
+    builtin_database: Dict[str, List[str]],
+    builtin_synonyms: Dict[str, List[str]],
+    entries: List[Dict]
+) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Merge external entries into the built-in database and synonyms
+    
+    The built-in definitions win on (case-insensitive) collisions: an
+    external skill that is already known keeps the built-in canonical name,
+    and external synonyms never re-map a term the built-ins already define.
+    """
+    skill_database = {category: list(skills) for category, skills in builtin_database.items()}
+    skill_synonyms = {canonical: list(variations) for canonical, variations in builtin_synonyms.items()}
+    
+    # lowercase term -> canonical, for every term defined so far
+    known = SkillTaxonomy._build_normalization_map(skill_synonyms)
+    for skills in skill_database.values():
+        for skill in skills:
+            known.setdefault(skill.lower(), skill)
+    
+    for entry in entries:
+        canonical = known.get(entry['name'].lower())
+        if canonical is None:
+            canonical = entry['name']
+            known[canonical.lower()] = canonical
+            skill_database.setdefault(entry['category'], []).append(canonical)
+        
+        new_synonyms = [s for s in entry['synonyms'] if s.lower() not in known]
+        if new_synonyms:
+            skill_synonyms.setdefault(canonical, []).extend(new_synonyms)
+            for synonym in new_synonyms:
+                known[synonym.lower()] = canonical
+    
+    return skill_database, skill_synonyms
+
+
+def _builtin_digest(builtin_database: Dict, builtin_synonyms: Dict) -> str:
+    """Built-in definitions are part of the index key so code changes rebuild it"""
+    payload = json.dumps([builtin_database, builtin_synonyms], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _source_key(taxonomy_path: Path) -> str:
+    """Identifies the taxonomy file, so its outdated indexes can be found"""
+    return hashlib.sha256(str(taxonomy_path.resolve()).encode('utf-8')).hexdigest()[:8]
+
+
+def file_signature(path: Path) -> Optional[Tuple[float, int]]:
+    """(mtime, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime, stat.st_size)
+
+
+def load_skill_taxonomy(
+    taxonomy_path: Path,
+    builtin_database: Dict[str, List[str]],
+    builtin_synonyms: Dict[str, List[str]],
+    index_dir: Optional[Path] = None
+) -> SkillTaxonomy:
+    """
+    Build the merged taxonomy, reusing a pickled index when possible
+    
+    The index file is keyed by the SHA-256 of the taxonomy file contents
+    and the built-in definitions, so an unchanged taxonomy loads from the
+    pickle instead of recompiling the matcher. Writing a new index removes
+    the older ones built from the same taxonomy path.
+    
+    Args:
+        taxonomy_path: External taxonomy JSON (missing file -> built-ins only)
+        builtin_database: Built-in category -> skills
+        builtin_synonyms: Built-in canonical -> variations
+        index_dir: Directory for pickled indexes (None disables the disk cache)
+    """
+    taxonomy_path = Path(taxonomy_path)
+    signature = file_signature(taxonomy_path)
+    
+    if signature is None:
+        logger.warning(f"Skill taxonomy not found at {taxonomy_path}; using built-in skills only")
+        return SkillTaxonomy(builtin_database, builtin_synonyms)
+    
+    raw = taxonomy_path.read_bytes()
+    key = hashlib.sha256(raw).hexdigest()[:32]
+    index_path = None
+    if index_dir is not None:
+        index_path = Path(index_dir) / (
+            f"skills-{_source_key(taxonomy_path)}-{key}-"
+            f"{_builtin_digest(builtin_database, builtin_synonyms)}-v{INDEX_VERSION}.pkl"
+        )
+        taxonomy = _read_index(index_path)
+        if taxonomy is not None:
+            taxonomy.source_signature = signature
+            logger.info(f"Loaded skill index ({taxonomy.skill_count} skills) from {index_path.name}")
+            return taxonomy
+    
+    try:
+        entries = parse_taxonomy_entries(json.loads(raw.decode('utf-8')))
+    except Exception as e:
+        logger.error(f"Could not parse skill taxonomy {taxonomy_path}: {e}")
+        return SkillTaxonomy(builtin_database, builtin_synonyms)
+    
+    skill_database, skill_synonyms = merge_taxonomy(builtin_database, builtin_synonyms, entries)
+    taxonomy = SkillTaxonomy(skill_database, skill_synonyms, source_signature=signature)
+    logger.info(
+        f"Compiled skill index: {taxonomy.skill_count} skills, "
+        f"{taxonomy.matcher.term_count} terms ({len(entries)} from {taxonomy_path.name})"
+    )
+    
+    if index_path is not None:
+        _write_index(index_path, taxonomy)
+    return taxonomy
+
+
+def _read_index(index_path: Path) -> Optional[SkillTaxonomy]:
+    if not index_path.exists():
+        return None
+    try:
+        with open(index_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable skill index {index_path.name}: {e}")
+        return None
+
+
+def _write_index(index_path: Path, taxonomy: SkillTaxonomy):
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so other processes never load a partial file
+        tmp_path = index_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(taxonomy, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+    except Exception as e:
+        logger.warning(f"Could not persist skill index {index_path.name}: {e}")
+        return
+    
+    # Indexes of earlier versions of the same taxonomy are never loaded again
+    source = index_path.name.split('-')[1]
+    for stale in index_path.parent.glob(f"skills-{source}-*.pkl"):
+        if stale != index_path:
+            try:
+                stale.unlink()
+            except OSError:
+                pass  # Removed by another process
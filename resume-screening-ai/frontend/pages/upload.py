@@ -74,10 +74,12 @@ if st.session_state['uploaded_files'] and st.session_state['job_description']:
                 # Initialize API client
                 api_client = APIClient(base_url="http://localhost:8000")
                 
-                # Process resumes
+                # Process resumes (background job, progress shown while polling)
+                progress_bar = st.progress(0.0)
                 results = api_client.process_resumes(
                     st.session_state['uploaded_files'],
-                    st.session_state['job_description']
+                    st.session_state['job_description'],
+                    on_progress=lambda job: progress_bar.progress(job['progress_percentage'] / 100)
                 )
                 
                 if results:
@@ -2,9 +2,11 @@
 API Client for Backend Communication
 """
 
+import json
+import time
 import requests
 import streamlit as st
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable, Iterator
 
 class APIClient:
     """Client for communicating with the backend API"""
@@ -22,8 +24,8 @@ class APIClient:
             print(f"Health check failed: {e}")
             return False
     
-    def process_resumes(self, uploaded_files, job_description: str) -> List[Dict[str, Any]]:
-        """Send resumes to backend for processing"""
+    def submit_job(self, uploaded_files, job_description: str) -> Optional[Dict[str, Any]]:
+        """Submit resumes for background processing, returns the job status"""
         
         files = []
         for uploaded_file in uploaded_files:
@@ -33,19 +35,75 @@ class APIClient:
         
         data = {'job_description': job_description}
         
+        response = requests.post(
+            f"{self.base_url}{self.api_prefix}/jobs",
+            files=files,
+            data=data,
+            timeout=60
+        )
+        
+        if response.status_code in (200, 202):
+            return response.json()
+        
+        st.error(f"API Error: {response.status_code} - {response.text}")
+        return None
+    
+    def get_job_status(self, job_id: str) -> Dict[str, Any]:
+        """Get progress and partial results of a background job"""
+        response = requests.get(f"{self.base_url}{self.api_prefix}/jobs/{job_id}", timeout=10)
+        response.raise_for_status()
+        return response.json()
+    
+    def process_resumes(
+        self,
+        uploaded_files,
+        job_description: str,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        poll_interval: float = 1.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Send resumes to backend for processing
+        Submits a background job and polls it, so large batches never hit HTTP timeouts
+        """
         try:
-            response = requests.post(
-                f"{self.base_url}{self.api_prefix}/process",
-                files=files,
-                data=data,
-                timeout=300
-            )
+            job = self.submit_job(uploaded_files, job_description)
+            if job is None:
+                return None
+            
+            while job['status'] not in ('completed', 'failed'):
+                time.sleep(poll_interval)
+                job = self.get_job_status(job['job_id'])
+                if on_progress:
+                    on_progress(job)
             
-            if response.status_code == 200:
-                return response.json()['results']
-            else:
-                st.error(f"API Error: {response.status_code} - {response.text}")
+            if job['status'] == 'failed':
+                st.error(f"Processing failed: {job.get('error')}")
                 return None
+            
+            return job['results']
         except Exception as e:
             st.error(f"Connection Error: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    def stream_resumes(self, uploaded_files, job_description: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process resumes and yield each frame of the NDJSON stream as it arrives
+        ('candidate' / 'skipped' frames, then a final 'summary' frame)
+        """
+        files = [
+            ('resumes', (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type))
+            for uploaded_file in uploaded_files
+        ]
+        data = {'job_description': job_description, 'stream_format': 'ndjson'}
+        
+        with requests.post(
+            f"{self.base_url}{self.api_prefix}/process/stream",
+            files=files,
+            data=data,
+            stream=True,
+            timeout=(10, 300)  # (connect, max gap between frames)
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
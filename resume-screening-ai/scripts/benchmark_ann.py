@@ -0,0 +1,140 @@
+"""
+ANN Index Benchmark
+Recall@K and queries per second of the IVF-PQ talent pool index against an
+exact (brute-force cosine) scan, for a range of nprobe values
+
+Vectors come from an .npy file of embeddings (e.g. a copy of the vector
+store), from resumes encoded with the configured sentence-transformer, or
+from a synthetic clustered set shaped like all-MiniLM-L6-v2 output.
+
+Usage:
+    python scripts/benchmark_ann.py --size 1000000 --nprobe 8 16 32 64
+    python scripts/benchmark_ann.py --embeddings pool.npy --k 10
+    python scripts/benchmark_ann.py --csv UpdatedResumeDataSet.csv/UpdatedResumeDataSet.csv
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from backend.core.ann_index import IVFPQIndex
+from backend.core.config import settings
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+def synthetic_embeddings(size: int, dim: int, seed: int) -> np.ndarray:
+    """Normalized vectors around a few thousand topics, like resume embeddings"""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(max(16, size // 250), dim)).astype(np.float32)
+    vectors = np.empty((size, dim), dtype=np.float32)
+    for start in range(0, size, 100000):
+        end = min(start + 100000, size)
+        labels = rng.integers(0, len(topics), end - start)
+        vectors[start:end] = topics[labels] + 0.6 * rng.normal(size=(end - start, dim)).astype(np.float32)
+    return normalize(vectors)
+
+
+def encoded_resumes(csv_path: Path) -> np.ndarray:
+    """Resumes from the Kaggle dataset (Category, Resume columns) encoded with MODEL_NAME"""
+    import pandas as pd
+    from sentence_transformers import SentenceTransformer
+
+    texts = pd.read_csv(csv_path, encoding='utf-8')['Resume'].dropna().astype(str).tolist()
+    model = SentenceTransformer(settings.MODEL_NAME, cache_folder=str(settings.MODEL_CACHE_DIR))
+    return model.encode(texts, batch_size=settings.ENCODE_BATCH_SIZE, normalize_embeddings=True).astype(np.float32)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int):
+    """Ground-truth neighbours and the per-query time of a full scan"""
+    truth = []
+    start = time.perf_counter()
+    for query in queries:
+        scores = vectors @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        truth.append(set(top.tolist()))
+    return truth, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the IVF-PQ index against exact search")
+    parser.add_argument('--embeddings', type=str, help='(N, dim) .npy file of normalized embeddings')
+    parser.add_argument('--csv', type=str, help='Resume CSV (Category, Resume) to encode instead')
+    parser.add_argument('--size', type=int, default=200000, help='Synthetic pool size (default: 200000)')
+    parser.add_argument('--dim', type=int, default=384, help='Synthetic dimension (default: 384, all-MiniLM-L6-v2)')
+    parser.add_argument('--queries', type=int, default=200, help='Held-out query vectors (default: 200)')
+    parser.add_argument('--k', type=int, default=10, help='Recall@K (default: 10)')
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[4, 8, 16, 32, 64], help='nprobe values to sweep')
+    parser.add_argument('--rerank', type=int, default=settings.ANN_RERANK_FACTOR,
+                        help=f'Candidates per result re-scored exactly; 1 = PQ ranking only (default: {settings.ANN_RERANK_FACTOR})')
+    parser.add_argument('--subvectors', type=int, default=settings.ANN_SUBVECTORS, help='PQ bytes per vector')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = normalize(np.load(args.embeddings))
+    elif args.csv:
+        vectors = encoded_resumes(Path(args.csv))
+    else:
+        vectors = synthetic_embeddings(args.size + args.queries, args.dim, args.seed)
+
+    # Hold queries out of the pool, perturbed so they are not stored verbatim
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(vectors))
+    queries = vectors[order[:args.queries]]
+    queries = normalize(queries + 0.05 * rng.normal(size=queries.shape).astype(np.float32))
+    pool = np.ascontiguousarray(vectors[order[args.queries:]])
+    size, dim = pool.shape
+    print(f"Pool: {size} x {dim}, {len(queries)} queries, recall@{args.k}, rerank x{args.rerank}\n")
+
+    truth, exact_time = exact_top_k(pool, queries, args.k)
+
+    start = time.perf_counter()
+    index = IVFPQIndex(
+        dim, max(1, int(4 * np.sqrt(size))),
+        IVFPQIndex.choose_subvectors(dim, args.subvectors)
+    )
+    sample = rng.choice(size, size=min(size, settings.ANN_TRAIN_SAMPLE), replace=False)
+    index.train(pool[np.sort(sample)])
+    train_time = time.perf_counter() - start
+    start = time.perf_counter()
+    index.add(np.arange(size), pool)
+    add_time = time.perf_counter() - start
+
+    # Search the memory-mapped snapshot, as the server does
+    with tempfile.TemporaryDirectory() as snapshot:
+        index.save(Path(snapshot))
+        index = IVFPQIndex.load(Path(snapshot))
+
+        print(f"train {train_time:.1f}s, add {add_time:.1f}s "
+              f"({index.n_lists} lists, {index.n_subvectors} bytes/vector)\n")
+        print(f"{'nprobe':<10}{'recall':>10}{'QPS':>12}{'ms/query':>12}{'speedup':>10}")
+        print(f"{'exact':<10}{1.0:>10.3f}{1 / exact_time:>12.0f}{exact_time * 1000:>12.2f}{1.0:>9.1f}x")
+
+        for nprobe in args.nprobe:
+            hits = 0
+            start = time.perf_counter()
+            for query, expected in zip(queries, truth):
+                ids, _ = index.search(query, args.k * args.rerank, nprobe)
+                if args.rerank > 1:
+                    ids = ids[np.argsort(-(pool[ids] @ query))[:args.k]]
+                hits += len(expected & set(ids[:args.k].tolist()))
+            elapsed = (time.perf_counter() - start) / len(queries)
+            print(f"{nprobe:<10}{hits / (args.k * len(queries)):>10.3f}{1 / elapsed:>12.0f}"
+                  f"{elapsed * 1000:>12.2f}{exact_time / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.WARNING)
+    main()
@@ -0,0 +1,133 @@
+"""
+Extractor Micro-Benchmark
+Measures the per-resume overhead of experience/education extraction:
+building fresh extractors (the old per-call behaviour) vs shared singletons,
+and string regexes vs the precompiled class patterns
+
+Usage:
+    python scripts/benchmark_extractors.py --limit 200
+    python scripts/benchmark_extractors.py --with-spacy   # include NER time
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import pandas as pd
+
+# Add project root to path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from nltk.corpus import stopwords
+
+from backend.utils import nlp_processor as nlp_module
+from backend.utils.nlp_processor import NLPProcessor
+from backend.utils.experience_education_extractor import (
+    ExperienceExtractor, EducationExtractor, extract_experience_and_education,
+    get_experience_extractor, get_education_extractor
+)
+
+DEFAULT_CSV = root_dir / "UpdatedResumeDataSet.csv" / "UpdatedResumeDataSet.csv"
+
+
+def load_resumes(csv_path: Path, limit: int) -> List[str]:
+    """Resume texts from the Kaggle dataset (Category, Resume columns)"""
+    df = pd.read_csv(csv_path, encoding='utf-8')
+    return df['Resume'].dropna().astype(str).head(limit).tolist()
+
+
+def time_per_item(fn: Callable[[str], object], texts: List[str], repeat: int) -> float:
+    """Best-of-repeat mean time per text, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1000
+
+
+def legacy_nlp_processor() -> NLPProcessor:
+    """
+    NLPProcessor as its old constructor built it: a fresh NLTK stopword set
+    per instance (the spaCy model was a module-level global then as well)
+    """
+    processor = NLPProcessor.__new__(NLPProcessor)
+    processor.nlp = nlp_module.get_spacy_model()
+    processor.stop_words = set(stopwords.words('english'))
+    processor.technical_preserve = {'in', 'to', 'with', 'for', 'as', 'or', 'and', 'not'}
+    return processor
+
+
+def legacy_setup(_: str):
+    """
+    What every call paid before: new extractors, each constructing its own
+    NLPProcessor (today's constructors share the singleton, so they are
+    bypassed here)
+    """
+    for extractor_class in (ExperienceExtractor, EducationExtractor):
+        extractor = extractor_class.__new__(extractor_class)
+        extractor.nlp_processor = legacy_nlp_processor()
+
+
+def shared_setup(_: str):
+    get_experience_extractor()
+    get_education_extractor()
+
+
+def string_regexes(text: str):
+    """Patterns passed as strings (looked up in re's internal cache every call)"""
+    text_lower = text.lower()
+    for pattern in ExperienceExtractor.EXPERIENCE_PATTERNS + ExperienceExtractor.DATE_RANGE_PATTERNS:
+        re.findall(pattern.pattern, text_lower, re.IGNORECASE)
+    for pattern in EducationExtractor.DEGREE_PATTERNS.values():
+        list(re.finditer(pattern.pattern, text, re.IGNORECASE))
+
+
+def compiled_regexes(text: str):
+    text_lower = text.lower()
+    for pattern in ExperienceExtractor.EXPERIENCE_PATTERNS + ExperienceExtractor.DATE_RANGE_PATTERNS:
+        pattern.findall(text_lower)
+    for pattern in EducationExtractor.DEGREE_PATTERNS.values():
+        list(pattern.finditer(text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark experience/education extraction overhead")
+    parser.add_argument('--csv', type=str, default=str(DEFAULT_CSV), help='Resume CSV (Category, Resume)')
+    parser.add_argument('--limit', type=int, default=200, help='Number of resumes (default: 200)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions, best is reported (default: 3)')
+    parser.add_argument('--with-spacy', action='store_true', help='Keep spaCy NER enabled in the full run')
+    args = parser.parse_args()
+    
+    texts = load_resumes(Path(args.csv), args.limit)
+    print(f"Benchmarking {len(texts)} resumes (best of {args.repeat})\n")
+    
+    if not args.with_spacy:
+        # Isolate the Python-side overhead from NER time
+        nlp_module.get_nlp_processor().nlp = None
+    
+    rows = [
+        ("extractor setup", time_per_item(legacy_setup, texts, args.repeat), time_per_item(shared_setup, texts, args.repeat)),
+        ("regex matching", time_per_item(string_regexes, texts, args.repeat), time_per_item(compiled_regexes, texts, args.repeat)),
+    ]
+    
+    print("before: old per-call extractor construction, rebuilt (one NLPProcessor per extractor)")
+    print("after:  shared extractor singletons\n")
+    print(f"{'stage':<20}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for stage, before, after in rows:
+        print(f"{stage:<20}{before:>14.3f}{after:>14.3f}{before / max(after, 1e-9):>9.1f}x")
+    
+    full = time_per_item(extract_experience_and_education, texts, args.repeat)
+    print(f"\nextract_experience_and_education: {full:.3f} ms/resume "
+          f"({'with' if args.with_spacy else 'without'} spaCy)")
+
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.WARNING)
+    main()
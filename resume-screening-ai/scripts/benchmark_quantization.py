@@ -0,0 +1,188 @@
+"""
+Quantization Benchmark
+Throughput, resident memory and score drift of the int8 scoring variants
+against fp32, on the Kaggle UpdatedResumeDataSet.csv resumes
+
+Each variant runs in its own process so RSS reflects that variant alone.
+Drift is measured on the embeddings (cosine to torch fp32) and on resume x
+job-category similarity scores, the quantity semantic scoring is built on.
+
+Usage:
+    python scripts/quantize_model.py && python scripts/benchmark_quantization.py
+    python scripts/benchmark_quantization.py --pretrained --limit 300 --threads 4
+    python scripts/benchmark_quantization.py --variants torch-fp32 onnx-int8
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from backend.core.config import settings
+from backend.core.onnx_encoder import (
+    ONNXRUNTIME_AVAILABLE, ONNX_MODEL_FILE, ONNX_INT8_FILE, OnnxSentenceEncoder, ensure_onnx_export
+)
+
+DEFAULT_CSV = root_dir / "UpdatedResumeDataSet.csv" / "UpdatedResumeDataSet.csv"
+
+# torch-fp32 is the reference every other variant is compared with
+VARIANTS = ['torch-fp32', 'torch-int8', 'onnx-fp32', 'onnx-int8']
+
+
+def rss_mb() -> float:
+    """Resident set size of this process (peak RSS where /proc is missing)"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_variant(
+    variant: str,
+    model_source: Dict,
+    onnx_dir: str,
+    texts: List[str],
+    queries: List[str],
+    threads: int,
+    batch_size: int,
+    output: str,
+    results
+):
+    """Load one variant, time encoding all texts and save texts + query embeddings"""
+    baseline = rss_mb()
+    if variant.startswith('torch'):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        torch.set_num_threads(threads)
+        encoder = SentenceTransformer(**model_source, device='cpu')
+        if variant == 'torch-int8':
+            encoder = torch.quantization.quantize_dynamic(encoder, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        model_file = ONNX_INT8_FILE if variant == 'onnx-int8' else ONNX_MODEL_FILE
+        encoder = OnnxSentenceEncoder(Path(onnx_dir), threads, model_file)
+    loaded = rss_mb()
+    
+    encoder.encode(texts[:batch_size], batch_size=batch_size)  # Warm-up
+    start = time.perf_counter()
+    embeddings = encoder.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    elapsed = time.perf_counter() - start
+    query_embeddings = encoder.encode(queries, batch_size=batch_size, normalize_embeddings=True)
+    
+    np.savez(output, texts=np.asarray(embeddings, dtype=np.float32), queries=np.asarray(query_embeddings, dtype=np.float32))
+    results.put({
+        'docs_per_s': len(texts) / elapsed,
+        'model_mb': loaded - baseline,
+        'rss_mb': rss_mb()
+    })
+
+
+def drift(embeddings: Dict[str, np.ndarray], reference: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Embedding and resume x category score drift against the reference variant"""
+    cosines = (embeddings['texts'] * reference['texts']).sum(axis=1)
+    scores = embeddings['texts'] @ embeddings['queries'].T * 100
+    reference_scores = reference['texts'] @ reference['queries'].T * 100
+    return {
+        'cos_mean': float(cosines.mean()),
+        'cos_min': float(cosines.min()),
+        'score_mean': float(np.abs(scores - reference_scores).mean()),
+        'score_max': float(np.abs(scores - reference_scores).max()),
+        'top1': float((scores.argmax(axis=1) == reference_scores.argmax(axis=1)).mean())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark int8 scoring variants against fp32")
+    parser.add_argument('--csv', type=str, default=str(DEFAULT_CSV), help='Resume CSV (Category, Resume)')
+    parser.add_argument('--limit', type=int, default=500, help='Number of resumes (default: 500)')
+    parser.add_argument('--pretrained', action='store_true', help='Use settings.MODEL_NAME instead of models/custom_model')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1, help='Inference threads per variant')
+    parser.add_argument('--batch-size', type=int, default=settings.ENCODE_BATCH_SIZE)
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=VARIANTS)
+    args = parser.parse_args()
+    
+    df = pd.read_csv(args.csv, encoding='utf-8').dropna(subset=['Resume']).head(args.limit)
+    texts = df['Resume'].astype(str).tolist()
+    # One short pseudo job description per category
+    queries = [f"Job description: we are hiring for a {category} role" for category in sorted(df['Category'].unique())]
+    
+    # Imported here: spawned variant processes re-import this module and must not load torch
+    from backend.core.ml_engine_enhanced import EnhancedMLEngine
+    
+    settings.INFERENCE_BACKEND = "torch"
+    engine = EnhancedMLEngine(use_custom_model=not args.pretrained)
+    if engine.weights_id.startswith("custom:"):
+        model_source = {'model_name_or_path': str(engine.custom_model_path)}
+    else:
+        model_source = {'model_name_or_path': settings.MODEL_NAME, 'cache_folder': str(settings.MODEL_CACHE_DIR)}
+    
+    variants = ['torch-fp32'] + [v for v in args.variants if v != 'torch-fp32']
+    onnx_dir = None
+    if any(v.startswith('onnx') for v in variants):
+        if ONNXRUNTIME_AVAILABLE:
+            onnx_dir = str(ensure_onnx_export(engine.model, engine.weights_id, quantized='onnx-int8' in variants))
+        else:
+            print("⚠️  onnxruntime is not installed, skipping ONNX variants")
+            variants = [v for v in variants if not v.startswith('onnx')]
+    del engine
+    
+    print(f"Benchmarking {len(texts)} resumes, {len(queries)} categories, {args.threads} threads\n")
+    
+    # Spawned processes start clean, so RSS is per variant
+    context = multiprocessing.get_context('spawn')
+    stats, embeddings = {}, {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for variant in variants:
+            output = str(Path(scratch) / f"{variant}.npz")
+            results = context.Queue()
+            process = context.Process(target=run_variant, args=(
+                variant, model_source, onnx_dir, texts, queries,
+                args.threads, args.batch_size, output, results
+            ))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"❌ {variant} failed (exit code {process.exitcode})")
+                continue
+            stats[variant] = results.get()
+            with np.load(output) as data:
+                embeddings[variant] = {'texts': data['texts'], 'queries': data['queries']}
+    
+    if 'torch-fp32' not in stats:
+        return
+    reference = embeddings['torch-fp32']
+    base_speed = stats['torch-fp32']['docs_per_s']
+    
+    print(f"{'variant':<12}{'docs/s':>9}{'speedup':>9}{'model MB':>10}{'RSS MB':>9}"
+          f"{'cos mean':>10}{'cos min':>9}{'Δscore':>8}{'max Δ':>8}{'top-1':>7}")
+    for variant in variants:
+        if variant not in stats:
+            continue
+        s = stats[variant]
+        d = drift(embeddings[variant], reference)
+        print(f"{variant:<12}{s['docs_per_s']:>9.1f}{s['docs_per_s'] / base_speed:>8.2f}x"
+              f"{s['model_mb']:>10.0f}{s['rss_mb']:>9.0f}"
+              f"{d['cos_mean']:>10.5f}{d['cos_min']:>9.5f}{d['score_mean']:>8.3f}{d['score_max']:>8.3f}{d['top1']:>7.1%}")
+    print("\nΔscore: mean |similarity x 100 - fp32| over resume x category pairs; "
+          "top-1: resumes whose best category is unchanged")
+
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.WARNING)
+    main()
@@ -0,0 +1,49 @@
+"""
+Quantization Script
+Export the scoring model to ONNX and write its dynamic int8 variant, the
+artifact the API loads at startup with INFERENCE_BACKEND=onnx-int8
+
+Usage:
+    python scripts/quantize_model.py              # models/custom_model
+    python scripts/quantize_model.py --pretrained # settings.MODEL_NAME
+    python scripts/quantize_model.py --force      # re-export and re-quantize
+"""
+
+import sys
+from pathlib import Path
+import argparse
+
+# Add project root to path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from backend.core.config import settings
+from backend.core.ml_engine_enhanced import EnhancedMLEngine
+from backend.core.onnx_encoder import ONNX_MODEL_FILE, ONNX_INT8_FILE, ensure_onnx_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produce the int8 ONNX model for CPU scoring")
+    parser.add_argument('--pretrained', action='store_true', help='Quantize settings.MODEL_NAME instead of models/custom_model')
+    parser.add_argument('--force', action='store_true', help='Export and quantize even if up to date')
+    args = parser.parse_args()
+    
+    # Load the PyTorch weights only; the export below is what this script is for
+    settings.INFERENCE_BACKEND = "torch"
+    engine = EnhancedMLEngine(use_custom_model=not args.pretrained)
+    if not args.pretrained and not engine.weights_id.startswith("custom:"):
+        print(f"⚠️  No custom model in {engine.custom_model_path}, quantizing {settings.MODEL_NAME}")
+    
+    print(f"📦 Exporting {engine.weights_id}")
+    model_dir = ensure_onnx_export(engine.model, engine.weights_id, quantized=True, force=args.force)
+    
+    fp32_size = (model_dir / ONNX_MODEL_FILE).stat().st_size / 1024 ** 2
+    int8_size = (model_dir / ONNX_INT8_FILE).stat().st_size / 1024 ** 2
+    print(f"✅ {model_dir / ONNX_MODEL_FILE}: {fp32_size:.1f} MB")
+    print(f"✅ {model_dir / ONNX_INT8_FILE}: {int8_size:.1f} MB")
+    print("\nStart the API with INFERENCE_BACKEND=onnx-int8 to score with it")
+    print("Compare against fp32 with: python scripts/benchmark_quantization.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,15 +16,31 @@ def main():
     import uvicorn
     from backend.core.config import settings
     
+    workers = settings.SERVER_WORKERS if settings.SERVER_WORKERS > 0 else (os.cpu_count() or 1)
+    prefork = workers > 1 and hasattr(os, 'fork')
+    
     print("=" * 50)
     print("🚀 Starting Resume Screening AI Backend")
     print("=" * 50)
     print(f"Host: {settings.HOST}")
     print(f"Port: {settings.PORT}")
     print(f"Debug Mode: {settings.DEBUG}")
+    print(f"Workers: {workers if prefork else 1}")
     print(f"API Docs: http://localhost:{settings.PORT}/docs")
     print("=" * 50)
     
+    if workers > 1 and not prefork:
+        print("⚠️  Prefork workers need os.fork (Linux/macOS); starting a single process")
+    
+    if prefork:
+        if settings.DEBUG:
+            print("ℹ️  Auto-reload is off with several workers")
+        import logging
+        from backend.core.prefork import serve
+        logging.basicConfig(level=logging.INFO)
+        serve(workers)
+        return
+    
     uvicorn.run(
         "backend.main:app",
         host=settings.HOST,
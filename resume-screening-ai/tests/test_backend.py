@@ -4,6 +4,8 @@ Run with: pytest tests/
 """
 
 import pytest
+import numpy as np
+from sqlalchemy import select
 from pathlib import Path
 import sys
 
@@ -13,7 +15,22 @@ sys.path.insert(0, str(root_dir))
 
 from backend.utils.skill_extractor import get_skill_extractor
 from backend.utils.contact_extractor import ContactExtractor
-from backend.core.ml_engine_enhanced import EnhancedMLEngine, get_enhanced_ml_engine
+from backend.utils.parser import ResumeParser
+from backend.utils.resume_cache import ResumeCache
+from backend.core.embedding_cache import EmbeddingCache, embedding_key
+from backend.core.vector_store import ResumeVectorStore, resume_vectors
+from backend.core.ann_index import IVFPQIndex
+from backend.core.encode_scheduler import EncodeScheduler, token_backend_for
+from backend.core.embedding_service import EmbeddingService, RemoteEncodeScheduler
+from backend.core.warmup import ComponentRegistry
+from backend.core.onnx_encoder import OnnxSentenceEncoder, export_onnx, quantize_onnx, ONNX_INT8_FILE
+from backend.utils.skill_matcher import SkillMatcher
+from backend.utils.skill_taxonomy import parse_taxonomy_entries, merge_taxonomy, load_skill_taxonomy
+from backend.utils.nlp_processor import NLPProcessor, DocumentContext
+from backend.core.ml_engine_enhanced import (
+    EnhancedMLEngine, get_enhanced_ml_engine,
+    chunk_text, pool_chunk_embeddings, detect_required_seniority, extract_required_years
+)
 
 
 class TestSkillExtractor:
@@ -36,6 +53,44 @@ class TestSkillExtractor:
         assert 'python' in [s.lower() for s in matched]
         assert 'django' in [s.lower() for s in matched]
         assert 'aws' in [s.lower() for s in missing]
+    
+    def test_match_skills_fuzzy_and_prepared(self):
+        resume_skills = {'Kubernetes', 'Postgres', 'Dockers'}
+        required_skills = ['kubernetes', 'Docker', 'Redis']
+        result = self.extractor.compute_skill_match_score(resume_skills, required_skills)
+        score, matched, missing = result
+        assert 'Kubernetes' in matched
+        assert 'Docker (~Dockers)' in matched
+        assert missing == ['Redis']
+        
+        # Prepared once per job description, same result
+        prepared = self.extractor.prepare_required_skills(required_skills)
+        assert self.extractor.compute_skill_match_score(resume_skills, prepared) == result
+    
+    def test_keyword_skills_do_not_depend_on_batch(self, monkeypatch):
+        from backend.core.config import settings
+        from backend.utils.skill_extractor import KEYBERT_AVAILABLE, SkillExtractor
+        if not KEYBERT_AVAILABLE:
+            pytest.skip("KeyBERT not installed")
+        from backend.utils.skill_extractor import PerDocumentCandidates
+        monkeypatch.setattr(settings, 'KEYBERT_MAX_CANDIDATES', 6)
+        resume = "Built React dashboards and Django services. React hooks, Django ORM, Flask workers and Celery."
+        others = ["Spring Boot microservices on Kubernetes. " * 5 + "Vue frontends.", "Angular and React Native apps. " * 3]
+        
+        vectorizer = PerDocumentCandidates(6, ngram_range=(1, 3), stop_words='english')
+        
+        def candidates(docs):
+            counts = vectorizer.fit(docs).transform(docs)
+            return set(vectorizer.get_feature_names_out()[counts[docs.index(resume)].indices])
+        
+        assert len(candidates([resume])) == 6
+        assert candidates([resume]) == candidates(others + [resume])
+        
+        engine = get_enhanced_ml_engine(use_custom=False)
+        extractor = SkillExtractor(keybert_model=engine.model)
+        embeddings = engine.encode_documents(others + [resume])
+        alone = extractor.extract_keyword_skills_batch([resume], embeddings[-1:])[0]
+        assert extractor.extract_keyword_skills_batch(others + [resume], embeddings)[-1] == alone
 
 
 class TestContactExtractor:
@@ -82,6 +137,1036 @@ class TestMLEngine:
     def test_calculate_final_score(self):
         final = self.engine.calculate_final_score(80, 70, 90, 85)
         assert 0 <= final <= 100
+    
+    def test_batch_semantic_scores_match_single(self):
+        jd = "Looking for a Python developer with Django and AWS experience. " * 5
+        resumes = [
+            "Python developer, 5 years building Django APIs on AWS. " * 40,
+            "Graphic designer skilled in Photoshop and Illustrator. " * 10,
+        ]
+        profile = self.engine.build_job_profile(jd)
+        batch_scores = self.engine.score_resumes_batch(resumes, profile)
+        single_scores = [self.engine.compute_semantic_similarity(r, jd) for r in resumes]
+        assert batch_scores == pytest.approx(single_scores, abs=1e-3)
+        assert batch_scores[0] > batch_scores[1]
+    
+    def test_document_embedding_pools_token_windows(self):
+        if self.engine.scheduler is None:
+            pytest.skip("encoder has no token-level backend")
+        text = " ".join(f"Built service{i} in Python on AWS." for i in range(150))
+        full, (chunks,) = self.engine.encode_document_views([text])
+        windows, lengths = self.engine.scheduler.encode_windows([text])
+        assert len(chunks) == len(windows[0]) > 1
+        assert chunks == pytest.approx(windows[0], abs=1e-5)
+        assert full[0] == pytest.approx(pool_chunk_embeddings(windows[0], lengths[0]), abs=1e-5)
+    
+    def test_vector_model_id_names_pooling_scheme(self, tmp_path):
+        # Vectors stored before full-document embeddings were pooled carry the bare model_id
+        store = ResumeVectorStore(tmp_path / "vectors", f"sqlite:///{tmp_path / 'pool.db'}")
+        dim = self.engine.model.get_sentence_embedding_dimension()
+        store.upsert(self.engine.model_id, [{'content_hash': 'old', 'filename': 'old.pdf'}], np.ones((1, dim)))
+        
+        model_id = self.engine.vector_model_id
+        assert model_id.startswith(f"{self.engine.model_id}|pooled:")
+        assert store.count(model_id) == 0
+        assert store.search(model_id, np.ones(dim)) == []
+
+
+class TestEncodeScheduler:
+    """Test token-length-bucketed encoding"""
+    
+    class LengthBackend:
+        """Embeds each row as (token count, first id) and records batch shapes"""
+        pad_token_id = 0
+        
+        def __init__(self):
+            self.shapes = []
+        
+        def get_sentence_embedding_dimension(self):
+            return 2
+        
+        def token_ids(self, texts):
+            return [[len(text)] * len(text.split()) for text in texts]
+        
+        def embed(self, input_ids, attention_mask):
+            self.shapes.append(input_ids.shape)
+            return np.stack([attention_mask.sum(axis=1), input_ids[:, 0]], axis=1).astype(np.float32)
+    
+    def test_batches_fit_budget_and_keep_order(self):
+        backend = self.LengthBackend()
+        scheduler = EncodeScheduler(backend, token_budget=40, max_batch_size=8)
+        texts = ["w " * n for n in [2, 30, 5, 1, 20, 3]]
+        
+        embeddings = scheduler.encode(texts, normalize_embeddings=False)
+        assert embeddings[:, 0].tolist() == [2, 30, 5, 1, 20, 3]
+        assert embeddings[:, 1].tolist() == [len(text) for text in texts]
+        assert all(rows * width <= 40 or rows == 1 for rows, width in backend.shapes)
+        assert backend.shapes[0] == (1, 30)
+        
+        stats = scheduler.stats.stats()
+        assert stats['tokens'] == 61 and stats['padded_tokens'] >= 61
+        assert 0 <= stats['padding_ratio'] < 1
+    
+    def test_matches_sentence_transformer_encode(self):
+        model = get_enhanced_ml_engine(use_custom=False).model
+        texts = ["Python developer. " * n for n in [1, 200, 15, 60]]
+        scheduler = EncodeScheduler(token_backend_for(model), token_budget=1024, max_batch_size=4)
+        expected = model.encode(texts, normalize_embeddings=True)
+        assert scheduler.encode(texts) == pytest.approx(expected, abs=1e-5)
+    
+    def test_windows_cover_every_token(self):
+        backend = token_backend_for(get_enhanced_ml_engine(use_custom=False).model)
+        text = " ".join(f"skill{i}" for i in range(400))
+        windows, short = backend.window_token_ids([text, "Python"])
+        content = backend.tokenizer(text, add_special_tokens=False)['input_ids']
+        assert len(short) == 1
+        assert all(len(ids) <= backend.max_seq_length for ids in windows)
+        assert windows[0] == backend.token_ids([text])[0]
+        assert windows[-1][-2] == content[-1]
+
+
+class TestEmbeddingService:
+    """Test encoding for several clients in one shared embedding service"""
+    
+    def test_coalesces_clients_and_falls_back_locally(self, tmp_path):
+        import multiprocessing
+        import threading
+        import time
+        address = str(tmp_path / "embeddings.sock")
+        texts = [["w " * n for n in range(1, 6 + i)] for i in range(3)]
+        # Flushes only once all three requests (64 tokens) are queued
+        service = EmbeddingService(
+            EncodeScheduler(TestEncodeScheduler.LengthBackend(), 4096, 64), address, max_wait=30, max_batch_tokens=64
+        )
+        process = multiprocessing.get_context('fork').Process(target=service.serve_forever, daemon=True)
+        process.start()
+        while not Path(address).exists():
+            time.sleep(0.01)
+        
+        clients = [RemoteEncodeScheduler(address, TestEncodeScheduler.LengthBackend(), 4096, 64) for _ in texts]
+        results = [None] * len(texts)
+        
+        def encode(i):
+            results[i] = clients[i].encode(texts[i], normalize_embeddings=False)
+        
+        threads = [threading.Thread(target=encode, args=(i,)) for i in range(len(texts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        local = EncodeScheduler(TestEncodeScheduler.LengthBackend(), 4096, 64)
+        for batch, result in zip(texts, results):
+            assert result == pytest.approx(local.encode(batch, normalize_embeddings=False))
+        stats = clients[0].service_stats()
+        assert stats['requests'] == 3 and stats['micro_batches'] == 1
+        assert stats['encoding']['texts'] == sum(len(batch) for batch in texts)
+        assert clients[0].stats.stats()['texts'] == 0
+        
+        process.terminate()
+        process.join()
+        assert clients[0].encode(texts[0], normalize_embeddings=False) == pytest.approx(results[0])
+        assert clients[0].stats.stats()['texts'] == len(texts[0])
+    
+    @staticmethod
+    def _send_and_exit(address, names):
+        """Queue an encode request, then die before the reply"""
+        import os
+        client = RemoteEncodeScheduler(address, TestEncodeScheduler.LengthBackend(), 4096, 64)
+        conn, shm = client._checkout(4096)
+        np.ndarray((2,), dtype=np.int32, buffer=shm.buf)[:] = [3, 2]
+        np.ndarray((5,), dtype=np.int32, buffer=shm.buf, offset=8)[:] = [1, 2, 3, 4, 5]
+        conn.send(('encode', shm.name, 2, 5))
+        names.send(shm.name)
+        os._exit(0)
+    
+    def test_client_dying_mid_request_does_not_stop_service(self, tmp_path):
+        import multiprocessing
+        import time
+        from multiprocessing import shared_memory
+        address = str(tmp_path / "embeddings.sock")
+        service = EmbeddingService(
+            EncodeScheduler(TestEncodeScheduler.LengthBackend(), 4096, 64), address, max_wait=1.0, max_batch_tokens=4096
+        )
+        context = multiprocessing.get_context('fork')
+        process = context.Process(target=service.serve_forever, daemon=True)
+        process.start()
+        while not Path(address).exists():
+            time.sleep(0.01)
+        
+        names, sender = context.Pipe(duplex=False)
+        dying = context.Process(target=self._send_and_exit, args=(address, sender))
+        dying.start()
+        name = names.recv()
+        dying.join()
+        
+        # Queued in the same micro-batch as the dead client's request
+        client = RemoteEncodeScheduler(address, TestEncodeScheduler.LengthBackend(), 4096, 64)
+        texts = ["w " * n for n in range(1, 4)]
+        local = EncodeScheduler(TestEncodeScheduler.LengthBackend(), 4096, 64)
+        for _ in range(2):
+            assert client.encode(texts, normalize_embeddings=False) == pytest.approx(
+                local.encode(texts, normalize_embeddings=False)
+            )
+        assert client.stats.stats()['texts'] == 0
+        stats = client.service_stats()
+        # The dead client's request was skipped, not encoded into a closed buffer
+        assert stats['workers_connected'] == 1 and stats['requests'] == 2
+        
+        client.close()
+        process.terminate()
+        process.join()
+        shared_memory.SharedMemory(name=name).unlink()
+
+
+class TestOnnxEncoder:
+    """Test the ONNX Runtime inference backend against PyTorch"""
+    
+    TEXTS = [
+        "Looking for a Python developer with Django and AWS experience.",
+        "Python developer, 5 years building Django APIs on AWS. " * 60,
+        "  Graphic designer skilled in Photoshop and Illustrator.  ",
+    ]
+    
+    def test_cosine_scores_match_torch(self, tmp_path):
+        pytest.importorskip("onnxruntime")
+        model = get_enhanced_ml_engine(use_custom=False).model
+        encoder = OnnxSentenceEncoder(export_onnx(model, tmp_path / "onnx", "test"))
+        expected = model.encode(self.TEXTS, normalize_embeddings=True)
+        actual = encoder.encode(self.TEXTS, batch_size=2, normalize_embeddings=True)
+        assert actual.shape == expected.shape
+        assert actual @ actual.T == pytest.approx(expected @ expected.T, abs=1e-4)
+        assert encoder.window_token_ids(self.TEXTS) == token_backend_for(model).window_token_ids(self.TEXTS)
+    
+    def test_int8_scores_stay_close(self, tmp_path):
+        pytest.importorskip("onnxruntime")
+        model = get_enhanced_ml_engine(use_custom=False).model
+        model_dir = export_onnx(model, tmp_path / "onnx", "test")
+        quantize_onnx(model_dir)
+        encoder = OnnxSentenceEncoder(model_dir, model_file=ONNX_INT8_FILE)
+        expected = model.encode(self.TEXTS, normalize_embeddings=True)
+        actual = encoder.encode(self.TEXTS, normalize_embeddings=True)
+        assert actual @ actual.T == pytest.approx(expected @ expected.T, abs=0.03)
+
+
+class TestComponentRegistry:
+    """Test lazy loading and readiness reporting"""
+    
+    def test_loads_once_and_reports_state(self):
+        import threading
+        registry = ComponentRegistry(['model', 'nlp'])
+        calls = []
+        
+        def loader():
+            calls.append(1)
+            return object()
+        
+        assert registry.status()['components']['model']['state'] == 'pending'
+        threads = [threading.Thread(target=registry.load, args=('model', loader)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        
+        status = registry.status()
+        assert status['components']['model']['state'] == 'ready'
+        assert status['components']['model']['seconds'] >= 0
+        assert not status['ready']
+    
+    def test_failed_component_is_retried(self):
+        registry = ComponentRegistry(['nlp'])
+        
+        def failing():
+            raise OSError("model not installed")
+        
+        with pytest.raises(OSError):
+            registry.load('nlp', failing)
+        assert registry.status()['components']['nlp'] == {
+            'state': 'failed', 'seconds': pytest.approx(0, abs=1), 'error': "model not installed"
+        }
+        assert registry.load('nlp', lambda: 'loaded') == 'loaded'
+        assert registry.status()['ready']
+    
+    def test_keybert_shares_the_engine_encoder(self, monkeypatch):
+        from sentence_transformers import SentenceTransformer
+        from backend.core import warmup
+        from backend.core.encode_scheduler import EncodeScheduler
+        from backend.utils import skill_extractor as skill_extractor_module
+        if not skill_extractor_module.KEYBERT_AVAILABLE:
+            pytest.skip("KeyBERT not installed")
+        
+        constructed = []
+        init = SentenceTransformer.__init__
+        
+        def counting_init(model, *args, **kwargs):
+            constructed.append(args[:1])
+            init(model, *args, **kwargs)
+        
+        monkeypatch.setattr(SentenceTransformer, '__init__', counting_init)
+        monkeypatch.setattr(skill_extractor_module, '_skill_extractor', None)
+        engine = EnhancedMLEngine(use_custom_model=False)
+        extractor = warmup._load_skill_extractor(engine)
+        assert extractor.keybert.model.embedding_model is engine.encoder
+        
+        extractor.extract_keyword_skills_batch(["Built Kubernetes operators in Go and Rust."])
+        assert len(constructed) == 1
+        
+        # Prefork workers re-attach KeyBERT to their (remote) scheduler
+        extractor.attach_keybert_model(engine.scheduler)
+        assert isinstance(extractor.keybert.model.embedding_model, EncodeScheduler)
+        assert extractor.keybert.model.embedding_model is engine.scheduler
+
+
+class TestResumeParser:
+    """Test in-memory resume parsing"""
+    
+    def _docx_bytes(self):
+        import io
+        import docx
+        document = docx.Document()
+        document.add_paragraph("Jane Smith")
+        document.add_paragraph("Senior Python Developer")
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+    
+    def test_parse_docx_bytes(self):
+        text = ResumeParser.parse_resume(self._docx_bytes(), "resume.docx")
+        assert "Senior Python Developer" in text
+    
+    def test_parse_bytes_requires_filename(self):
+        assert ResumeParser.parse_resume(self._docx_bytes()) is None
+
+
+class TestResumeCache:
+    """Test content-addressed resume cache"""
+    
+    def test_lru_eviction_and_disk_tier(self, tmp_path):
+        cache = ResumeCache(tmp_path, max_entries=2)
+        for key in ['aa11', 'bb22', 'cc33']:
+            cache.put(key, {'text': key, 'validation': None, 'features': None})
+        assert cache.stats()['entries_in_memory'] == 2
+        
+        # Evicted from memory but still served from disk
+        assert cache.get('aa11')['text'] == 'aa11'
+        assert cache.get('missing') is None
+    
+    def test_version_change_invalidates(self, tmp_path):
+        ResumeCache(tmp_path, version="1").put('aa11', {'text': 'old'})
+        assert ResumeCache(tmp_path, version="2").get('aa11') is None
+
+
+class TestWorkerPool:
+    """Test resume analysis in the process pool"""
+    
+    RESUME_LINES = [
+        "Jane Smith", "jane.smith@example.com | +1 555 123 4567",
+        "Professional Summary",
+        "Senior Python Developer with 7 years of experience building Django and FastAPI services on AWS.",
+        "Experience",
+        "Senior Software Engineer, Acme Corp, 2018 - Present",
+        "Led a team of five engineers; built REST APIs with Python, PostgreSQL and Docker.",
+        "Education", "Bachelor of Science in Computer Science, State University",
+        "Skills", "Python, Django, FastAPI, AWS, Docker, PostgreSQL, Git",
+    ]
+    
+    def _docx_bytes(self):
+        import io
+        import docx
+        document = docx.Document()
+        for line in self.RESUME_LINES:
+            document.add_paragraph(line)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+    
+    @pytest.fixture
+    def pool(self, tmp_path, monkeypatch):
+        import backend.core.resume_pipeline as resume_pipeline
+        from backend.core import worker_pool
+        from backend.core.config import settings
+        monkeypatch.setattr(settings, 'PROCESS_POOL_WORKERS', 1)
+        monkeypatch.setattr(settings, 'PROCESS_POOL_START_METHOD', 'fork')
+        # Pool workers are daemonic; nlp.pipe must fall back to one process there
+        monkeypatch.setattr(settings, 'SPACY_N_PROCESS', 2)
+        cache = ResumeCache(tmp_path)
+        monkeypatch.setattr(resume_pipeline, 'get_resume_cache', lambda: cache)
+        worker_pool.shutdown_process_pool()
+        yield worker_pool
+        worker_pool.shutdown_process_pool()
+    
+    def test_analyze_resume_runs_in_pool(self, pool):
+        import asyncio
+        import os
+        from backend.core.resume_pipeline import analyze_resume_for_screening
+        
+        async def analyze():
+            pid = await pool.run_in_process_pool(os.getpid)
+            return pid, await pool.run_in_process_pool(analyze_resume_for_screening, "jane.docx", self._docx_bytes())
+        
+        pid, analysis = asyncio.run(analyze())
+        assert pid != os.getpid()
+        assert analysis['filename'] == "jane.docx" and analysis['validation']['is_resume']
+        assert {'Python', 'Django', 'Docker'} <= set(analysis['skills'])
+        # The worker's result was cached for this process too
+        local = analyze_resume_for_screening("jane.docx", self._docx_bytes())
+        assert {key: local[key] for key in analysis} == analysis
+    
+    def test_broken_pool_is_replaced(self, pool):
+        import asyncio
+        import os
+        from concurrent.futures.process import BrokenProcessPool
+        
+        with pytest.raises(BrokenProcessPool):
+            asyncio.run(pool.run_in_process_pool(os._exit, 1))
+        assert pool._process_pool is None
+        assert asyncio.run(pool.run_in_process_pool(os.getpid)) != os.getpid()
+
+
+class TestEmbeddingCache:
+    """Test two-tier embedding cache"""
+    
+    def test_lru_eviction_and_disk_tier(self, tmp_path):
+        db_path = tmp_path / "embeddings.sqlite3"
+        cache = EmbeddingCache(db_path, max_entries=2)
+        keys = [embedding_key("pretrained:m", text, "full") for text in ['a', 'b', 'c']]
+        cache.put_many("pretrained:m", {key: np.full(4, i, dtype=np.float32) for i, key in enumerate(keys)})
+        assert cache.stats()['entries_in_memory'] == 2
+        
+        # Evicted from memory but still served from disk, also to a new process
+        found = EmbeddingCache(db_path).get_many(keys + ['missing'])
+        assert set(found) == set(keys)
+        assert found[keys[0]].shape == (1, 4)
+        
+        cache.get_many(keys)
+        assert cache.stats()['disk_hits'] == 1 and cache.stats()['memory_hits'] == 2
+    
+    def test_key_covers_model_and_params(self, tmp_path):
+        assert embedding_key("custom:1", "text", "full") != embedding_key("custom:2", "text", "full")
+        assert embedding_key("custom:1", "text", "full") != embedding_key("custom:1", "text", "chunks:200")
+        
+        cache = EmbeddingCache(tmp_path / "embeddings.sqlite3")
+        old_key = embedding_key("custom:1", "text", "full")
+        base_key = embedding_key("pretrained:m", "text", "full")
+        old_int8_key = embedding_key("custom:1+int8", "text", "full")
+        int8_key = embedding_key("custom:2+int8", "text", "full")
+        cache.put_many("custom:1", {old_key: np.ones(4)})
+        cache.put_many("custom:1+int8", {old_int8_key: np.ones(4)})
+        cache.put_many("custom:2+int8", {int8_key: np.ones(4)})
+        cache.put_many("pretrained:m", {base_key: np.ones(4)})
+        
+        # Retraining purges the previous custom model only; variants of the new one stay
+        cache.purge_models("custom:2", prefix="custom:")
+        assert set(cache.get_many([old_key, old_int8_key, int8_key, base_key])) == {int8_key, base_key}
+
+
+class TestResumeVectorStore:
+    """Test persistent talent pool vectors"""
+    
+    def _store(self, tmp_path):
+        return ResumeVectorStore(tmp_path / "vectors", f"sqlite:///{tmp_path / 'pool.db'}")
+    
+    def test_search_returns_nearest_resumes(self, tmp_path):
+        store = self._store(tmp_path)
+        vectors = np.eye(3, dtype=np.float32)
+        records = [{'content_hash': h, 'filename': f"{h}.pdf", 'skills': ['Python']} for h in ['a', 'b', 'c']]
+        store.upsert("pretrained:m", records, vectors)
+        
+        hits = store.search("pretrained:m", np.array([0.1, 0.9, 0.0]), top_k=2)
+        assert [record['filename'] for _, record in hits] == ['b.pdf', 'a.pdf']
+        assert hits[0][0] == pytest.approx(0.9)
+        assert store.search("custom:other", vectors[0]) == []
+    
+    def test_rescreened_resume_keeps_its_row(self, tmp_path):
+        store = self._store(tmp_path)
+        store.upsert("pretrained:m", [{'content_hash': 'a', 'filename': 'old.pdf'}], np.eye(2)[:1])
+        store.upsert("pretrained:m", [{'content_hash': 'a', 'filename': 'new.pdf'}], np.eye(2)[1:])
+        
+        # A second store (e.g. another worker process) sees the update
+        other = self._store(tmp_path)
+        assert other.count("pretrained:m") == 1
+        (similarity, record), = other.search("pretrained:m", np.array([0.0, 1.0]))
+        assert record['filename'] == 'new.pdf' and similarity == pytest.approx(1.0)
+    
+    @staticmethod
+    def _upsert_batches(tmp_path, worker):
+        store = ResumeVectorStore(tmp_path / "vectors", f"sqlite:///{tmp_path / 'pool.db'}")
+        for batch in range(5):
+            hashes = [f"{worker}-{batch}-{i}" for i in range(3)]
+            vectors = np.array([[worker, batch, i, 1.0] for i in range(3)], dtype=np.float32)
+            store.upsert("pretrained:m", [{'content_hash': h, 'filename': h} for h in hashes], vectors)
+    
+    def test_concurrent_processes_get_distinct_rows(self, tmp_path):
+        import multiprocessing
+        self._store(tmp_path)  # Create the schema before the workers race on it
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=self._upsert_batches, args=(tmp_path, w)) for w in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            assert worker.exitcode == 0
+        
+        store = self._store(tmp_path)
+        assert store.count("pretrained:m") == 60
+        with store.db.connect() as conn:
+            rows = conn.execute(select(resume_vectors.c.content_hash, resume_vectors.c.row_index)).all()
+        assert sorted(row for _, row in rows) == list(range(60))
+        matrix = store._file("pretrained:m").view(60, 4)
+        for content_hash, row in rows:
+            worker, batch, i = map(int, content_hash.split('-'))
+            assert matrix[row].tolist() == [worker, batch, i, 1.0]
+
+
+class TestAnnIndex:
+    """Test the IVF-PQ approximate nearest-neighbour index"""
+    
+    def _vectors(self, n=2000, dim=16):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(n, dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    def _index(self, vectors):
+        index = IVFPQIndex(vectors.shape[1], n_lists=16, n_subvectors=4)
+        index.train(vectors)
+        index.add(np.arange(len(vectors)), vectors)
+        return index
+    
+    def test_search_finds_stored_vector_and_honours_removal(self):
+        vectors = self._vectors()
+        index = self._index(vectors)
+        
+        ids, _ = index.search(vectors[42], k=5, nprobe=16)
+        assert ids[0] == 42
+        
+        index.remove(np.array([42]))
+        assert 42 not in index.search(vectors[42], k=5, nprobe=16)[0]
+        index.add(np.array([42]), vectors[7:8])
+        assert 42 in index.search(vectors[7], k=2, nprobe=16)[0]
+        assert len(index) == len(vectors)
+    
+    def test_snapshot_round_trip_is_memory_mapped(self, tmp_path):
+        vectors = self._vectors()
+        index = self._index(vectors)
+        index.remove(np.arange(10))
+        index.save(tmp_path / "ann")
+        
+        loaded = IVFPQIndex.load(tmp_path / "ann")
+        assert isinstance(loaded._base_codes, np.memmap)
+        assert len(loaded) == len(vectors) - 10
+        assert loaded.search(vectors[500], k=1, nprobe=16)[0][0] == 500
+        
+        # Inserts after loading go to memory, on top of the read-only snapshot
+        loaded.add(np.array([3]), vectors[3:4])
+        assert loaded.search(vectors[3], k=1, nprobe=16)[0][0] == 3
+    
+    def test_vector_store_uses_index_above_threshold(self, tmp_path):
+        store = ResumeVectorStore(tmp_path / "vectors", f"sqlite:///{tmp_path / 'pool.db'}", ann_min_pool_size=100)
+        vectors = self._vectors(300)
+        records = [{'content_hash': str(i), 'filename': f"{i}.pdf"} for i in range(300)]
+        store.upsert("pretrained:m", records, vectors)
+        
+        # The first search scans while the index builds in the background
+        (similarity, record), = store.search("pretrained:m", vectors[12], top_k=1)
+        assert record['filename'] == '12.pdf' and similarity == pytest.approx(1.0)
+        for thread in list(store._ann_tasks.values()):
+            thread.join(timeout=60)
+        assert "pretrained:m" in store._ann
+        
+        (similarity, record), = store.search("pretrained:m", vectors[12], top_k=1)
+        assert record['filename'] == '12.pdf' and similarity == pytest.approx(1.0)
+        
+        # Later upserts are caught up before the next search
+        store.upsert("pretrained:m", [{'content_hash': 'new', 'filename': 'new.pdf'}], -vectors[12:13])
+        (_, record), = store.search("pretrained:m", -vectors[12], top_k=1)
+        assert record['filename'] == 'new.pdf'
+    
+    def test_search_does_not_wait_for_index_build(self, tmp_path, monkeypatch):
+        import threading
+        store = ResumeVectorStore(tmp_path / "vectors", f"sqlite:///{tmp_path / 'pool.db'}", ann_min_pool_size=100)
+        vectors = self._vectors(300)
+        store.upsert("pretrained:m", [{'content_hash': str(i), 'filename': f"{i}.pdf"} for i in range(300)], vectors)
+        
+        release = threading.Event()
+        build_index = store._build_index
+        
+        def slow_build(*args):
+            release.wait(timeout=60)
+            return build_index(*args)
+        
+        monkeypatch.setattr(store, '_build_index', slow_build)
+        for row in (5, 7):
+            (_, record), = store.search("pretrained:m", vectors[row], top_k=1)
+            assert record['filename'] == f"{row}.pdf"
+        build, = store._ann_tasks.values()
+        assert "pretrained:m" not in store._ann
+        
+        release.set()
+        build.join(timeout=60)
+        assert "pretrained:m" in store._ann
+    
+    def test_snapshot_runs_in_background_and_keeps_newer_snapshots(self, tmp_path, monkeypatch):
+        import threading
+        from backend.core.config import settings
+        store = ResumeVectorStore(tmp_path / "vectors", f"sqlite:///{tmp_path / 'pool.db'}", ann_min_pool_size=100)
+        vectors = self._vectors(300)
+        store.upsert("pretrained:m", [{'content_hash': str(i), 'filename': f"{i}.pdf"} for i in range(300)], vectors)
+        store.search("pretrained:m", vectors[0], top_k=1)
+        for thread in list(store._ann_tasks.values()):
+            thread.join(timeout=60)
+        
+        # Another process's snapshot, written after this one's
+        other = ResumeVectorStore(tmp_path / "vectors", f"sqlite:///{tmp_path / 'pool.db'}", ann_min_pool_size=100)
+        other_snapshot = other._save_index("pretrained:m", store._ann["pretrained:m"].index.copy())
+        
+        release = threading.Event()
+        save_index = store._save_index
+        
+        def slow_save(*args):
+            release.wait(timeout=60)
+            return save_index(*args)
+        
+        monkeypatch.setattr(settings, 'ANN_SNAPSHOT_EVERY', 1)
+        monkeypatch.setattr(store, '_save_index', slow_save)
+        store.upsert("pretrained:m", [{'content_hash': 'new', 'filename': 'new.pdf'}], -vectors[12:13])
+        (_, record), = store.search("pretrained:m", -vectors[12], top_k=1)
+        assert record['filename'] == 'new.pdf'
+        snapshot, = store._ann_tasks.values()
+        
+        release.set()
+        snapshot.join(timeout=60)
+        # The newer snapshot survives this save (only older ones are pruned) and still loads
+        assert IVFPQIndex.load(Path(other_snapshot._base_ids.filename).parent).dim == 16
+        (_, record), = store.search("pretrained:m", -vectors[12], top_k=1)
+        assert record['filename'] == 'new.pdf'
+    
+    def test_snapshot_load_failure_keeps_index_in_memory(self, tmp_path, monkeypatch):
+        store = ResumeVectorStore(tmp_path / "vectors", f"sqlite:///{tmp_path / 'pool.db'}")
+        index = self._index(self._vectors(300))
+        
+        def deleted(directory, mmap=True):
+            raise FileNotFoundError(directory)
+        
+        monkeypatch.setattr(IVFPQIndex, 'load', deleted)
+        assert store._save_index("pretrained:m", index) is index
+
+
+class TestJobProfileHelpers:
+    """Test job description feature extraction"""
+    
+    def test_detect_required_seniority(self):
+        assert detect_required_seniority("We need a Senior Python Developer") == 'Senior'
+        assert detect_required_seniority("Junior frontend role") == 'Junior'
+        assert detect_required_seniority("Backend developer") == 'Entry Level'
+    
+    def test_extract_required_years(self):
+        assert extract_required_years("Requires 5+ years of experience with Python") == 5.0
+        assert extract_required_years("No explicit requirement") == 3.0
+    
+    def test_chunk_text_overlaps(self):
+        text = " ".join(f"word{i}" for i in range(300))
+        chunks = chunk_text(text)
+        assert len(chunks) == 3
+        assert chunks[1].split()[0] == "word100"
+
+
+class TestDocumentContext:
+    """Test the shared per-resume spaCy analysis"""
+    
+    def setup_method(self):
+        import spacy
+        nlp = spacy.blank("en")
+        ruler = nlp.add_pipe("entity_ruler")
+        ruler.add_patterns([
+            {"label": "ORG", "pattern": "Acme Corp"},
+            {"label": "DATE", "pattern": "2019"},
+            {"label": "DATE", "pattern": "2023"},
+        ])
+        self.calls = 0
+        
+        class CountingNLP:
+            def __call__(_, text):
+                self.calls += 1
+                return nlp(text)
+            
+            def pipe(_, texts, **kwargs):
+                return nlp.pipe(texts, **kwargs)
+        
+        self.processor = NLPProcessor()
+        self.processor.nlp = CountingNLP()
+    
+    def test_pipeline_runs_once_per_document(self):
+        text = "Engineer at Acme Corp from 2019 to 2023. " + "Filler text. " * 200
+        context = self.processor.analyze(text)
+        
+        assert self.processor.extract_dates(text, context) == ['2019', '2023']
+        assert self.processor.extract_organizations(text, context) == ['Acme Corp']
+        assert self.processor.extract_named_entities(text, context=context, max_chars=25) == {'ORG': ['Acme Corp']}
+        assert self.calls == 1
+    
+    def test_analyze_batch_preserves_order(self):
+        texts = ["Joined Acme Corp in 2019", "", "Left in 2023"]
+        contexts = self.processor.analyze_batch(texts, batch_size=2)
+        
+        assert [c.dates for c in contexts] == [['2019'], [], ['2023']]
+        assert contexts[0].organizations == ['Acme Corp']
+
+
+class TestSkillMatcher:
+    """Test the Aho-Corasick skill matcher"""
+    
+    def setup_method(self):
+        self.matcher = SkillMatcher([
+            ('Java', 'Java'), ('JavaScript', 'JavaScript'), ('JS', 'JavaScript'),
+            ('C++', 'C++'), ('Spring', 'Spring'), ('Spring Boot', 'Spring Boot'), ('Go', 'Go')
+        ])
+    
+    def test_word_boundaries(self):
+        assert self.matcher.find_skills("JavaScript and Google") == {'JavaScript'}
+        assert self.matcher.find_skills("C++, Java.") == {'C++', 'Java'}
+        # Underscores are word characters, as with the regex \\b matching this replaced
+        assert self.matcher.find_skills("js_utils, node_modules and java_home") == set()
+        assert self.matcher.find_skills("_js_") == set()
+        assert self.matcher.find_skills("(JS)/Go") == {'JavaScript', 'Go'}
+    
+    def test_offsets_and_overlaps(self):
+        text = "Built APIs with SPRING BOOT"
+        matches = self.matcher.find_all(text)
+        
+        assert [(m.skill, m.start, m.end) for m in matches] == [('Spring Boot', 16, 27), ('Spring', 16, 22)]
+        assert matches[0].term == "SPRING BOOT"
+
+
+class TestSkillTaxonomy:
+    """Test loading the external skill taxonomy"""
+    
+    builtin_database = {'languages': ['Python', 'Java']}
+    builtin_synonyms = {'Python': ['py']}
+    
+    def test_builtin_wins_on_collision(self):
+        entries = parse_taxonomy_entries({'skills': [
+            'python',
+            {'preferredLabel': 'Apache Kafka', 'altLabels': 'kafka\npy', 'skillType': 'streaming'}
+        ]})
+        database, synonyms = merge_taxonomy(self.builtin_database, self.builtin_synonyms, entries)
+        
+        assert database == {'languages': ['Python', 'Java'], 'streaming': ['Apache Kafka']}
+        assert synonyms == {'Python': ['py'], 'Apache Kafka': ['kafka']}
+    
+    def test_index_is_cached_and_hot_reloaded(self, tmp_path, monkeypatch):
+        import json
+        taxonomy_file = tmp_path / "skills.json"
+        taxonomy_file.write_text(json.dumps({'skills': ['Terraform']}))
+        
+        taxonomy = load_skill_taxonomy(taxonomy_file, self.builtin_database, self.builtin_synonyms, tmp_path)
+        assert len(list(tmp_path.glob("*.pkl"))) == 1
+        cached = load_skill_taxonomy(taxonomy_file, self.builtin_database, self.builtin_synonyms, tmp_path)
+        assert cached.matcher.find_skills("py and terraform") == taxonomy.matcher.find_skills("py and terraform") == {'Python', 'Terraform'}
+        
+        extractor = get_skill_extractor()
+        monkeypatch.setattr(extractor, 'taxonomy_path', taxonomy_file)
+        monkeypatch.setattr(extractor, 'taxonomy', cached)
+        monkeypatch.setattr(extractor, 'reload_interval', 1.0)
+        monkeypatch.setattr(extractor, '_last_reload_check', float('-inf'))
+        
+        taxonomy_file.write_text(json.dumps({'skills': ['Terraform', 'Pulumi']}))
+        assert extractor.reload_if_changed(wait=True)
+        assert 'Pulumi' in extractor.skill_matcher.find_skills("Pulumi stacks")
+        
+        # The new index replaces the one of the previous taxonomy contents
+        load_skill_taxonomy(taxonomy_file, self.builtin_database, self.builtin_synonyms, tmp_path)
+        assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+
+class TestJobManager:
+    """Test background screening jobs"""
+    
+    JD = "Looking for a senior Python developer with Django, AWS and Docker experience."
+    
+    @staticmethod
+    def stub_screening(monkeypatch, release=None):
+        """
+        Replace the models in routes and jobs with a fake scorer: files named
+        skip-* are not resumes, score-<n>.pdf scores n; with release set,
+        the last file waits for it
+        """
+        import asyncio
+        from backend.api import routes
+        from backend.core import job_manager
+        
+        def build_job_profile(job_description, ml_engine, skill_extractor):
+            if 'explode' in job_description:
+                raise RuntimeError("job profile failed")
+            return job_description
+        
+        async def iter_screening_results(uploads, job_profile, ml_engine, skill_extractor):
+            for i, (filename, content) in enumerate(uploads):
+                if release is not None and i == len(uploads) - 1:
+                    await release.wait()
+                await asyncio.sleep(0)
+                if filename.startswith('skip-'):
+                    yield filename, None
+                else:
+                    score = float(filename.split('-')[1].split('.')[0])
+                    yield filename, {'filename': filename, 'name': filename, 'final_score': score}
+        
+        for module in (routes, job_manager):
+            monkeypatch.setattr(module, 'build_job_profile', build_job_profile)
+            monkeypatch.setattr(module, 'iter_screening_results', iter_screening_results)
+    
+    @staticmethod
+    def _manager(tmp_path, **kwargs):
+        from backend.core.job_manager import JobManager
+        return JobManager(f"sqlite:///{tmp_path / 'jobs.db'}", **kwargs)
+    
+    @staticmethod
+    def _status_in_other_process(tmp_path, job_id, results):
+        results.send(TestJobManager._manager(tmp_path).get(job_id).to_status())
+    
+    def test_job_reports_partial_then_ranked_results(self, tmp_path, monkeypatch):
+        import asyncio
+        import multiprocessing
+        
+        async def run():
+            release = asyncio.Event()
+            self.stub_screening(monkeypatch, release)
+            manager = self._manager(tmp_path)
+            uploads = [("score-40.pdf", b""), ("skip-1.pdf", b""), ("score-90.pdf", b"")]
+            job = await manager.submit(uploads, self.JD, None, None)
+            task = manager._tasks[job.job_id]
+            assert manager.get(job.job_id).status == "pending"
+            
+            while (current := manager.get(job.job_id)).processed_files < 2:
+                assert current.status != "failed", current.error
+                await asyncio.sleep(0.01)
+            status = manager.get(job.job_id).to_status()
+            assert status['status'] == "processing" and status['progress_percentage'] == pytest.approx(66.7)
+            assert [r['filename'] for r in status['results']] == ["score-40.pdf"]
+            
+            release.set()
+            await task
+            return job.job_id
+        
+        job_id = asyncio.run(run())
+        # Polls may reach another worker process than the one running the job
+        context = multiprocessing.get_context('fork')
+        results, sender = context.Pipe(duplex=False)
+        worker = context.Process(target=self._status_in_other_process, args=(tmp_path, job_id, sender))
+        worker.start()
+        status = results.recv()
+        worker.join()
+        assert status['status'] == "completed" and status['progress_percentage'] == 100.0
+        assert [r['filename'] for r in status['results']] == ["score-90.pdf", "score-40.pdf"]
+    
+    def test_failed_job_keeps_error(self, tmp_path, monkeypatch):
+        import asyncio
+        self.stub_screening(monkeypatch)
+        manager = self._manager(tmp_path)
+        
+        async def run():
+            job = await manager.submit([("score-1.pdf", b"")], "explode " + self.JD, None, None)
+            await manager._tasks[job.job_id]
+            return job.job_id
+        
+        job = manager.get(asyncio.run(run()))
+        assert job.status == "failed" and job.error == "job profile failed"
+        assert job.finished_at is not None
+    
+    def test_empty_job_is_complete(self):
+        from backend.core.job_manager import ScreeningJob
+        assert ScreeningJob(total_files=0).progress_percentage == 100.0
+    
+    def test_finished_jobs_are_purged_after_retention(self, tmp_path, monkeypatch):
+        import asyncio
+        import time
+        self.stub_screening(monkeypatch)
+        manager = self._manager(tmp_path, retention_seconds=60)
+        
+        async def run():
+            old = await manager.submit([("score-1.pdf", b"")], self.JD, None, None)
+            await manager._tasks[old.job_id]
+            manager._update(old.job_id, {'finished_at': time.time() - 120})
+            running = await manager.submit([("score-2.pdf", b"")], self.JD, None, None)
+            manager._update(running.job_id, {'created_at': time.time() - 120})
+            new = await manager.submit([("score-3.pdf", b"")], self.JD, None, None)
+            assert manager.get(old.job_id) is None
+            assert manager.get(running.job_id) is not None and manager.get(new.job_id) is not None
+            await asyncio.gather(*manager._tasks.values())
+        
+        asyncio.run(run())
+        with manager.db.connect() as conn:
+            from backend.core.job_manager import screening_job_results
+            assert len(conn.execute(select(screening_job_results)).all()) == 2
+
+
+class TestScreeningRoutes:
+    """Test the screening API with stubbed models"""
+    
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from backend.api import routes
+        from backend.core import job_manager
+        TestJobManager.stub_screening(monkeypatch)
+        monkeypatch.setattr(job_manager, '_job_manager', TestJobManager._manager(tmp_path))
+        
+        app = FastAPI()
+        app.include_router(routes.router, prefix="/api/v1")
+        app.dependency_overrides[routes.screening_models] = lambda: (None, None)
+        with TestClient(app) as client:
+            yield client
+    
+    @staticmethod
+    def _files(*names):
+        return [('resumes', (name, b"%PDF-1.4", 'application/pdf')) for name in names]
+    
+    def test_job_is_accepted_and_polled_to_completion(self, client):
+        import time
+        response = client.post(
+            "/api/v1/jobs", data={'job_description': TestJobManager.JD},
+            files=self._files("score-40.pdf", "skip-1.pdf", "score-90.pdf")
+        )
+        assert response.status_code == 202
+        job_id = response.json()['job_id']
+        assert response.json()['total_files'] == 3
+        
+        deadline = time.monotonic() + 10
+        while True:
+            status = client.get(f"/api/v1/jobs/{job_id}").json()
+            if status['status'] in ("completed", "failed") or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+        assert status['status'] == "completed" and status['processed_files'] == 3
+        assert [r['filename'] for r in status['results']] == ["score-90.pdf", "score-40.pdf"]
+    
+    def test_unknown_job_is_404(self, client):
+        assert client.get("/api/v1/jobs/does-not-exist").status_code == 404
+    
+    def _stream(self, client, stream_format, job_description=TestJobManager.JD):
+        return client.post(
+            "/api/v1/process/stream",
+            data={'job_description': job_description, 'stream_format': stream_format},
+            files=self._files("score-40.pdf", "skip-1.pdf", "score-90.pdf")
+        )
+    
+    def test_ndjson_stream_frames(self, client):
+        import json
+        response = self._stream(client, "ndjson")
+        assert response.headers['content-type'].startswith("application/x-ndjson")
+        frames = [json.loads(line) for line in response.text.splitlines()]
+        
+        assert [(f['type'], f.get('filename')) for f in frames[:3]] == [
+            ('candidate', "score-40.pdf"), ('skipped', "skip-1.pdf"), ('candidate', "score-90.pdf")
+        ]
+        assert frames[0]['candidate']['final_score'] == 40.0
+        summary = frames[3]
+        assert summary['type'] == 'summary' and summary['total_candidates'] == 2
+        assert [(r['rank'], r['filename']) for r in summary['ranking']] == [(1, "score-90.pdf"), (2, "score-40.pdf")]
+        assert len(frames) == 4
+    
+    def test_sse_stream_frames(self, client):
+        import json
+        response = self._stream(client, "sse")
+        assert response.headers['content-type'].startswith("text/event-stream")
+        events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+        
+        assert [event[0] for event in events] == [
+            "event: candidate", "event: skipped", "event: candidate", "event: summary"
+        ]
+        summary = json.loads(events[-1][1][len("data: "):])
+        assert summary['type'] == 'summary' and summary['ranking'][0]['filename'] == "score-90.pdf"
+    
+    def test_stream_reports_errors_in_band(self, client):
+        import json
+        response = self._stream(client, "ndjson", job_description="explode " + TestJobManager.JD)
+        assert response.status_code == 200
+        frames = [json.loads(line) for line in response.text.splitlines()]
+        assert frames == [{'type': 'error', 'detail': "job profile failed"}]
+    
+    def test_unknown_stream_format_is_400(self, client):
+        assert self._stream(client, "xml").status_code == 400
+    
+    def test_stopping_early_cancels_pending_analyses(self, monkeypatch):
+        import asyncio
+        from backend.core import screening
+        cancelled = []
+        
+        async def run_in_process_pool(fn, filename, content):
+            if filename != "fast.pdf":
+                try:
+                    await asyncio.sleep(3600)
+                except asyncio.CancelledError:
+                    cancelled.append(filename)
+                    raise
+            return {'filename': filename}
+        
+        monkeypatch.setattr(screening, 'run_in_process_pool', run_in_process_pool)
+        monkeypatch.setattr(screening, 'is_screenable', lambda analysis: False)
+        
+        async def run():
+            uploads = [("slow-1.pdf", b""), ("fast.pdf", b""), ("slow-2.pdf", b"")]
+            results = screening.iter_screening_results(uploads, None, None, None)
+            first = await results.__anext__()
+            # What StreamingResponse does when the client disconnects
+            await results.aclose()
+            await asyncio.sleep(0)
+            return first
+        
+        assert asyncio.run(run()) == ("fast.pdf", None)
+        assert sorted(cancelled) == ["slow-1.pdf", "slow-2.pdf"]
+
+
+class TestPrefork:
+    """Test the prefork server's per-worker setup and supervision"""
+    
+    class FakeEngine:
+        def __init__(self):
+            self.calls = []
+            self.embedding_cache = self
+            self.encoder = self
+            self.scheduler = object()
+        
+        def reopen(self, *args):
+            self.calls.append(('reopen',) + args)
+        
+        def use_embedding_service(self, address):
+            self.calls.append(('use_embedding_service', address))
+            self.scheduler = ('remote', address)
+    
+    def _prepare(self, monkeypatch, service_address):
+        import torch
+        from backend.core import ml_engine_enhanced, prefork
+        from backend.utils import skill_extractor as skill_extractor_module
+        engine = self.FakeEngine()
+        attached = []
+        threads = []
+        monkeypatch.setattr(ml_engine_enhanced, 'get_enhanced_ml_engine', lambda: engine)
+        monkeypatch.setattr(
+            skill_extractor_module, 'get_skill_extractor',
+            lambda: type('Extractor', (), {'attach_keybert_model': staticmethod(attached.append)})()
+        )
+        monkeypatch.setattr(torch, 'set_num_threads', threads.append)
+        prefork._prepare_worker(3, service_address)
+        return engine, attached, threads
+    
+    def test_prepare_worker_reopens_shared_resources(self, monkeypatch):
+        engine, attached, threads = self._prepare(monkeypatch, None)
+        assert threads == [3]
+        # Embedding cache connection, then the ONNX session with the worker's thread count
+        assert engine.calls == [('reopen',), ('reopen', 3)]
+        assert attached == []
+    
+    def test_prepare_worker_switches_to_embedding_service(self, monkeypatch):
+        engine, attached, _ = self._prepare(monkeypatch, "/tmp/embeddings.sock")
+        assert ('use_embedding_service', "/tmp/embeddings.sock") in engine.calls
+        assert attached == [('remote', "/tmp/embeddings.sock")]
+    
+    def test_crash_looping_children_are_restarted_with_backoff(self):
+        from backend.core.prefork import RESTART_BACKOFF_SECONDS, _restart_delay
+        assert _restart_delay(100.0, 100.2) == RESTART_BACKOFF_SECONDS
+        assert _restart_delay(100.0, 100.0 + RESTART_BACKOFF_SECONDS + 5) == 0.0
 
 
 if __name__ == "__main__":